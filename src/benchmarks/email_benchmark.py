@@ -0,0 +1,104 @@
+"""Measures email delivery through SmtpEmailer against a local SmtpSink.
+
+Run from the repository root:
+  python -m src.benchmarks.email_benchmark                          10, 100 and 1000 recipients
+  python -m src.benchmarks.email_benchmark --recipients 50 500      other recipient counts
+  python -m src.benchmarks.email_benchmark --output email.json      also write the results
+
+For each recipient count it times Team.send_email to a team of that many members,
+Competition.send_email to two teams sharing them, and League.send_email to a league of
+teams of ten, and reports messages per second, the SMTP connections and transactions
+the sink saw, and the latency of a message (one SMTP transaction, see
+SmtpEmailer._send) at the 50th, 90th and 99th percentiles. The sink runs in this process,
+so the numbers measure the client side and the local socket, not a real mail server.
+"""
+import argparse
+import json
+import sys
+import time
+
+from src.league.competition import Competition
+from src.league.instrumentation import Instrumentation
+from src.league.league import League
+from src.league.smtp_emailer import SmtpEmailer
+from src.league.smtp_sink import SmtpSink
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+def build(recipients):
+    """return a team, a competition and a league each reaching recipients addresses"""
+    oids = iter(range(1, 10 ** 9))
+    members = [TeamMember(next(oids), f"Member {i}", f"member{i}@curl.org") for i in range(recipients)]
+    team = Team(next(oids), "Everyone")
+    team.add_members(members)
+    half = recipients // 2
+    home, away = Team(next(oids), "Home"), Team(next(oids), "Away")
+    home.add_members(members[:half])
+    away.add_members(members[half:])
+    competition = Competition(next(oids), [home, away], "Sheet A")
+    league = League(next(oids), "Everyone League")
+    for start in range(0, recipients, 10):
+        small = Team(next(oids), f"Team {start // 10}")
+        small.add_members(members[start:start + 10])
+        league.add_team(small)
+    return {"team": team, "competition": competition, "league": league}
+
+
+def measure(sender, recipients):
+    """send once to recipients addresses through sender, return the measurements"""
+    instrumentation = Instrumentation.instance()
+    with SmtpSink() as sink:
+        emailer = SmtpEmailer(sink.host, sink.port, "league@curl.org")
+        instrumentation.reset()
+        start = time.perf_counter()
+        sender.send_email(emailer, "Draw", "The draw for next week is posted.")
+        seconds = time.perf_counter() - start
+        stats = instrumentation.snapshot().get("SmtpEmailer.message", {})
+        return {"recipients": recipients, "messages": len(sink.recipients()), "seconds": seconds,
+                "messages_per_second": len(sink.recipients()) / seconds if seconds else 0.0,
+                "connections": sink.connections, "transactions": sink.transactions,
+                "p50": stats.get("p50"), "p90": stats.get("p90"), "p99": stats.get("p99")}
+
+
+def run(recipient_counts):
+    """return {"<recipients>/<sender>": measurements}"""
+    enabled = Instrumentation.enabled
+    Instrumentation.enable()
+    try:
+        results = {}
+        for recipients in recipient_counts:
+            for name, sender in build(recipients).items():
+                results[f"{recipients}/{name}"] = measure(sender, recipients)
+        return results
+    finally:
+        Instrumentation.enable(enabled)
+
+
+def recipient_count(text):
+    """argparse type of --recipients: a message needs at least one recipient"""
+    count = int(text)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"{count} recipients, at least 1 is needed")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time email delivery against a local SMTP sink.")
+    parser.add_argument("--recipients", nargs="+", type=recipient_count, default=[10, 100, 1000])
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+    results = run(args.recipients)
+    print(f"{'case':<20}{'messages':>10}{'msg/s':>10}{'conns':>8}{'trans':>8}"
+          f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for case, r in results.items():
+        print(f"{case:<20}{r['messages']:>10}{r['messages_per_second']:>10.0f}{r['connections']:>8}"
+              f"{r['transactions']:>8}{r['p50'] * 1000:>10.3f}{r['p90'] * 1000:>10.3f}{r['p99'] * 1000:>10.3f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Times the main LeagueDatabase, League and Team operations on synthetic databases
+(see synthetic_leagues.generate) and compares the timings with a stored baseline.
+
+Run from the repository root:
+  python -m src.benchmarks.league_benchmark                      run, compare with baseline.json
+  python -m src.benchmarks.league_benchmark --sizes small        only the small databases
+  python -m src.benchmarks.league_benchmark --output run.json    also write the results
+  python -m src.benchmarks.league_benchmark --save-baseline      make this run the new baseline
+
+The results are JSON: {"python": ..., "results": {"<size>/<case>": seconds, ...}}.
+Each case is timed repeat times and the fastest run is kept. A case slower than the
+baseline by more than the tolerance is reported as a regression and the exit status
+is 1. Baselines are only comparable on the machine that made them.
+"""
+import argparse
+import json
+import os.path
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from src.benchmarks.synthetic_leagues import generate
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.league_reports import LeagueReports
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+SIZES = {
+    "small": dict(leagues=2, teams=20, members=4, competitions=100, shared_ratio=0.1),
+    "medium": dict(leagues=5, teams=100, members=6, competitions=1000, shared_ratio=0.1),
+    "large": dict(leagues=10, teams=400, members=8, competitions=5000, shared_ratio=0.1),
+}
+"""keyword arguments of generate() for each size"""
+
+LOOKUPS = 1000
+"""name lookups and member queries timed per case"""
+
+
+def best_of(repeat, function, setup=None):
+    """run setup() then time function(setup's result) repeat times, return the fastest time"""
+    best = None
+    for i in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def cases(db, directory):
+    """return [(case name, function, setup)] timing the operations on db, using directory for files"""
+    rng = random.Random(2)
+    league = db.leagues[0]
+    csv_name = os.path.join(directory, "league.csv")
+    db.export_league_teams(league, csv_name)
+    dat_name = os.path.join(directory, "league.dat")
+    shard_directory = os.path.join(directory, "shards")
+    reports = LeagueReports(os.path.join(directory, "reports"))
+    team_names = [rng.choice(league.teams).name for i in range(LOOKUPS)]
+    members = [member for team in league.teams for member in team.members]
+    sample = [rng.choice(members) for i in range(LOOKUPS // 10)]
+    new_members = len(members)
+
+    def fresh_league():
+        return League(db.next_oid(), "Imported")
+
+    def saved():
+        db.save(dat_name)
+
+    def sharded():
+        db.save_shards(shard_directory)
+
+    def all_changed():
+        for changed in db.leagues:
+            changed.name = changed.name
+
+    def unreported():
+        shutil.rmtree(reports.directory, ignore_errors=True)
+
+    def reported():
+        reports.write(db.leagues)
+
+    def add_members(team):
+        for i in range(new_members):
+            team.add_member(TeamMember(i, f"Member {i}", f"member{i}@curl.org"))
+
+    return [
+        ("import_league_teams", lambda imported: db.import_league_teams(imported, csv_name), fresh_league),
+        ("export_league_teams", lambda unused: db.export_league_teams(league, csv_name), None),
+        ("sync_league_teams unchanged", lambda unused: db.sync_league_teams(league, csv_name), None),
+        ("save", lambda unused: db.save(dat_name), all_changed),
+        ("save unchanged", lambda unused: db.save(dat_name), saved),
+        ("load", lambda unused: LeagueDatabase.load(dat_name), saved),
+        ("save_shards", lambda unused: db.save_shards(shard_directory), all_changed),
+        ("read_shards", lambda unused: LeagueDatabase.read_shards(shard_directory), sharded),
+        ("read_league", lambda unused: LeagueDatabase.read_league(shard_directory, league.name), sharded),
+        ("write reports", lambda unused: reports.write(db.leagues), unreported),
+        ("write reports unchanged", lambda unused: reports.write(db.leagues), reported),
+        (f"team_named x{LOOKUPS}", lambda unused: [league.team_named(name) for name in team_names], None),
+        (f"add_member x{new_members}", add_members, lambda: Team(0, "Growing")),
+        (f"competitions_for_member x{len(sample)}",
+         lambda unused: [league.competitions_for_member(member) for member in sample], None),
+    ]
+
+
+def run(sizes, repeat=3):
+    """return {"<size>/<case>": fastest time in seconds} for the given sizes"""
+    results = {}
+    sole_instance = LeagueDatabase._sole_instance
+    try:
+        for size in sizes:
+            db = generate(**SIZES[size])
+            with tempfile.TemporaryDirectory() as directory:
+                for name, function, setup in cases(db, directory):
+                    results[f"{size}/{name}"] = best_of(repeat, function, setup)
+    finally:
+        LeagueDatabase._sole_instance = sole_instance
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """return (lines to print, regressions) comparing results with the baseline results"""
+    lines = []
+    regressions = []
+    for case, seconds in results.items():
+        before = baseline.get(case)
+        if before is None:
+            lines.append(f"{case:<48}{seconds * 1000:12.2f} ms   (not in baseline)")
+            continue
+        ratio = seconds / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "   REGRESSION"
+            regressions.append(case)
+        lines.append(f"{case:<48}{seconds * 1000:12.2f} ms   baseline {before * 1000:10.2f} ms   x{ratio:.2f}{flag}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the league operations on synthetic databases.")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE, help="JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slow-down over the baseline reported as a regression (0.25 is 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+    document = {"python": platform.python_version(), "machine": platform.machine(), "sizes": args.sizes,
+                "results": run(args.sizes, args.repeat)}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    lines, regressions = compare(document["results"], baseline, args.tolerance)
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
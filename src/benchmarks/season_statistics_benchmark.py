@@ -0,0 +1,108 @@
+"""Compares SeasonStatistics with single passes of Python loops over the league's objects.
+The query times of SeasonStatistics are shown alone and with the cost of building its
+columns, which a one-off query pays too.
+
+Run from the repository root:  python -m src.benchmarks.season_statistics_benchmark [teams ...]
+"""
+import datetime
+import random
+import sys
+import time
+
+from src.league.league import League
+from src.league.scheduler import RoundRobinScheduler
+from src.league.season_statistics import SeasonStatistics
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+def build_season(teams, rounds=2, seed=1):
+    """return a league of teams teams of four playing rounds round-robins, all scored"""
+    rng = random.Random(seed)
+    oids = iter(range(1, 10 ** 9))
+    league = League(next(oids), f"{teams} team league")
+    for i in range(teams):
+        team = Team(next(oids), f"Team {i}")
+        for j in range(4):
+            team.add_member(TeamMember(next(oids), f"Member {i}-{j}", f"m{i}-{j}@curl.org"))
+        league.add_team(team)
+    start = datetime.datetime(2024, 1, 1, 19, 0)
+    slots = [start + datetime.timedelta(hours=3 * i) for i in range(rounds * teams * teams)]
+    competitions = RoundRobinScheduler(league, [f"Sheet {s}" for s in "ABCDEF"], slots, rounds).schedule(
+        lambda: next(oids))
+    for competition in competitions:
+        ends = []
+        for end in range(8):
+            points = rng.choice((0, 1, 1, 1, 2, 2, 3, 4))
+            ends.append((points, 0) if rng.random() < 0.5 else (0, points))
+        competition.record_result(ends)
+    league.add_competitions(competitions)
+    return league
+
+
+def naive_team_win_percentage(league):
+    won = {}
+    games = {}
+    for competition in league.competitions:
+        if competition.has_result:
+            winner = competition.winner()
+            for team in competition.teams_competing:
+                games[team] = games.get(team, 0) + 1
+                if winner is None:
+                    won[team] = won.get(team, 0) + 0.5
+                elif winner == team:
+                    won[team] = won.get(team, 0) + 1
+    return {team: won.get(team, 0) / count for team, count in games.items()}
+
+
+def naive_head_to_head(league):
+    wins = {}
+    for competition in league.competitions:
+        winner = competition.winner()
+        if winner is not None:
+            for loser in competition.teams_competing:
+                if loser is not winner:
+                    wins[(winner, loser)] = wins.get((winner, loser), 0) + 1
+    return wins
+
+
+def naive_scoring_distribution(league):
+    counts = {}
+    for competition in league.competitions:
+        if competition.has_result:
+            for end, scores in enumerate(competition.end_scores):
+                counts[(end, max(scores))] = counts.get((end, max(scores)), 0) + 1
+    return counts
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def run(teams):
+    league = build_season(teams)
+    build = timed(lambda: SeasonStatistics(league).close())
+    statistics = SeasonStatistics(league)
+    rows = [("build columns", build, None)]
+    for name, vectorized, naive in (
+            ("team win percentage", statistics.team_win_percentage, naive_team_win_percentage),
+            ("head to head", statistics.head_to_head, naive_head_to_head),
+            ("scoring by end", statistics.scoring_distribution, naive_scoring_distribution)):
+        rows.append((name, timed(vectorized), timed(naive, league)))
+    league.competitions[0].record_result([(1, 0)])
+    rows.append(("refresh one result", timed(statistics.refresh), None))
+    print(f"{teams} teams, {len(league.competitions)} games")
+    for name, vectorized, naive in rows:
+        line = f"  {name:<22}{vectorized * 1000:10.2f} ms"
+        if naive is not None:
+            with_build = vectorized + build
+            line += f"   with build {with_build * 1000:10.2f} ms   naive {naive * 1000:10.2f} ms" \
+                    f"   x{naive / vectorized:,.1f} (x{naive / with_build:,.2f} with build)"
+        print(line)
+
+
+if __name__ == '__main__':
+    for size in [int(arg) for arg in sys.argv[1:]] or [20, 60, 120]:
+        run(size)
@@ -0,0 +1,61 @@
+"""Reproducible synthetic databases for the benchmarks.
+
+The same arguments always give the same database: names, emails, which members are
+shared and which teams meet come from a random.Random seeded with seed.
+"""
+import datetime
+import random
+
+from src.league.competition import Competition
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+FIRST_NAMES = ["Fred", "Wilma", "Barney", "Betty", "Pebbles", "Bamm-Bamm", "Dino", "George", "Jane", "Judy",
+               "Elroy", "Astro", "Rosie", "Homer", "Marge", "Lisa", "Bart", "Maggie", "Ned", "Moe"]
+LAST_NAMES = ["Flintstone", "Rubble", "Slate", "Jetson", "Spacely", "Cogswell", "Simpson", "Flanders",
+              "Szyslak", "Gumble", "Van Houten", "Muntz", "Wiggum", "Skinner", "Krabappel", "Hibbert"]
+
+
+def generate(leagues=1, teams=10, members=4, competitions=0, shared_ratio=0.0, seed=1):
+    """return a LeagueDatabase (not the sole instance) holding leagues leagues of teams
+    teams of members members each, and competitions two-team competitions per league.
+    shared_ratio is the fraction of the places on the teams given to a member already on
+    another team (of any league) instead of a new member."""
+    rng = random.Random(seed)
+    db = LeagueDatabase()
+    everyone = []
+    start = datetime.datetime(2024, 1, 6, 19, 0)
+    for league_number in range(leagues):
+        league = League(db.next_oid(), f"League {league_number}")
+        league_teams = []
+        for team_number in range(teams):
+            team = Team(db.next_oid(), f"{rng.choice(LAST_NAMES)} {league_number}-{team_number}")
+            roster = []
+            emails = set()
+            for place in range(members):
+                member = None
+                if everyone and rng.random() < shared_ratio:
+                    candidate = rng.choice(everyone)
+                    if candidate.email not in emails:
+                        member = candidate
+                if member is None:
+                    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                    member = TeamMember(db.next_oid(), f"{first} {last}",
+                                        f"{first.lower()}.{last.lower().replace(' ', '')}{len(everyone)}@curl.org")
+                    everyone.append(member)
+                roster.append(member)
+                emails.add(member.email)
+            team.add_members(roster)
+            league_teams.append(team)
+        league.add_teams(league_teams)
+        games = []
+        for game in range(competitions if teams > 1 else 0):
+            home, away = rng.sample(league_teams, 2)
+            games.append(Competition(db.next_oid(), [home, away], f"Sheet {'ABCDEF'[game % 6]}",
+                                     start + datetime.timedelta(hours=2 * (game // 6))))
+        league.add_competitions(games)
+        db.add_league(league)
+    db.undo_log.clear()
+    return db
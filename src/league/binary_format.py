@@ -0,0 +1,259 @@
+import datetime as dt
+import struct
+from src.league.competition import Competition
+from src.league.exception_bad_file_format import BadFileFormat
+from src.league.league import League
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class BinaryFormat:
+    """Encodes a league, with its teams, members and competitions, as bytes and back,
+    without pickle: the bytes only hold strings and numbers, so they do not depend on
+    the classes' attributes or module paths and reading them runs no code.
+    A league is encoded on its own (see LeagueDatabase.save), as, in this order:
+      HEADER       the league's oid, name and reject_conflicts, then the counts below
+      strings      the length in characters of each string, then all of them as one UTF-8 block
+      members      MEMBER records of every member of the teams below
+      teams        TEAM records of the league's teams and of the teams of its competitions,
+                   then the oids of their members, team after team
+      league teams the oids of league.teams
+      competitions COMPETITION records, then the oids of their teams, then the scores of the
+                   ones with a result: for each, the end scores end after end, then the final scores
+    Numbers are little-endian. Objects refer to each other by oid and to strings by their
+    index in the strings (NONE for None). A date_time is in microseconds since EPOCH and
+    loses its tzinfo, a duration is in microseconds."""
+
+    VERSION = 2
+    """Version of the layout above. LeagueDatabase.FILE_MARK ends with it."""
+
+    NONE = 0xFFFFFFFF
+    """string reference standing for None"""
+
+    EPOCH = dt.datetime(1970, 1, 1)
+
+    HEADER = struct.Struct("<QIB9I")
+    """oid, name, reject_conflicts, then the number of strings, bytes of strings, members,
+    teams, team member oids, league teams, competitions, competition team oids and scores"""
+
+    MEMBER = struct.Struct("<QII")
+    """oid, name, email"""
+
+    TEAM = struct.Struct("<QII")
+    """oid, name, number of members"""
+
+    COMPETITION = struct.Struct("<QIBqqII")
+    """oid, location, flags (HAS_DATE_TIME, HAS_RESULT), date_time, duration,
+    number of teams, number of ends"""
+
+    HAS_DATE_TIME = 1
+    HAS_RESULT = 2
+
+    @classmethod
+    def write_league(cls, league):
+        """return the bytes encoding league. A name, email or location that is not a
+        str is written as its str(). Raises ValueError if two different teams, or two
+        different members, of the league have the same oid: objects are written once per
+        oid, so one of them would be lost."""
+        strings = {}
+        """string -> its index"""
+
+        def ref(text):
+            if text is None:
+                return cls.NONE
+            if type(text) is not str:
+                text = str(text)
+            index = strings.get(text)
+            if index is None:
+                index = strings[text] = len(strings)
+            return index
+
+        def collect(objects, obj):
+            kept = objects.setdefault(obj.oid, obj)
+            if kept is not obj:
+                raise ValueError(f"{kept.name!r} and {obj.name!r} in {league.name} have the same oid "
+                                 f"{obj.oid}, one of them would be lost.")
+
+        name = ref(league.name)
+        teams = {}
+        for team in league.teams:
+            collect(teams, team)
+        for competition in league.competitions:
+            for team in competition.teams_competing:
+                collect(teams, team)
+        members = {}
+        for team in teams.values():
+            for member in team.members:
+                collect(members, member)
+
+        member_part = b"".join(cls.MEMBER.pack(m.oid, ref(m.name), ref(m.email)) for m in members.values())
+        team_part = b"".join(cls.TEAM.pack(t.oid, ref(t.name), len(t.members)) for t in teams.values())
+        team_members = [member.oid for team in teams.values() for member in team.members]
+        league_teams = [team.oid for team in league.teams]
+        competition_records = []
+        competition_teams = []
+        scores = []
+        microseconds = {}
+        """date_time or duration -> it in microseconds, the competitions share few of them"""
+        for c in league.competitions:
+            flags = 0
+            date_time = c.date_time
+            if date_time is None:
+                date_time = 0
+            else:
+                flags = cls.HAS_DATE_TIME
+                date_time = microseconds.get(date_time)
+                if date_time is None:
+                    date_time = microseconds[c.date_time] = cls._microseconds(c.date_time.replace(tzinfo=None) - cls.EPOCH)
+            duration = microseconds.get(c.duration)
+            if duration is None:
+                duration = microseconds[c.duration] = cls._microseconds(c.duration)
+            ends = 0
+            if c.final_scores is not None:
+                flags |= cls.HAS_RESULT
+                ends = len(c.end_scores)
+                for end in c.end_scores:
+                    scores.extend(end)
+                scores.extend(c.final_scores)
+            teams_competing = c.teams_competing
+            competition_records.append(cls.COMPETITION.pack(c.oid, ref(c.location), flags, date_time, duration,
+                                                            len(teams_competing), ends))
+            competition_teams += [team.oid for team in teams_competing]
+
+        text = list(strings)
+        blob = "".join(text).encode("utf-8")
+        header = cls.HEADER.pack(league.oid, name, bool(league.reject_conflicts), len(text), len(blob),
+                                 len(members), len(teams), len(team_members), len(league_teams),
+                                 len(competition_records), len(competition_teams), len(scores))
+        return b"".join([header, cls._array("I", [len(s) for s in text]), blob,
+                         member_part, team_part, cls._array("Q", team_members), cls._array("Q", league_teams),
+                         b"".join(competition_records), cls._array("Q", competition_teams),
+                         cls._array("i", scores)])
+
+    @staticmethod
+    def _microseconds(delta):
+        return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+    @staticmethod
+    def _array(code, values):
+        return struct.pack(f"<{len(values)}{code}", *values)
+
+    @classmethod
+    def read_league(cls, data):
+        """return the League encoded in data by write_league(), marked saved.
+        Raises BadFileFormat if data is not such an encoding."""
+        return cls.build_league(cls.unpack_league(data))
+
+    @classmethod
+    def unpack_league(cls, data):
+        """return the records of the league encoded in data: its strings, numbers and
+        tuples of numbers, with no object made yet. build_league() makes the League.
+        Unpacking needs no class of the model, so it can run in another process
+        (see LeagueDatabase.read_shards) and send the records back.
+        Raises BadFileFormat if data is not such an encoding."""
+        try:
+            return cls._unpack_league(memoryview(data))
+        except (struct.error, UnicodeDecodeError) as e:
+            raise BadFileFormat(f"Not a league in binary format version {cls.VERSION}: {e}")
+
+    @classmethod
+    def build_league(cls, records):
+        """return the League of records returned by unpack_league(), marked saved.
+        Raises BadFileFormat if they do not describe a league."""
+        try:
+            return cls._build_league(*records)
+        except (IndexError, KeyError, TypeError, ValueError, OverflowError) as e:
+            raise BadFileFormat(f"Not a league in binary format version {cls.VERSION}: {e}")
+
+    @classmethod
+    def _unpack_league(cls, data):
+        header = cls.HEADER.unpack_from(data)
+        (oid, name, reject_conflicts, string_count, blob_size, member_count, team_count, team_member_count,
+         league_team_count, competition_count, competition_team_count, score_count) = header
+        offset = cls.HEADER.size
+        lengths = struct.unpack_from(f"<{string_count}I", data, offset)
+        offset += 4 * string_count
+        blob = str(data[offset:offset + blob_size], "utf-8")
+        offset += blob_size
+        strings = []
+        start = 0
+        for length in lengths:
+            strings.append(blob[start:start + length])
+            start += length
+
+        def part(record, count):
+            nonlocal offset
+            end = offset + record.size * count
+            records = list(record.iter_unpack(data[offset:end]))
+            offset = end
+            return records
+
+        def array(code, count):
+            nonlocal offset
+            values = struct.unpack_from(f"<{count}{code}", data, offset)
+            offset += struct.calcsize(f"<{count}{code}")
+            return values
+
+        return (header, strings, part(cls.MEMBER, member_count), part(cls.TEAM, team_count),
+                array("Q", team_member_count), array("Q", league_team_count),
+                part(cls.COMPETITION, competition_count), array("Q", competition_team_count),
+                array("i", score_count))
+
+    @classmethod
+    def _build_league(cls, header, texts, member_records, team_records, team_members, league_teams,
+                      competition_records, competition_teams, scores):
+        oid, name, reject_conflicts = header[:3]
+        strings = dict(enumerate(texts))
+        strings[cls.NONE] = None
+        members = {}
+        for member_oid, member_name, email in member_records:
+            if member_oid in members:
+                raise ValueError(f"member oid {member_oid} is there twice")
+            members[member_oid] = TeamMember(member_oid, strings[member_name], strings[email])
+        teams = {}
+        start = 0
+        for team_oid, team_name, size in team_records:
+            if team_oid in teams:
+                raise ValueError(f"team oid {team_oid} is there twice")
+            team = teams[team_oid] = Team(team_oid, strings[team_name])
+            team._members = [members[member_oid] for member_oid in team_members[start:start + size]]
+            start += size
+            for member in team._members:
+                member.add_observer(team)
+
+        league = League(oid, strings[name])
+        league.reject_conflicts = bool(reject_conflicts)
+        league._teams = [teams[team_oid] for team_oid in league_teams]
+        for team in league._teams:
+            team.add_observer(league)
+
+        date_times = {}
+        durations = {}
+        """the competitions of a league share few date_times and durations, make each once"""
+        start = 0
+        score = 0
+        for competition_oid, location, flags, date_time, duration, size, ends in competition_records:
+            if flags & cls.HAS_DATE_TIME:
+                microseconds = date_time
+                date_time = date_times.get(microseconds)
+                if date_time is None:
+                    date_time = date_times[microseconds] = cls.EPOCH + dt.timedelta(microseconds=microseconds)
+            else:
+                date_time = None
+            microseconds = duration
+            duration = durations.get(microseconds)
+            if duration is None:
+                duration = durations[microseconds] = dt.timedelta(microseconds=microseconds)
+            competition = Competition(competition_oid, [teams[t] for t in competition_teams[start:start + size]],
+                                      strings[location], date_time, duration)
+            start += size
+            if flags & cls.HAS_RESULT:
+                competition._end_scores = [tuple(scores[score + i * size:score + (i + 1) * size])
+                                           for i in range(ends)]
+                score += ends * size
+                competition._final_scores = tuple(scores[score:score + size])
+                score += size
+            league._competitions.append(competition)
+            competition.add_observer(league)
+        league.mark_saved()
+        return league
@@ -1,28 +1,150 @@
-from src.league.identified_object import IdentifiedObject
+from src.league.identified_object import IdentifiedObject, changing
 import datetime as dt
 
 
 class Competition(IdentifiedObject):
 
-    def __init__(self, oid, teams, location, datetime=None):
+    DEFAULT_DURATION = dt.timedelta(hours=2)
+    """How long a competition lasts when no duration is given."""
+
+    def __init__(self, oid, teams, location, datetime=None, duration=None):
         """initialization method that sets the oid, teams,
         location and date_time properties as specified in
         the arguments (note: should call superclass constructor).
           Note: teams should be a list.
         The date_time should be datetime objects (not a string!)
-        indicating when the competition will begin."""
+        indicating when the competition will begin.
+        duration is a timedelta, DEFAULT_DURATION if not given."""
         super().__init__(oid)
         self._teams_competing = teams
-        self.location = location
-        if datetime is None or type(datetime) == type(dt.datetime.now()):
-            self.date_time = datetime
+        self._location = location
+        if datetime is None or type(datetime) == dt.datetime:
+            self._date_time = datetime
         else:
-            self.date_time = None
+            self._date_time = None
+        self._duration = self.DEFAULT_DURATION if duration is None else duration
+        self._end_scores = None
+        self._final_scores = None
+
+    def __setstate__(self, state):
+        # older files stored location and date_time as plain attributes and had no duration or result
+        for attribute in ("location", "date_time"):
+            if attribute in state:
+                state["_" + attribute] = state.pop(attribute)
+        state.setdefault("_duration", self.DEFAULT_DURATION)
+        state.setdefault("_end_scores", None)
+        state.setdefault("_final_scores", None)
+        super().__setstate__(state)
 
     @property
     def teams_competing(self):
         return self._teams_competing
 
+    @property
+    def location(self):
+        return self._location
+
+    @location.setter
+    @changing
+    def location(self, location):
+        old = self._location
+        self._location = location
+        self._changed("location", old=old)
+
+    @property
+    def date_time(self):
+        return self._date_time
+
+    @date_time.setter
+    @changing
+    def date_time(self, date_time):
+        old = self._date_time
+        self._date_time = date_time if isinstance(date_time, dt.datetime) else None
+        self._changed("date_time", old=old)
+
+    @property
+    def duration(self):
+        return self._duration
+
+    @duration.setter
+    @changing
+    def duration(self, duration):
+        old = self._duration
+        self._duration = duration
+        self._changed("duration", old=old)
+
+    @property
+    def end_time(self):
+        """when the competition is over, or None if date_time is None"""
+        if self.date_time is None:
+            return None
+        return self.date_time + self.duration
+
+    @property
+    def end_scores(self):
+        """list with a tuple of the teams' scores (in teams_competing order) for each end,
+        or None if no result has been recorded"""
+        return self._end_scores
+
+    @property
+    def final_scores(self):
+        """tuple of the teams' final scores (in teams_competing order),
+        or None if no result has been recorded"""
+        return self._final_scores
+
+    @property
+    def has_result(self):
+        return self._final_scores is not None
+
+    @changing
+    def record_result(self, end_scores, final_scores=None):
+        """record (or correct) the result. end_scores is a list with, for each end, the
+        scores of the teams in teams_competing order. final_scores defaults to the sum of
+        the ends and can be given when it differs (a conceded game for example).
+        Raises ValueError if a score is negative or the number of scores is not the
+        number of teams."""
+        teams = len(self.teams_competing)
+        end_scores = [tuple(end) for end in end_scores]
+        final_scores = tuple(final_scores) if final_scores is not None else \
+            tuple(sum(end[i] for end in end_scores) for i in range(teams))
+        for scores in end_scores + [final_scores]:
+            if len(scores) != teams or any(score < 0 for score in scores):
+                raise ValueError(f"Scores {scores} do not fit the {teams} teams of {self}.")
+        old = (self._end_scores, self._final_scores)
+        self._end_scores = end_scores
+        self._final_scores = final_scores
+        self._changed("result", old=old)
+
+    @changing
+    def clear_result(self):
+        """forget the recorded result, if any"""
+        if self.has_result:
+            old = (self._end_scores, self._final_scores)
+            self._end_scores = None
+            self._final_scores = None
+            self._changed("result", old=old)
+
+    def winner(self):
+        """return the team with the highest final score, or None if there is
+        no result or the game is tied"""
+        if not self.has_result:
+            return None
+        best = max(self._final_scores)
+        if self._final_scores.count(best) > 1:
+            return None
+        return self.teams_competing[self._final_scores.index(best)]
+
+    def members(self):
+        """return the members of all the teams in this competition, each one once"""
+        members = []
+        seen = set()
+        for team in self.teams_competing:
+            for member in team.members:
+                if member not in seen:
+                    seen.add(member)
+                    members.append(member)
+        return members
+
     def send_email(self, emailer, subject, message):
         """use the emailer argument to email all members of all
         teams in this competition without duplicates.  That is,
@@ -35,10 +157,11 @@ class Competition(IdentifiedObject):
         distinct.  If the teams have S "shared" members
         then we'd expect a single email with N+M-S recipients."""
         recipients = []
-        for team in self.teams_competing:
-            for member in team.members:
-                if member.email not in recipients:
-                    recipients.append(member.email)
+        seen = set()
+        for member in self.members():
+            if member.email not in seen:
+                seen.add(member.email)
+                recipients.append(member.email)
         emailer.send_plain_email(recipients, subject, message)
 
     def __str__(self):
@@ -0,0 +1,114 @@
+from bisect import bisect_left, insort
+from itertools import count
+
+
+class CompetitionIndex:
+    """Sorted indexes over the competitions of a league, one by date_time and one
+    per location (by date_time within the location). Range queries bisect to the
+    first competition and return generators, so asking for the next few games does
+    not go through, or copy, the whole season.
+    Entries are (date_time, oid, number, competition) tuples, number counting the
+    entries made, so two competitions with the same oid and date_time (a database
+    merge can bring a second one) are ordered without comparing the competitions.
+    Competitions without a date_time are kept apart, see undated()."""
+
+    def __init__(self, competitions=()):
+        self._by_time = []
+        """sorted list of (date_time, oid, number, competition)"""
+        self._by_location = {}
+        """location -> sorted list of (date_time, oid, number, competition)"""
+        self._numbers = count()
+        self._undated = {}
+        """location -> {oid: competition} for the competitions without a date_time"""
+        for competition in competitions:
+            if competition.date_time is None:
+                self._undated.setdefault(competition.location, {})[competition.oid] = competition
+            else:
+                entry = (competition.date_time, competition.oid, next(self._numbers), competition)
+                self._by_time.append(entry)
+                self._by_location.setdefault(competition.location, []).append(entry)
+        self._by_time.sort(key=lambda e: e[:3])
+        for entries in self._by_location.values():
+            entries.sort(key=lambda e: e[:3])
+
+    def __len__(self):
+        return len(self._by_time) + sum(len(c) for c in self._undated.values())
+
+    def add(self, competition, location=None, date_time=None, moved=False):
+        """add competition to the indexes. When moved is True, location and date_time
+        are used instead of the competition's own (used to undo a move)."""
+        if not moved:
+            location, date_time = competition.location, competition.date_time
+        if date_time is None:
+            self._undated.setdefault(location, {})[competition.oid] = competition
+        else:
+            entry = (date_time, competition.oid, next(self._numbers), competition)
+            insort(self._by_time, entry)
+            insort(self._by_location.setdefault(location, []), entry)
+
+    def remove(self, competition, location=None, date_time=None, moved=False):
+        """remove competition from the indexes. When moved is True, the competition
+        is looked for under the given location and date_time, its values before a move."""
+        if not moved:
+            location, date_time = competition.location, competition.date_time
+        if date_time is None:
+            undated = self._undated.get(location, {})
+            undated.pop(competition.oid, None)
+            if not undated:
+                self._undated.pop(location, None)
+            return
+        self._remove_entry(self._by_time, date_time, competition)
+        entries = self._by_location.get(location)
+        if entries is not None:
+            self._remove_entry(entries, date_time, competition)
+            if not entries:
+                del self._by_location[location]
+
+    @staticmethod
+    def _remove_entry(entries, date_time, competition):
+        i = bisect_left(entries, (date_time, competition.oid))
+        while i < len(entries) and entries[i][:2] == (date_time, competition.oid):
+            if entries[i][3] is competition:
+                del entries[i]
+                return
+            i += 1
+
+    def competition_moved(self, competition, event, old):
+        """keep the indexes right after the location or date_time of competition
+        changed from old to its current value"""
+        if event == "location":
+            self.remove(competition, old, competition.date_time, moved=True)
+        else:
+            self.remove(competition, competition.location, old, moved=True)
+        self.add(competition)
+
+    @staticmethod
+    def _between(entries, start, end):
+        i = 0 if start is None else bisect_left(entries, (start,))
+        while i < len(entries):
+            date_time, oid, number, competition = entries[i]
+            if end is not None and date_time >= end:
+                return
+            yield competition
+            i += 1
+
+    def between(self, start=None, end=None):
+        """generate the competitions with start <= date_time < end in date_time order.
+        start or end may be None for no limit on that side."""
+        return self._between(self._by_time, start, end)
+
+    def at(self, location, start=None, end=None):
+        """generate the competitions at location with start <= date_time < end in date_time order"""
+        return self._between(self._by_location.get(location, []), start, end)
+
+    def locations(self):
+        """return the sorted list of the locations of the competitions"""
+        return sorted(set(self._by_location) | set(self._undated), key=str)
+
+    def undated(self, location=None):
+        """generate the competitions without a date_time (at location if it is given)"""
+        if location is not None:
+            yield from self._undated.get(location, {}).values()
+        else:
+            for competitions in self._undated.values():
+                yield from competitions.values()
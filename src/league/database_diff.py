@@ -0,0 +1,85 @@
+"""Compare two LeagueDatabases object by object.
+
+Run from the repository root:  python -m src.league.database_diff old.dat new.dat
+"""
+import sys
+
+from src.league.league_database import LeagueDatabase
+
+
+def records(db):
+    """return {(kind, oid): record} for every object of db, kind being "database",
+    "league", "team", "member" or "competition". A record is a dict of the object's
+    values, with the objects it holds replaced by their oids, so two databases can be
+    compared with dict lookups. A team or member held by several containers is one record."""
+    result = {("database", 0): {"leagues": tuple(league.oid for league in db.leagues)}}
+    for league in db.leagues:
+        result[("league", league.oid)] = {"name": league.name,
+                                          "teams": tuple(team.oid for team in league.teams),
+                                          "competitions": tuple(c.oid for c in league.competitions)}
+        for team in league.teams:
+            key = ("team", team.oid)
+            if key in result:
+                continue
+            result[key] = {"name": team.name, "members": tuple(member.oid for member in team.members)}
+            for member in team.members:
+                result[("member", member.oid)] = {"name": member.name, "email": member.email}
+        for competition in league.competitions:
+            result[("competition", competition.oid)] = {
+                "teams_competing": tuple(team.oid for team in competition.teams_competing),
+                "location": competition.location, "date_time": competition.date_time,
+                "duration": competition.duration, "end_scores": competition.end_scores,
+                "final_scores": competition.final_scores}
+    return result
+
+
+def changed_fields(old, new):
+    """return {field: (old value, new value)} for the fields that differ between two records"""
+    return {field: (old.get(field), new.get(field))
+            for field in old.keys() | new.keys() if old.get(field) != new.get(field)}
+
+
+class DatabaseDiff:
+    """The differences between two databases, objects being matched by kind and oid
+    (like IdentifiedObject.__eq__). One pass over each database and one dict lookup
+    per object.
+      added    [(kind, oid, record)] of the objects only in new
+      removed  [(kind, oid, record)] of the objects only in old
+      changed  [(kind, oid, {field: (old value, new value)})] of the objects in both
+    The lists are in the order the objects are met in new (old for removed), leagues first.
+    See records() for what a record holds."""
+
+    def __init__(self, old, new):
+        old_records = old if isinstance(old, dict) else records(old)
+        new_records = new if isinstance(new, dict) else records(new)
+        self.added = []
+        self.removed = []
+        self.changed = []
+        for key, record in new_records.items():
+            old_record = old_records.get(key)
+            if old_record is None:
+                self.added.append(key + (record,))
+            elif old_record != record:
+                self.changed.append(key + (changed_fields(old_record, record),))
+        for key, record in old_records.items():
+            if key not in new_records:
+                self.removed.append(key + (record,))
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self):
+        """one line per difference: + added, - removed, ~ changed"""
+        lines = []
+        for kind, oid, record in self.added:
+            lines.append(f"+ {kind} {oid} {record}")
+        for kind, oid, record in self.removed:
+            lines.append(f"- {kind} {oid} {record}")
+        for kind, oid, fields in self.changed:
+            lines.append(f"~ {kind} {oid} " + ", ".join(f"{field}: {old!r} -> {new!r}"
+                                                        for field, (old, new) in sorted(fields.items())))
+        return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    print(DatabaseDiff(LeagueDatabase.read(sys.argv[1]), LeagueDatabase.read(sys.argv[2])) or "No differences.")
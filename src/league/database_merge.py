@@ -0,0 +1,230 @@
+"""Three-way merge of LeagueDatabases edited apart from a common ancestor.
+
+Run from the repository root:  python -m src.league.database_merge base.dat ours.dat theirs.dat merged.dat
+"""
+import sys
+
+from src.league.competition import Competition
+from src.league.database_diff import records
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class MergeConflict:
+    """A value both sides changed differently, or an object one side removed and the
+    other changed. The merge keeps resolution; base, ours and theirs are the values
+    (None when the object is missing on that side)."""
+
+    def __init__(self, kind, oid, field, base, ours, theirs, resolution):
+        self.kind = kind
+        self.oid = oid
+        self.field = field
+        self.base = base
+        self.ours = ours
+        self.theirs = theirs
+        self.resolution = resolution
+
+    def __str__(self):
+        what = f"{self.kind} {self.oid}" + (f" {self.field}" if self.field else "")
+        return f"{what}: base {self.base!r}, ours {self.ours!r}, theirs {self.theirs!r}; kept {self.resolution}"
+
+
+class DatabaseMerge:
+    """Merges ours and theirs, two databases edited from base. Objects are matched by
+    kind and oid, a change made on one side only is taken, and a value both sides
+    changed differently is a conflict resolved in favour of ours. Lists (the leagues of
+    the database, the teams and competitions of a league, the members of a team) are
+    merged by what each side added and removed, so both sides can add to the same team.
+    An object removed on one side and changed on the other is kept, as a conflict.
+    Linear in the number of objects: records() of each database and dict lookups.
+      merged     the merged LeagueDatabase (not the sole instance)
+      conflicts  the MergeConflicts, including the values the merged database refused
+                 (a duplicated email, a competition whose team is no longer in its league)"""
+
+    LISTS = {"leagues": "league", "teams": "team", "members": "member", "competitions": "competition"}
+    """fields holding the oids of the objects a container holds -> the kind of those objects"""
+
+    HELD = dict(LISTS, teams_competing="team")
+    """fields holding the oids of objects a merged object needs -> the kind of those objects"""
+
+    def __init__(self, base, ours, theirs):
+        self.conflicts = []
+        self._kept = []
+        """keys of the objects one side removed and the other changed"""
+        base_records, our_records, their_records = records(base), records(ours), records(theirs)
+        merged = {}
+        for key in list(our_records) + [k for k in their_records if k not in our_records] + \
+                [k for k in base_records if k not in our_records and k not in their_records]:
+            record = self._merge_record(key, base_records.get(key), our_records.get(key), their_records.get(key))
+            if record is not None:
+                merged[key] = record
+        merged_holders = self._index_holders(merged)
+        source_holders = [self._index_holders(source) for source in (their_records, our_records, base_records)]
+        self._put_back_kept(merged, merged_holders, source_holders)
+        self._keep_held(merged, (our_records, their_records, base_records), merged_holders, source_holders)
+        self.merged = self._build(merged, max(base._last_oid, ours._last_oid, theirs._last_oid))
+
+    def _conflict(self, key, field, base, ours, theirs, resolution):
+        self.conflicts.append(MergeConflict(key[0], key[1], field, base, ours, theirs, resolution))
+
+    def _merge_record(self, key, base, ours, theirs):
+        if base is None:
+            if ours is None or theirs is None:
+                return ours if theirs is None else theirs
+            base = {}
+        elif ours is None or theirs is None:
+            kept = theirs if ours is None else ours
+            if kept is None or kept == base:
+                return None
+            self._conflict(key, None, base, ours, theirs, "theirs" if ours is None else "ours")
+            self._kept.append(key)
+            return kept
+        record = {}
+        for field in ours.keys() | theirs.keys():
+            b, o, t = base.get(field), ours.get(field), theirs.get(field)
+            if field in self.LISTS:
+                record[field] = self._merge_list(b or (), o or (), t or ())
+            elif o == t or t == b:
+                record[field] = o
+            elif o == b:
+                record[field] = t
+            else:
+                self._conflict(key, field, b, o, t, "ours")
+                record[field] = o
+        return record
+
+    def _index_holders(self, records):
+        """return {(kind, oid): keys of the records whose lists hold that object}"""
+        holders = {}
+        for key, record in records.items():
+            for field, kind in self.LISTS.items():
+                for oid in record.get(field, ()):
+                    holders.setdefault((kind, oid), []).append(key)
+        return holders
+
+    def _put_back(self, key, merged, merged_holders, source_holders):
+        """put the object key back in the containers that held it on the first of the
+        sources where one did, unless a merged container still holds it"""
+        if merged_holders.get(key):
+            return
+        for holders in source_holders:
+            if key in holders:
+                field = key[0] + "s"
+                for holder in holders[key]:
+                    if holder in merged:
+                        merged[holder] = dict(merged[holder], **{field: merged[holder][field] + (key[1],)})
+                        merged_holders.setdefault(key, []).append(holder)
+                return
+
+    def _put_back_kept(self, merged, merged_holders, source_holders):
+        """put the objects kept by a delete/change conflict back in the containers that
+        held them on the side that changed them"""
+        for key in self._kept:
+            self._put_back(key, merged, merged_holders, source_holders)
+
+    def _keep_held(self, merged, sources, merged_holders, source_holders):
+        """put back the objects a merged object still holds or plays with but that one
+        side removed: the members of a team kept as a conflict, or a team of a competition
+        kept as a conflict, which goes back in its league too"""
+        pending = list(merged.items())
+        while pending:
+            key, record = pending.pop()
+            for field, oids in record.items():
+                kind = self.HELD.get(field)
+                if kind is None:
+                    continue
+                for oid in oids:
+                    held = (kind, oid)
+                    if held in merged:
+                        continue
+                    for source in sources:
+                        if held in source:
+                            merged[held] = source[held]
+                            pending.append((held, source[held]))
+                            break
+                    else:
+                        continue
+                    if field == "teams_competing":
+                        self._conflict(held, None, None, None, None, f"kept for {key[0]} {key[1]}")
+                        self._put_back(held, merged, merged_holders, source_holders)
+
+    @staticmethod
+    def _merge_list(base, ours, theirs):
+        """ours, without what theirs removed from base, followed by what theirs added"""
+        base_set, our_set, their_set = set(base), set(ours), set(theirs)
+        removed = base_set - their_set
+        merged = [oid for oid in ours if oid not in removed]
+        merged += [oid for oid in theirs if oid not in base_set and oid not in our_set]
+        return tuple(merged)
+
+    def _build(self, merged, last_oid):
+        """make the LeagueDatabase of the merged records"""
+        members = {oid: TeamMember(oid, r["name"], r["email"])
+                   for (kind, oid), r in merged.items() if kind == "member"}
+        teams = {}
+        for (kind, oid), r in merged.items():
+            if kind == "team":
+                team = teams[oid] = Team(oid, r["name"])
+                self._add_all(("team", oid), team.check_members, team.add_members,
+                              self._existing(("team", oid), "members", r["members"], members))
+        db = LeagueDatabase()
+        db._last_oid = last_oid
+        for oid in merged[("database", 0)]["leagues"]:
+            r = merged.get(("league", oid))
+            if r is None:
+                continue
+            league = League(oid, r["name"])
+            self._add_all(("league", oid), league.check_teams, league.add_teams,
+                          self._existing(("league", oid), "teams", r["teams"], teams))
+            competitions = []
+            for competition_oid in r["competitions"]:
+                c = merged.get(("competition", competition_oid))
+                if c is None:
+                    self._conflict(("league", oid), "competitions", None, competition_oid, None, "without it")
+                    continue
+                competition = Competition(competition_oid,
+                                          self._existing(("competition", competition_oid), "teams_competing",
+                                                         c["teams_competing"], teams),
+                                          c["location"], c["date_time"], c["duration"])
+                if c["final_scores"] is not None:
+                    try:
+                        competition.record_result(c["end_scores"], c["final_scores"])
+                    except ValueError as e:
+                        self._conflict(("competition", competition_oid), "final_scores", None,
+                                       c["final_scores"], None, f"without it ({e})")
+                competitions.append(competition)
+            self._add_all(("league", oid), league.check_competitions, league.add_competitions, competitions)
+            db.add_league(league)
+        db.undo_log.clear()
+        return db
+
+    def _existing(self, key, field, oids, objects):
+        """the objects for oids, leaving out (as conflicts) the ones the merge removed"""
+        found = []
+        for oid in oids:
+            obj = objects.get(oid)
+            if obj is None:
+                self._conflict(key, field, None, oid, None, "without it")
+            else:
+                found.append(obj)
+        return found
+
+    def _add_all(self, key, check, add, items):
+        """add the items that check accepts, the others are conflicts"""
+        rejected = {id(item): problem for item, problem in check(items)}
+        for item in items:
+            if id(item) in rejected:
+                self._conflict(key, None, None, item.oid, None, f"without it ({rejected[id(item)]})")
+        add([item for item in items if id(item) not in rejected])
+
+
+if __name__ == '__main__':
+    base_file, ours_file, theirs_file, merged_file = sys.argv[1:5]
+    merge = DatabaseMerge(LeagueDatabase.read(base_file), LeagueDatabase.read(ours_file),
+                          LeagueDatabase.read(theirs_file))
+    for conflict in merge.conflicts:
+        print(f"Conflict: {conflict}")
+    merge.merged.save(merged_file)
+    print(f"Merged into {merged_file} with {len(merge.conflicts)} conflict(s).")
@@ -0,0 +1,156 @@
+from src.league.identified_object import CHANGES
+from src.league.list_positions import put_in, take_out
+
+
+class DatabaseSnapshot:
+    """A frozen view of a LeagueDatabase as it was when the snapshot was taken, for
+    exports, email broadcasts and statistics that read the whole database while it
+    keeps changing (see LeagueDatabase.snapshot).
+    Taking a snapshot copies nothing: the snapshot listens to the database and, the
+    first time a field (a name, an email, a competition's location, date_time, duration
+    or result) changes after it was taken, keeps what it was before. For a list (the
+    leagues, a league's teams or competitions, a team's members) it keeps the events
+    of its changes, which say how to reverse them, as for UndoLog. Everything not
+    changed is read from the objects themselves, so the snapshot holds only what
+    changed since it was taken.
+      with db.snapshot() as snapshot:
+          for team in snapshot.teams(league):
+              for member in snapshot.members(team):
+                  snapshot.get(member, "email")
+    The lists are returned as tuples, safe to iterate while the database changes.
+    An object removed after the snapshot was taken (a member taken off a team, a team
+    and its members taken out of a league...) no longer reaches the database with its
+    changes, so the snapshot follows it itself until it is closed.
+    A snapshot can be read on any thread while the database changes on another: the
+    model's changes hold CHANGES until their events are delivered (see changing), and
+    the snapshot reads what it does not keep from the objects while holding it, so it
+    never sees a change before its event. Changes made directly to the lists, without
+    an event (IntegrityChecker repairs), are not seen. Call close() (or leave the with
+    block) to stop following the database.
+    Costs: a field change keeps one value, a list change keeps its event, O(1) for the
+    writer. Reading a list copies it, O(list size), while holding CHANGES; the first read
+    of a list that changed then undoes its changes on the copy, O(list size + changes),
+    and keeps the result for the next reads."""
+
+    LISTS = {"member_added": "members", "members_added": "members", "member_removed": "members",
+             "members_removed": "members",
+             "team_added": "teams", "teams_added": "teams", "team_removed": "teams", "teams_removed": "teams",
+             "competition_added": "competitions", "competitions_added": "competitions",
+             "competition_removed": "competitions", "competitions_removed": "competitions",
+             "league_added": "leagues", "league_removed": "leagues"}
+    """list event -> the list of the source it changed"""
+
+    FIELDS = ("name", "email", "location", "date_time", "duration", "result")
+
+    def __init__(self, db):
+        self._db = db
+        self._lists = {}
+        """(id(object), list name) -> (object, the (event, details) of the list's changes
+        since the snapshot was taken, in order, until the list is read)"""
+        self._frozen = {}
+        """(id(object), list name) -> tuple of the list when the snapshot was taken, for
+        the changed lists that were read"""
+        self._fields = {}
+        """(id(object), field) -> (object, value when the snapshot was taken)"""
+        self._followed = []
+        """the objects removed from the database since, whose changes the snapshot follows"""
+        with CHANGES:
+            db.add_listener(self)
+
+    def close(self):
+        """stop following the database, the snapshot must not be read after this"""
+        with CHANGES:
+            self._db.remove_listener(self)
+            for obj in self._followed:
+                obj.remove_observer(self)
+            self._followed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def changes(self):
+        """number of lists and fields kept because they changed since the snapshot was taken"""
+        with CHANGES:
+            return len(self._lists) + len(self._fields)
+
+    def leagues(self):
+        return self._list(self._db, "leagues")
+
+    def teams(self, league):
+        return self._list(league, "teams")
+
+    def competitions(self, league):
+        return self._list(league, "competitions")
+
+    def members(self, team):
+        return self._list(team, "members")
+
+    def get(self, obj, field):
+        """the value of field of obj when the snapshot was taken. For "result" it is
+        (end_scores, final_scores) of a competition."""
+        with CHANGES:
+            kept = self._fields.get((id(obj), field))
+            if kept is not None:
+                return kept[1]
+            if field == "result":
+                return obj.end_scores, obj.final_scores
+            return getattr(obj, field)
+
+    def _list(self, obj, name):
+        key = (id(obj), name)
+        with CHANGES:
+            frozen = self._frozen.get(key)
+            if frozen is not None:
+                return frozen
+            items = list(getattr(obj, name))
+            changed = self._lists.get(key)
+            if changed is None:
+                return tuple(items)
+            changes = list(changed[1])
+        # the changes are undone without holding CHANGES, the writer goes on meanwhile
+        for event, details in reversed(changes):
+            self._undo(items, name, event, details)
+        frozen = tuple(items)
+        with CHANGES:
+            self._frozen[key] = frozen
+            self._lists[key] = (obj, [])
+        return frozen
+
+    def object_changed(self, source, event, details):
+        """keep what source was before the change, if this is its first change since
+        the snapshot was taken, and follow the objects it removes. Called holding CHANGES,
+        by the change. A change reaching the snapshot through several containers is kept
+        once."""
+        if event in self.FIELDS:
+            self._fields.setdefault((id(source), event), (source, details["old"]))
+        elif event in self.LISTS:
+            name = self.LISTS[event]
+            changes = self._lists.setdefault((id(source), name), (source, []))[1]
+            if (id(source), name) not in self._frozen and (not changes or changes[-1][1] is not details):
+                changes.append((event, details))
+            if event == name + "_removed":
+                removed = details[name]
+            elif event.endswith("_removed"):
+                removed = [details[event[:-len("_removed")]]]
+            else:
+                removed = []
+            for obj in removed:
+                obj.add_observer(self)
+                self._followed.append(obj)
+
+    @staticmethod
+    def _undo(items, name, event, details):
+        """make items, the list name, what it was before event, which added or removed
+        one object at details["index"], or a batch at details["indexes"]"""
+        if event == name + "_added":
+            take_out(items, details[name], details["indexes"])
+        elif event == name + "_removed":
+            put_in(items, details[name], details["indexes"])
+        elif event.endswith("_added"):
+            del items[details["index"]]
+        else:
+            items.insert(details["index"], details[event[:-len("_removed")]])
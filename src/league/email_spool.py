@@ -0,0 +1,186 @@
+"""Outbound email kept on disk until every recipient has been sent it.
+
+Run from the repository root:
+  python -m src.league.email_spool spool_dir                      list the jobs and their state
+  python -m src.league.email_spool spool_dir send host port from  deliver the queued jobs by SMTP
+"""
+import itertools
+import json
+import os
+import smtplib
+import sys
+import time
+
+
+class SpooledJob:
+    """The status of one message of an EmailSpool.
+      state       "queued", "sending" (some recipients done) or "done"
+      recipients  the addresses, in order
+      results     for each recipient, None while pending, "sent", or the reason it failed"""
+
+    def __init__(self, job_id, state, subject, message, recipients, results):
+        self.job_id = job_id
+        self.state = state
+        self.subject = subject
+        self.message = message
+        self.recipients = recipients
+        self.results = results
+
+    @property
+    def pending(self):
+        return [r for r, result in zip(self.recipients, self.results) if result is None]
+
+    @property
+    def sent(self):
+        return [r for r, result in zip(self.recipients, self.results) if result == EmailSpool.SENT]
+
+    @property
+    def failed(self):
+        """(recipient, reason) of the recipients that could not be sent the message"""
+        return [(r, result) for r, result in zip(self.recipients, self.results)
+                if result is not None and result != EmailSpool.SENT]
+
+    def __str__(self):
+        return f"{self.job_id} {self.state}: {self.subject!r}, {len(self.sent)} sent, " \
+               f"{len(self.failed)} failed, {len(self.pending)} pending"
+
+
+class EmailSpool:
+    """A queue of outbound messages in a directory, laid out like a maildir:
+      tmp/   jobs being written
+      new/   jobs waiting to be sent
+      cur/   jobs being sent, each with a .state file
+      done/  jobs sent to every recipient (or failed for good), with their .state file
+    A job is a JSON file with the subject, message and recipients. It is written in tmp
+    and renamed into new, so a job is either queued whole or not at all.
+    The spool has the send_plain_email of an emailer, so Team.send_email(spool, ...) and
+    Competition.send_email(spool, ...) queue a job instead of sending. drain() then
+    sends the jobs with a real emailer, one recipient at a time, and appends each
+    recipient's result to the job's .state file (flushed to disk) before going on, so
+    a drain stopped at any point (even by a crash) resumes with the next recipient.
+    A recipient whose message reached the server just before a crash, with its result
+    not yet recorded, is sent it again: at most one per job.
+    Only one drain should run at a time on a spool."""
+
+    SENT = "sent"
+
+    def __init__(self, directory):
+        self.directory = directory
+        for sub in ("tmp", "new", "cur", "done"):
+            os.makedirs(os.path.join(directory, sub), exist_ok=True)
+        self._counter = itertools.count()
+
+    def _path(self, sub, name):
+        return os.path.join(self.directory, sub, name)
+
+    def send_plain_email(self, recipients, subject, message):
+        """queue message for recipients (email addresses) and return the id of the job"""
+        job_id = f"{time.time_ns()}.{os.getpid()}.{next(self._counter)}"
+        name = job_id + ".json"
+        with open(self._path("tmp", name), "w", encoding="utf-8") as f:
+            json.dump({"subject": subject, "message": message, "recipients": list(recipients)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self._path("tmp", name), self._path("new", name))
+        return job_id
+
+    def jobs(self, include_done=False):
+        """return the ids of the jobs not yet done (or of all with include_done), oldest first"""
+        subs = ("cur", "new", "done") if include_done else ("cur", "new")
+        ids = [name[:-5] for sub in subs for name in os.listdir(os.path.join(self.directory, sub))
+               if name.endswith(".json")]
+        return sorted(ids, key=lambda job_id: tuple(int(part) for part in job_id.split(".")))
+
+    def status(self, job_id):
+        """return the SpooledJob for job_id, or None if there is no such job"""
+        for sub, state in (("done", "done"), ("cur", "sending"), ("new", "queued")):
+            try:
+                with open(self._path(sub, job_id + ".json"), encoding="utf-8") as f:
+                    job = json.load(f)
+            except FileNotFoundError:
+                continue
+            return SpooledJob(job_id, state, job["subject"], job["message"], job["recipients"],
+                              self._results(sub, job_id, len(job["recipients"])))
+        return None
+
+    def _results(self, sub, job_id, count):
+        """the result of each recipient from the .state file: lines of "index result".
+        A last line cut short by a crash is ignored, that recipient is still pending."""
+        results = [None] * count
+        try:
+            with open(self._path(sub, job_id + ".state"), encoding="utf-8") as f:
+                for line in f:
+                    if line.endswith("\n"):
+                        index, result = line[:-1].split(" ", 1)
+                        results[int(index)] = result
+        except FileNotFoundError:
+            pass
+        return results
+
+    def drain(self, emailer, limit=None):
+        """send the queued jobs with emailer (anything with send_plain_email, such as
+        Emailer or SmtpEmailer), the ones already started first, and return how many
+        messages were sent. Stops after limit messages if given.
+        A recipient the server refuses (smtplib.SMTPRecipientsRefused or a 5xx reply) is
+        recorded as failed. Any other error stops the drain and is raised; the recipient
+        stays pending for the next drain."""
+        sent = 0
+        for job_id in self.jobs():
+            name = job_id + ".json"
+            if not os.path.exists(self._path("cur", name)):
+                os.replace(self._path("new", name), self._path("cur", name))
+            job = self.status(job_id)
+            self._drop_partial_line(self._path("cur", job_id + ".state"))
+            with open(self._path("cur", job_id + ".state"), "a", encoding="utf-8") as state:
+                for index, (recipient, result) in enumerate(zip(job.recipients, job.results)):
+                    if result is not None:
+                        continue
+                    if limit is not None and sent >= limit:
+                        return sent
+                    try:
+                        emailer.send_plain_email([recipient], job.subject, job.message)
+                        result = self.SENT
+                        sent += 1
+                    except smtplib.SMTPRecipientsRefused as e:
+                        result = f"refused: {self._reason(e.recipients.get(recipient))}"
+                    except smtplib.SMTPResponseException as e:
+                        if e.smtp_code < 500:
+                            raise
+                        result = f"refused: {self._reason((e.smtp_code, e.smtp_error))}"
+                    state.write(f"{index} {result}\n")
+                    state.flush()
+                    os.fsync(state.fileno())
+            for suffix in (".json", ".state"):
+                os.replace(self._path("cur", job_id + suffix), self._path("done", job_id + suffix))
+        return sent
+
+    @staticmethod
+    def _drop_partial_line(path):
+        """cut a last line left unfinished by a crash off the .state file at path"""
+        try:
+            with open(path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _reason(reply):
+        """one line of text for an SMTP (code, message) reply"""
+        if reply is None:
+            return "refused"
+        code, message = reply
+        if isinstance(message, bytes):
+            message = message.decode("utf-8", "replace")
+        return f"{code} {message}".replace("\n", " ")
+
+
+if __name__ == '__main__':
+    spool = EmailSpool(sys.argv[1])
+    if sys.argv[2:3] == ["send"]:
+        from src.league.smtp_emailer import SmtpEmailer
+        host, port, sender = sys.argv[3:6]
+        print(f"{spool.drain(SmtpEmailer(host, int(port), sender))} message(s) sent.")
+    for queued in spool.jobs(include_done=True):
+        print(spool.status(queued))
@@ -1,6 +1,8 @@
 import yagmail
 import keyring
 
+from src.league.instrumentation import instrumented
+
 
 class Emailer:
     """A singleton class"""
@@ -22,6 +24,9 @@ class Emailer:
             cls._sole_instance = cls()
         return cls._sole_instance
 
+    @instrumented("Emailer.send_plain_email",
+                  bytes_written=lambda self, recipients, subject, message:
+                  len(recipients) * len(f"{subject}\n{message}".encode("utf-8")))
     def send_plain_email(self, recipients, subject, message):
         """Note: this is an instance method.
         recipients must be a collection of email addresses
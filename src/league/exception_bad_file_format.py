@@ -0,0 +1,4 @@
+class BadFileFormat(ValueError):
+
+    def __init__(self, message):
+        super().__init__(message)
@@ -0,0 +1,15 @@
+
+class InvalidBatch(ValueError):
+
+    def __init__(self, message, problems=()):
+        super().__init__(message)
+        self.problems = list(problems)
+        """(item, exception) for every item of the batch that was rejected"""
+
+    @classmethod
+    def for_problems(cls, problems, size):
+        """the exception for the problems found in a batch of size items. The message
+        names the first few, problems has them all."""
+        shown = "; ".join(str(exception) for item, exception in problems[:10])
+        more = f"; and {len(problems) - 10} more" if len(problems) > 10 else ""
+        return cls(f"{len(problems)} of the {size} items were rejected: {shown}{more}", problems)
@@ -0,0 +1,5 @@
+
+class ScheduleConflict(Exception):
+
+    def __init__(self, message):
+        super().__init__(message)
@@ -1,13 +1,85 @@
+import functools
+import threading
+
+CHANGES = threading.RLock()
+"""held by the methods that change the model (see changing) from their change until
+the last observer has been told about it. A reader on another thread holding it sees
+the model between two changes, each with its event delivered (see DatabaseSnapshot)."""
+
+
+def changing(method):
+    """decorator of the methods that change an object of the model: they run holding
+    CHANGES. Reentrant, a change made by an observer while it is told is allowed."""
+    @functools.wraps(method)
+    def locked(*args, **kwargs):
+        with CHANGES:
+            return method(*args, **kwargs)
+    return locked
+
+
 class IdentifiedObject:
     """an abstract class including the object id"""
 
     def __init__(self, oid):
         self._oid = oid
+        self._observers = []
+        self._label = None
 
     @property
     def oid(self):
         return self._oid
 
+    @property
+    def label(self):
+        """str(self), made once and kept until the object reports a change (see _changed),
+        for lists that show many objects and are redrawn often. A change to the
+        objects it holds does not make it again: the labels only show their number."""
+        if self._label is None:
+            self._label = str(self)
+        return self._label
+
+    def add_observer(self, observer):
+        """register observer to be told about changes to this object and to the
+        objects it holds. observer must have an object_changed(source, event, details)
+        method. An observer added twice is told twice, once for each time it was added."""
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        """remove one registration of observer, if there is one"""
+        for i, o in enumerate(self._observers):
+            if o is observer:
+                del self._observers[i]
+                return
+
+    def object_changed(self, source, event, details):
+        """pass a change to source (this object or one of the objects it holds)
+        on to this object's observers"""
+        for observer in list(self._observers):
+            observer.object_changed(source, event, details)
+
+    def _changed(self, event, **details):
+        """tell the observers that this object changed"""
+        self._label = None
+        if self._observers:
+            self.object_changed(self, event, details)
+
+    def __getstate__(self):
+        """observers and the label are not saved with the object, the containers
+        register themselves again when they are loaded"""
+        state = self.__dict__.copy()
+        state.pop("_observers", None)
+        state.pop("_label", None)
+        return state
+
+    def __setstate__(self, state):
+        # older files stored name and email as plain attributes
+        for attribute in ("name", "email"):
+            if attribute in state:
+                state["_" + attribute] = state.pop(attribute)
+        self.__dict__.update(state)
+        self._observers = []
+        self._label = None
+
     def __eq__(self, other):
         """two IdentifiedObjects are equal
         if they have the same type and the same oid"""
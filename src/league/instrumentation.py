@@ -0,0 +1,121 @@
+import functools
+import inspect
+import os
+import time
+from collections import deque
+
+
+class Instrumentation:
+    """Singleton. Opt-in timing and counters for the slow or frequent operations
+    (loading, saving, CSV import and export, name lookups, sending email).
+    Off by default: an instrumented call then only checks Instrumentation.enabled.
+    When on, each call adds its duration and the bytes it read or wrote to the totals
+    of its operation. Percentiles are computed over the last SAMPLES calls of each operation."""
+
+    SAMPLES = 1000
+    """Durations kept per operation for the percentiles."""
+
+    enabled = False
+    """True while calls are being recorded. A class variable, see enable()."""
+
+    _sole_instance = None
+    """Sole instance of class. A class variable"""
+
+    @classmethod
+    def instance(cls):
+        """returns the sole instance, creating one if it doesn't exist yet"""
+        if cls._sole_instance is None:
+            cls._sole_instance = cls()
+        return cls._sole_instance
+
+    @classmethod
+    def enable(cls, enabled=True):
+        """start (or with enabled False, stop) recording the instrumented calls"""
+        cls.enabled = enabled
+
+    def __init__(self):
+        self._operations = {}
+        """operation name -> [count, total seconds, max seconds, bytes read, bytes written, deque of durations]"""
+
+    def record(self, operation, seconds, bytes_read=0, bytes_written=0):
+        """add one call of operation lasting seconds to the totals"""
+        totals = self._operations.get(operation)
+        if totals is None:
+            totals = self._operations[operation] = [0, 0.0, 0.0, 0, 0, deque(maxlen=self.SAMPLES)]
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = max(totals[2], seconds)
+        totals[3] += bytes_read
+        totals[4] += bytes_written
+        totals[5].append(seconds)
+
+    def reset(self):
+        """forget everything recorded so far"""
+        self._operations = {}
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        """nearest-rank percentile of a sorted, non-empty list"""
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def snapshot(self):
+        """return {operation: {"count", "total", "mean", "p50", "p90", "p99", "max",
+        "bytes_read", "bytes_written"}} with the times in seconds. The dicts are copies,
+        later calls do not change them."""
+        stats = {}
+        for operation, (count, total, longest, bytes_read, bytes_written, samples) in self._operations.items():
+            ordered = sorted(samples)
+            stats[operation] = {"count": count, "total": total, "mean": total / count,
+                                "p50": self._percentile(ordered, 0.50), "p90": self._percentile(ordered, 0.90),
+                                "p99": self._percentile(ordered, 0.99), "max": longest,
+                                "bytes_read": bytes_read, "bytes_written": bytes_written}
+        return stats
+
+    def report(self):
+        """return the snapshot as a text table, one line per operation"""
+        lines = [f"{'operation':<28}{'count':>8}{'total ms':>12}{'mean ms':>10}{'p50 ms':>10}"
+                 f"{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'read':>12}{'written':>12}"]
+        for operation, s in sorted(self.snapshot().items()):
+            lines.append(f"{operation:<28}{s['count']:>8}{s['total'] * 1000:>12.2f}{s['mean'] * 1000:>10.3f}"
+                         f"{s['p50'] * 1000:>10.3f}{s['p90'] * 1000:>10.3f}{s['p99'] * 1000:>10.3f}"
+                         f"{s['max'] * 1000:>10.3f}{s['bytes_read']:>12}{s['bytes_written']:>12}")
+        return "\n".join(lines)
+
+
+def instrumented(operation, bytes_read=None, bytes_written=None):
+    """decorator recording the calls of a function as operation while Instrumentation is enabled.
+    bytes_read and bytes_written, if given, are called after the function with its
+    arguments by name (however they were passed, the defaults filled in) and return how
+    many bytes it read or wrote."""
+    def decorate(function):
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not Instrumentation.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                arguments = signature.bind(*args, **kwargs)
+                arguments.apply_defaults()
+                read = bytes_read(**arguments.arguments) if bytes_read is not None else 0
+                written = bytes_written(**arguments.arguments) if bytes_written is not None else 0
+                Instrumentation.instance().record(operation, seconds, read, written)
+        return wrapper
+    return decorate
+
+
+def file_size(file_name=None, **arguments):
+    """bytes_read / bytes_written helper for functions whose file_name argument names
+    the file they read or wrote: its size, or for a directory of shards (see
+    LeagueDatabase.save_shards) the sizes of its files added up, 0 if it is missing"""
+    try:
+        if os.path.isdir(file_name):
+            with os.scandir(file_name) as entries:
+                return sum(entry.stat().st_size for entry in entries if entry.is_file())
+        return os.path.getsize(file_name)
+    except (OSError, TypeError):
+        return 0
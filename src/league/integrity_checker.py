@@ -0,0 +1,173 @@
+class IntegrityProblem:
+    """One violation found by IntegrityChecker. kind is one of the IntegrityChecker
+    kinds, path the objects from the league down to the one at fault."""
+
+    def __init__(self, kind, path, message):
+        self.kind = kind
+        self.path = tuple(path)
+        self.message = message
+        self.repaired = False
+        """True once IntegrityChecker.check(repair=True) fixed it"""
+
+    @staticmethod
+    def describe(obj):
+        """'Team "Flintstones" (oid 2)', or without the name for a competition"""
+        name = getattr(obj, "name", None)
+        if name is None:
+            return f"{type(obj).__name__} (oid {obj.oid})"
+        return f"{type(obj).__name__} \"{name}\" (oid {obj.oid})"
+
+    def path_text(self):
+        return " / ".join(self.describe(obj) for obj in self.path)
+
+    def __str__(self):
+        repaired = " (repaired)" if self.repaired else ""
+        return f"{self.path_text()}: {self.message}{repaired}"
+
+
+class IntegrityChecker:
+    """Checks a LeagueDatabase in one pass over its leagues, teams, members and
+    competitions, using sets and dicts keyed by oid, so it is cheap enough to run
+    on every load. The problems looked for are:
+      DUPLICATE_OID   two different objects with the same oid
+      OID_BEYOND_LAST an oid greater than the last one the database gave out
+      NOT_IN_LEAGUE   a competition with a team that is not in its league
+      DUPLICATE_EMAIL two members of a team with the same email (case-insensitive)
+      LISTED_TWICE    the same object twice in a league's or a team's list
+    A team or member held by several containers is the same object each time and
+    is fine; it is only looked into once."""
+
+    DUPLICATE_OID = "duplicate oid"
+    OID_BEYOND_LAST = "oid beyond last"
+    NOT_IN_LEAGUE = "team not in league"
+    DUPLICATE_EMAIL = "duplicate email"
+    LISTED_TWICE = "listed twice"
+
+    def __init__(self, db):
+        self.db = db
+
+    def check(self, repair=False):
+        """return the list of IntegrityProblems. With repair, also fix them:
+          DUPLICATE_OID   the later object gets a new oid
+          OID_BEYOND_LAST the database's last oid becomes the largest one in use
+          NOT_IN_LEAGUE   the team is put back in the league
+          DUPLICATE_EMAIL the later member is taken off the team
+          LISTED_TWICE    the later entry is dropped
+        The repairs edit the lists directly, without change events, so afterwards the
+        repaired leagues are marked changed and the database's indexes are rebuilt
+        (see LeagueDatabase.check_integrity)."""
+        problems = []
+        owners = {}
+        """oid -> (object, path of its container) of the first object seen with that oid"""
+        renumber = []
+        """(object, problem) of the objects sharing the oid of an earlier one"""
+        fixes = []
+        """(function, problem) of the other repairs, applied after the walk"""
+        visited = set()
+        """ids of the teams and members already looked into"""
+
+        def claim(obj, parent_path):
+            first = owners.get(obj.oid)
+            if first is None:
+                owners[obj.oid] = (obj, parent_path)
+            elif first[0] is not obj:
+                other = " / ".join(IntegrityProblem.describe(o) for o in first[1] + (first[0],))
+                problem = IntegrityProblem(self.DUPLICATE_OID, parent_path + (obj,),
+                                           f"oid {obj.oid} is also used by {other}")
+                problems.append(problem)
+                renumber.append((obj, problem))
+
+        def listed_twice(container, items, path):
+            seen = set()
+            for item in items:
+                if id(item) in seen:
+                    problem = IntegrityProblem(self.LISTED_TWICE, path + (item,),
+                                               f"is listed more than once in {IntegrityProblem.describe(container)}")
+                    problems.append(problem)
+                    fixes.append((lambda container=container, items=items, item=item: self._drop_last(container, items, item),
+                                  problem))
+                seen.add(id(item))
+
+        def check_team(team, team_path):
+            if id(team) in visited:
+                return
+            visited.add(id(team))
+            claim(team, team_path[:-1])
+            listed_twice(team, team.members, team_path)
+            emails = {}
+            for member in team.members:
+                if id(member) not in visited:
+                    visited.add(id(member))
+                    claim(member, team_path)
+                if member.email is None:
+                    continue
+                first = emails.setdefault(member.email.upper(), member)
+                if first is not member:
+                    problem = IntegrityProblem(self.DUPLICATE_EMAIL, team_path + (member,),
+                                               f"has the same email as {IntegrityProblem.describe(first)}")
+                    problems.append(problem)
+                    fixes.append((lambda team=team, member=member: self._drop_member(team, member), problem))
+
+        for league in self.db.leagues:
+            league_path = (league,)
+            claim(league, ())
+            listed_twice(league, league.teams, league_path)
+            listed_twice(league, league.competitions, league_path)
+            league_teams = {id(team) for team in league.teams}
+            for team in league.teams:
+                check_team(team, (league, team))
+            for competition in league.competitions:
+                claim(competition, league_path)
+                for team in competition.teams_competing:
+                    if id(team) not in league_teams:
+                        problem = IntegrityProblem(self.NOT_IN_LEAGUE, (league, competition, team),
+                                                   "plays in the competition but is not in the league")
+                        problems.append(problem)
+                        league_teams.add(id(team))
+                        fixes.append((lambda league=league, team=team: self._put_team_back(league, team), problem))
+                        check_team(team, (league, team))
+
+        last_oid = self.db._last_oid
+        beyond = []
+        for oid, (obj, parent_path) in owners.items():
+            if oid > last_oid:
+                beyond.append(IntegrityProblem(self.OID_BEYOND_LAST, parent_path + (obj,),
+                                               f"the oid is greater than the last oid given out, {last_oid}"))
+        problems += beyond
+
+        if repair:
+            if beyond:
+                self.db._last_oid = max(owners)
+            for problem in beyond:
+                problem.repaired = True
+            for fix, problem in fixes:
+                fix()
+                problem.repaired = True
+            for obj, problem in renumber:
+                obj._oid = self.db.next_oid()   # nothing else can change an oid
+                problem.repaired = True
+        return problems
+
+    @staticmethod
+    def _drop_last(container, items, item):
+        """remove the last entry of items that is item"""
+        for i in range(len(items) - 1, -1, -1):
+            if items[i] is item:
+                del items[i]
+                item.remove_observer(container)
+                container._label = None
+                return
+
+    @staticmethod
+    def _drop_member(team, member):
+        for i, m in enumerate(team.members):
+            if m is member:
+                del team.members[i]
+                member.remove_observer(team)
+                team._label = None
+                return
+
+    @staticmethod
+    def _put_team_back(league, team):
+        league.teams.append(team)
+        team.add_observer(league)
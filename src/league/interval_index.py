@@ -0,0 +1,76 @@
+from bisect import bisect_left, insort
+from itertools import count
+import heapq
+
+
+class IntervalIndex:
+    """Time intervals grouped by key (a location, a team, a member...).
+    The intervals of each key are kept sorted by start time. Since the longest
+    interval of each key is known, the intervals overlapping [start, end) can
+    only start between start - longest and end, which two bisects find.
+    Each interval is stored with the number of its add() after its oid, so intervals
+    with the same start, end and oid (the same oid on both sides of a merge...) are
+    told apart without comparing their items, which may not be orderable."""
+
+    def __init__(self):
+        self._intervals = {}
+        """key -> sorted list of (start, end, oid, number, item)"""
+        self._numbers = count()
+        self._longest = {}
+        """key -> length of the longest interval ever added for that key"""
+
+    def __len__(self):
+        return sum(len(intervals) for intervals in self._intervals.values())
+
+    def add(self, key, start, end, oid, item=None):
+        """add the interval [start, end) for item (identified by oid) under key"""
+        insort(self._intervals.setdefault(key, []), (start, end, oid, next(self._numbers), item))
+        if key not in self._longest or end - start > self._longest[key]:
+            self._longest[key] = end - start
+
+    def remove(self, key, start, end, oid, item=None):
+        """remove the interval added with the same arguments, if there is one. Without
+        item, the first one added with the same key, start, end and oid is removed."""
+        intervals = self._intervals.get(key)
+        if intervals is None:
+            return
+        i = bisect_left(intervals, (start, end, oid))
+        while i < len(intervals) and intervals[i][:3] == (start, end, oid):
+            if item is None or intervals[i][4] is item:
+                break
+            i += 1
+        else:
+            return
+        del intervals[i]
+        if not intervals:
+            del self._intervals[key]
+            del self._longest[key]
+
+    def overlapping(self, key, start, end):
+        """return the (start, end, oid, item) intervals of key that overlap [start, end)"""
+        intervals = self._intervals.get(key)
+        if not intervals:
+            return []
+        first = bisect_left(intervals, (start - self._longest[key],))
+        last = bisect_left(intervals, (end,))
+        return [self._public(interval) for interval in intervals[first:last] if interval[1] > start]
+
+    @staticmethod
+    def _public(interval):
+        start, end, oid, number, item = interval
+        return start, end, oid, item
+
+    def overlapping_pairs(self):
+        """return (key, interval, other interval) for every pair of overlapping intervals
+        under the same key. Each key is swept once in start order, keeping the intervals
+        that have not ended yet in a heap, so this is O(n log n) plus the pairs found."""
+        pairs = []
+        for key, intervals in self._intervals.items():
+            active = []
+            for position, interval in enumerate(intervals):
+                while active and active[0][0] <= interval[0]:
+                    heapq.heappop(active)
+                for end, other in active:
+                    pairs.append((key, self._public(intervals[other]), self._public(interval)))
+                heapq.heappush(active, (interval[1], position))
+        return pairs
@@ -1,5 +1,12 @@
-from src.league.identified_object import IdentifiedObject
+from src.league.identified_object import IdentifiedObject, changing
 from src.league.exception_duplicate_oid import DuplicateOid
+from src.league.exception_schedule_conflict import ScheduleConflict
+from src.league.exception_invalid_batch import InvalidBatch
+from src.league.interval_index import IntervalIndex
+from src.league.competition_index import CompetitionIndex
+from src.league.standings import Standings
+from src.league.instrumentation import instrumented
+from src.league.list_positions import position, insert, put_in, take_out
 
 
 class League(IdentifiedObject):
@@ -9,9 +16,86 @@ class League(IdentifiedObject):
         name properties as specified in the arguments
         (note: should call superclass constructor)"""
         super().__init__(oid)
-        self.name = name
+        self._name = name
         self._teams = []
         self._competitions = []
+        self.reject_conflicts = False
+        """when True, adding a competition that double-books a location, a team
+        or a member raises ScheduleConflict"""
+        self._schedule_index = None
+        self._competition_index = None
+        self._standings = None
+        self._dirty = True
+        """True when the league changed since it was last saved or loaded"""
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop("_schedule_index", None)
+        state.pop("_competition_index", None)
+        state.pop("_standings", None)
+        state.pop("_dirty", None)
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("reject_conflicts", False)
+        super().__setstate__(state)
+        self._schedule_index = None
+        self._competition_index = None
+        self._standings = None
+        self._dirty = False
+        for team in self._teams:
+            team.add_observer(self)
+        for competition in self._competitions:
+            competition.add_observer(self)
+
+    def object_changed(self, source, event, details):
+        """a competition was moved or got a result, or a team's members changed, so the
+        schedule indexes and standings must follow. Passes the change on like every
+        IdentifiedObject."""
+        if event in ("member_added", "members_added", "member_removed", "members_removed",
+                     "location", "date_time", "duration"):
+            self._schedule_index = None
+        if event in ("location", "date_time") and self._competition_index is not None:
+            self._competition_index.competition_moved(source, event, details["old"])
+        if event == "result" and self._standings is not None:
+            self._standings.result_changed(source, details["old"])
+        self._dirty = True
+        super().object_changed(source, event, details)
+
+    def _changed(self, event, **details):
+        self._dirty = True
+        super()._changed(event, **details)
+
+    @property
+    def dirty(self):
+        """True when the league, its teams, their members or its competitions
+        changed since the league was last saved or loaded"""
+        return self._dirty
+
+    def mark_saved(self):
+        """called once the league is saved, clears dirty"""
+        self._dirty = False
+
+    def repaired(self):
+        """called after the lists of the league or of its teams were repaired directly
+        (see IntegrityChecker): the indexes are built again on next use and the league
+        is marked dirty"""
+        self._schedule_index = None
+        self._competition_index = None
+        self._standings = None
+        self._dirty = True
+        self._label = None
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    @changing
+    def name(self, name):
+        old = self._name
+        self._name = name
+        self._changed("name", old=old)
 
     @property
     def teams(self):
@@ -23,26 +107,87 @@ class League(IdentifiedObject):
         """Protects read-only competition"""
         return self._competitions
 
-    def add_team(self, team):
+    @changing
+    def add_team(self, team, index=None):
         """add team to the teams collection unless they are already in it
         (in which case do nothing). Raises DuplicateOid exception if the oid
-        of the new team is already in use."""
+        of the new team is already in use. index, when given, is the place of the
+        team (as a team_removed event reports it); by default it is appended."""
         if team is not None:
             if team.oid in [t.oid for t in self.teams]:
                 raise DuplicateOid(f"The oid is duplicated when adding team {team}")
             else:
-                self.teams.append(team)
+                index = insert(self.teams, team, index)
+                team.add_observer(self)
+                self._changed("team_added", team=team, index=index)
+
+    def check_teams(self, teams):
+        """return (team, DuplicateOid) for each of teams whose oid is already used by
+        a team of the league or by a team earlier in teams. One pass over both."""
+        oids = {t.oid for t in self.teams}
+        problems = []
+        for team in teams:
+            if team is None:
+                continue
+            if team.oid in oids:
+                problems.append((team, DuplicateOid(f"The oid is duplicated when adding team {team}")))
+            else:
+                oids.add(team.oid)
+        return problems
+
+    @changing
+    def add_teams(self, teams, indexes=None):
+        """Adds all the teams at once. Raises InvalidBatch listing every team that
+        add_team would reject (see check_teams), and adds none of them in that case.
+        indexes, when given, are the places of the teams once added (as a teams_removed
+        event reports them); by default they are appended."""
+        teams = [t for t in teams if t is not None]
+        problems = self.check_teams(teams)
+        if problems:
+            raise InvalidBatch.for_problems(problems, len(teams))
+        indexes = put_in(self.teams, teams, indexes)
+        for team in teams:
+            team.add_observer(self)
+        if teams:
+            self._changed("teams_added", teams=teams, indexes=indexes)
+
+    @changing
+    def remove_teams(self, teams, indexes=None):
+        """Removes all of teams that are in the league at once, in one pass over the
+        list, and sends one teams_removed event (see Team.remove_members). Raises
+        ValueError, and removes none of them, if one of them is in a competition of
+        the league."""
+        teams = [t for t in teams if t is not None]
+        competing = {id(t) for c in self.competitions for t in c.teams_competing}
+        for team in teams:
+            if id(team) in competing:
+                raise ValueError(f"This team {team} is in this league's competition.")
+        removed, indexes = take_out(self.teams, teams, indexes)
+        for team in removed:
+            team.remove_observer(self)
+        if removed:
+            self._changed("teams_removed", teams=removed, indexes=indexes)
 
-    def remove_team(self, team):
+    @changing
+    def remove_team(self, team, index=None):
         """remove the team if they are
-        in the teams list, otherwise do nothing"""
+        in the teams list, otherwise do nothing.
+        index, when given, is where team was added (as a team_added event reports it):
+        team itself is removed from there, or from where it is now."""
         if self.competitions is not None:
             for c in self.competitions:
                 if team in c.teams_competing:
                     raise ValueError(f"This team {team} is in this league's competition.")
-        if team in self.teams:
-            self.teams.remove(team)
+        if index is not None:
+            index = position(self.teams, team, index)
+        elif team in self.teams:
+            index = self.teams.index(team)
+        if index is not None:
+            team = self.teams.pop(index)
+            team.remove_observer(self)
+            self._changed("team_removed", team=team, index=index)
 
+    @instrumented("League.team_named")
     def team_named(self, team_name):
         """return the team in this league whose name
         equals team_name (case-sensitive)
@@ -52,11 +197,14 @@ class League(IdentifiedObject):
                 return team
         return None
 
-    def add_competition(self, competition):
+    @changing
+    def add_competition(self, competition, index=None):
         """Adds competition to the competitions collection.
         Raises DuplicateOid Exception if oid of new competition is duplicated.
         Verifies that all teams in the competition are part of the league.
-        Throws ValueError if one or more is invalid."""
+        Throws ValueError if one or more is invalid.
+        index, when given, is the place of the competition (as a competition_removed
+        event reports it); by default it is appended."""
         if competition is not None:
             for t in competition.teams_competing:
                 if t not in self.teams:
@@ -65,7 +213,195 @@ class League(IdentifiedObject):
             if competition.oid in [c.oid for c in self.competitions]:
                 raise DuplicateOid(f"The oid is duplicated when adding competition {competition}")
             else:
-                self.competitions.append(competition)
+                if self.reject_conflicts:
+                    self._check_conflicts(competition)
+                index = insert(self.competitions, competition, index)
+                competition.add_observer(self)
+                if self._schedule_index is not None:
+                    self._index_competition(self._schedule_index, competition)
+                if self._competition_index is not None:
+                    self._competition_index.add(competition)
+                if self._standings is not None:
+                    self._standings.competition_added(competition)
+                self._changed("competition_added", competition=competition, index=index)
+
+    @changing
+    def remove_competition(self, competition, index=None):
+        """remove the competition if it is in
+        the competitions list, otherwise do nothing.
+        index, when given, is where competition was added (as a competition_added
+        event reports it): competition itself is removed from there, or from where it is now."""
+        if index is not None:
+            index = position(self.competitions, competition, index)
+        elif competition in self.competitions:
+            index = self.competitions.index(competition)
+        if index is not None:
+            competition = self.competitions.pop(index)
+            competition.remove_observer(self)
+            if self._schedule_index is not None:
+                self._unindex_competition(self._schedule_index, competition)
+            if self._competition_index is not None:
+                self._competition_index.remove(competition)
+            if self._standings is not None:
+                self._standings.competition_removed(competition)
+            self._changed("competition_removed", competition=competition, index=index)
+
+    def check_competitions(self, competitions):
+        """return (competition, exception) for each of competitions that add_competition
+        would reject: ValueError when one of its teams is not in the league, DuplicateOid
+        when its oid is used by a competition of the league or earlier in competitions.
+        One pass over the batch using sets instead of list scans."""
+        teams = set(self.teams)
+        oids = {c.oid for c in self.competitions}
+        problems = []
+        for competition in competitions:
+            if competition is None:
+                continue
+            missing = [t for t in competition.teams_competing if t not in teams]
+            if missing:
+                problems.append((competition, ValueError(f"This team {missing[0]} in the attempted addition of "
+                                                         f"the competition {competition} is not in the league.")))
+            elif competition.oid in oids:
+                problems.append((competition, DuplicateOid(f"The oid is duplicated when adding competition "
+                                                           f"{competition}")))
+            else:
+                oids.add(competition.oid)
+        return problems
+
+    @changing
+    def add_competitions(self, competitions, indexes=None):
+        """Adds all the competitions to the competitions collection at once.
+        Raises InvalidBatch listing every competition that add_competition would
+        reject (see check_competitions), and adds none of them in that case.
+        With reject_conflicts, raises ScheduleConflict (and adds nothing) for the
+        first competition that double-books a location, team or member.
+        indexes, when given, are the places of the competitions once added (as a
+        competitions_removed event reports them); by default they are appended."""
+        competitions = [c for c in competitions if c is not None]
+        problems = self.check_competitions(competitions)
+        if problems:
+            raise InvalidBatch.for_problems(problems, len(competitions))
+        if self.reject_conflicts:
+            index = self.schedule_index
+            for i, competition in enumerate(competitions):
+                try:
+                    self._check_conflicts(competition)
+                except ScheduleConflict:
+                    for added in competitions[:i]:
+                        self._unindex_competition(index, added)
+                    raise
+                self._index_competition(index, competition)
+        elif self._schedule_index is not None:
+            for competition in competitions:
+                self._index_competition(self._schedule_index, competition)
+        indexes = put_in(self.competitions, competitions, indexes)
+        for competition in competitions:
+            competition.add_observer(self)
+            if self._competition_index is not None:
+                self._competition_index.add(competition)
+            if self._standings is not None:
+                self._standings.competition_added(competition)
+        if competitions:
+            self._changed("competitions_added", competitions=competitions, indexes=indexes)
+
+    @changing
+    def remove_competitions(self, competitions, indexes=None):
+        """Removes all of competitions that are in the league at once, in one pass over
+        the list, and sends one competitions_removed event (see Team.remove_members)."""
+        removed, indexes = take_out(self.competitions, [c for c in competitions if c is not None], indexes)
+        for competition in removed:
+            competition.remove_observer(self)
+            if self._schedule_index is not None:
+                self._unindex_competition(self._schedule_index, competition)
+            if self._competition_index is not None:
+                self._competition_index.remove(competition)
+            if self._standings is not None:
+                self._standings.competition_removed(competition)
+        if removed:
+            self._changed("competitions_removed", competitions=removed, indexes=indexes)
+
+    @staticmethod
+    def _schedule_keys(competition):
+        keys = [("location", competition.location)]
+        keys += [("team", team.oid) for team in competition.teams_competing]
+        keys += [("member", member.oid) for member in competition.members()]
+        return keys
+
+    def _index_competition(self, index, competition):
+        if competition.date_time is not None:
+            for key in self._schedule_keys(competition):
+                index.add(key, competition.date_time, competition.end_time, competition.oid, competition)
+
+    def _unindex_competition(self, index, competition):
+        if competition.date_time is not None:
+            for key in self._schedule_keys(competition):
+                index.remove(key, competition.date_time, competition.end_time, competition.oid, competition)
+
+    @property
+    def schedule_index(self):
+        """IntervalIndex of the times of the competitions, keyed by ("location", location),
+        ("team", team oid) and ("member", member oid). Built on first use and kept up to
+        date as competitions are added. Competitions without a date_time are left out."""
+        if self._schedule_index is None:
+            index = IntervalIndex()
+            for competition in self.competitions:
+                self._index_competition(index, competition)
+            self._schedule_index = index
+        return self._schedule_index
+
+    def conflicts_for(self, competition):
+        """return (key, other competition) for each competition of this league that
+        uses the same location, team or member as competition at an overlapping time"""
+        if competition.date_time is None:
+            return []
+        conflicts = []
+        for key in self._schedule_keys(competition):
+            for start, end, oid, other in self.schedule_index.overlapping(key, competition.date_time,
+                                                                          competition.end_time):
+                if other is not competition:
+                    conflicts.append((key, other))
+        return conflicts
+
+    def _check_conflicts(self, competition):
+        conflicts = self.conflicts_for(competition)
+        if conflicts:
+            (kind, value), other = conflicts[0]
+            raise ScheduleConflict(f"{competition} overlaps {other} for the same {kind} {value}.")
+
+    def schedule_conflicts(self):
+        """return (key, competition, other competition) for every pair of competitions
+        in this league using the same location, team or member at overlapping times.
+        Each key is swept once in time order, O(n log n) rather than comparing every pair."""
+        return [(key, first[3], second[3]) for key, first, second in self.schedule_index.overlapping_pairs()]
+
+    @property
+    def competition_index(self):
+        """CompetitionIndex of the competitions by date_time and by location.
+        Built on first use and kept up to date as competitions are added, removed or moved."""
+        if self._competition_index is None:
+            self._competition_index = CompetitionIndex(self.competitions)
+        return self._competition_index
+
+    def competitions_between(self, start=None, end=None):
+        """generate the competitions with start <= date_time < end in date_time order.
+        start or end may be None for no limit on that side."""
+        return self.competition_index.between(start, end)
+
+    def competitions_at(self, location, start=None, end=None):
+        """generate the competitions at location with start <= date_time < end in date_time order"""
+        return self.competition_index.at(location, start, end)
+
+    @property
+    def standings(self):
+        """the Standings of this league. Built from the recorded results on first use,
+        then updated one result at a time as results are recorded or corrected."""
+        if self._standings is None:
+            self._standings = Standings(self)
+        return self._standings
+
+    def standings_table(self):
+        """return the TeamRecords of the teams of this league, best first"""
+        return self.standings.table()
 
     def teams_for_member(self, member):
         """return a list of all teams for which member plays"""
@@ -94,6 +430,18 @@ class League(IdentifiedObject):
                     comp_list.append(comp)
         return comp_list
 
+    def send_email(self, emailer, subject, message):
+        """use the emailer argument to send one email to all the members of all the
+        teams of this league, each email address once (see Competition.send_email)"""
+        recipients = []
+        seen = set()
+        for team in self.teams:
+            for member in team.members:
+                if member.email is not None and member.email not in seen:
+                    seen.add(member.email)
+                    recipients.append(member.email)
+        emailer.send_plain_email(recipients, subject, message)
+
     def __str__(self):
         """return a string resembling the following:
         "League Name: N teams, M competitions"
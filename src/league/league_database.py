@@ -2,8 +2,51 @@ import pickle
 import os.path
 from os import rename
 import csv
+import heapq
+import multiprocessing
+import re
+import struct
+from concurrent.futures import ProcessPoolExecutor
 from src.league.team_member import TeamMember
 from src.league.team import Team
+from src.league.search_index import SearchIndex
+from src.league.similarity_index import MemberSimilarityIndex
+from src.league.person_registry import PersonRegistry
+from src.league.database_snapshot import DatabaseSnapshot
+from src.league.roster_sync import RosterSync
+from src.league.scheduler import RoundRobinScheduler
+from src.league.undo_log import UndoLog
+from src.league.exception_invalid_batch import InvalidBatch
+from src.league.instrumentation import instrumented, file_size
+from src.league.integrity_checker import IntegrityChecker
+from src.league.binary_format import BinaryFormat
+from src.league.exception_bad_file_format import BadFileFormat
+from src.league.list_positions import position, insert
+from src.league.identified_object import changing
+
+
+_saving = None
+"""the leagues being saved by save_shards(), which its forked worker processes inherit"""
+
+
+def _save_shard(index, path):
+    """encode the league at index of the leagues being saved and write its shard file
+    at path, return the file's stamp. Runs in the worker processes of save_shards()."""
+    data = LeagueDatabase.FILE_MARK + BinaryFormat.write_league(_saving[index])
+    return LeagueDatabase._write_shard(path, data)
+
+
+def _read_shard(path):
+    """return the records of the league in the shard file at path (see
+    BinaryFormat.unpack_league), or its bytes for a pickled shard, and the file's stamp.
+    Runs in the worker processes of read_shards()."""
+    with open(path, mode="rb") as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+    if data.startswith(LeagueDatabase.FILE_MARK):
+        return BinaryFormat.unpack_league(memoryview(data)[len(LeagueDatabase.FILE_MARK):]), \
+            (stat.st_size, stat.st_mtime_ns)
+    return data, (stat.st_size, stat.st_mtime_ns)
 
 
 class LeagueDatabase:
@@ -19,43 +62,410 @@ class LeagueDatabase:
             cls._sole_instance = cls()
         return cls._sole_instance
 
+    HISTORY_SIZE = 100
+    """How many changes can be undone, see undo_log."""
+
+    FILE_MARK = b"LEAGUEDB" + str(BinaryFormat.VERSION).encode()
+    """First bytes of the files written by save() and save_shards()."""
+
+    PICKLE_FILE_MARK = b"LEAGUEDB1"
+    """First bytes of the older files holding one pickle per league. Files older
+    still are a single pickle of the database."""
+
+    CONTENTS = struct.Struct("<QI")
+    """last oid and number of leagues, at the start of a table of contents or manifest"""
+
+    CONTENTS_ENTRY = struct.Struct("<QQQ")
+    """league oid, offset and size of a league in a table of contents"""
+
+    MANIFEST_MARK = b"LEAGUESHARDS1"
+    """First bytes of the manifest written by save_shards()."""
+
+    MANIFEST_HEADER = struct.Struct("<QQI")
+    """last oid, generation of the save and number of leagues, at the start of a manifest"""
+
+    MANIFEST_ENTRY = struct.Struct("<QII")
+    """league oid, then the sizes of the UTF-8 league name and shard file name following it in a manifest"""
+
+    OLD_MANIFEST_ENTRY = struct.Struct("<QI")
+    """league oid and size of the UTF-8 name following it in the manifests starting with
+    FILE_MARK, whose shards are all called league-<oid>.dat"""
+
+    MANIFEST = "manifest.dat"
+    """File of a database directory holding the last oid and the list of league shards, see save_shards()."""
+
+    SHARD_NAME = re.compile(r"league-(\d+)(?:-(\d+))?\.dat(\.tmp)?$")
+    """the names of the shard files save_shards() writes, league-<oid>-<generation>.dat"""
+
     @classmethod
+    @instrumented("LeagueDatabase.load", bytes_read=file_size)
     def load(cls, file_name):
         """loads a LeagueDatabase from the specified file and stores it in _sole_instance.
         If file_name does not exist or an error occurs when reading it,
         display a console message and load the file from the backup (if it exists).
         See save() for information on the backup file."""
         try:
-            with open(file_name, mode="rb") as f:
-                cls._sole_instance = pickle.load(f)
-        except (FileNotFoundError, IOError, pickle.PickleError) as e:   # If file name doesn't exist
-            print(e.strerror)
+            cls._sole_instance = cls.read(file_name)
+        except (FileNotFoundError, IOError, pickle.PickleError, BadFileFormat) as e:   # If file name doesn't exist
+            print(getattr(e, "strerror", None) or e)
             try:
-                with open(file_name + ".backup", mode="rb") as f:
-                    cls._sole_instance = pickle.load(f)
+                cls._sole_instance = cls.read(file_name + ".backup")
             except FileNotFoundError:
                 print('Backup file not found.')
+                return
+        for problem in cls._sole_instance.check_integrity():
+            print(f"Integrity problem: {problem}")
+
+    @classmethod
+    def read(cls, file_name):
+        """return the database read from file_name, without making it the sole instance
+        (see load()). Reads the files written by save(), the directory written by
+        save_shards() and, to migrate them, the older pickle files (see PICKLE_FILE_MARK):
+        the next save() writes them again in the current format.
+        The file is the mark, each league encoded by BinaryFormat, the table of contents
+        (CONTENTS then a CONTENTS_ENTRY per league) and, in the last 8 bytes, where the
+        table of contents starts. The older files have pickles in place of the leagues
+        and of the table of contents.
+        Raises BadFileFormat if the file is damaged."""
+        if os.path.isdir(file_name):
+            return cls.read_shards(file_name)
+        with open(file_name, mode="rb") as f:
+            data = f.read()
+        mark = data[:len(cls.FILE_MARK)]
+        if mark not in (cls.FILE_MARK, cls.PICKLE_FILE_MARK):
+            return pickle.loads(data)
+        if len(data) < len(mark) + 8:
+            raise BadFileFormat(f"{file_name} is cut short.")
+        (contents_offset,) = struct.unpack_from("<Q", data, len(data) - 8)
+        db = cls()
+        if mark == cls.PICKLE_FILE_MARK:
+            contents = pickle.loads(data[contents_offset:])
+            db._last_oid = contents["last_oid"]
+            leagues = [(pickle.loads(data[offset:offset + size]), offset, size)
+                       for oid, offset, size in contents["leagues"]]
+        else:
+            try:
+                db._last_oid, count = cls.CONTENTS.unpack_from(data, contents_offset)
+                start = contents_offset + cls.CONTENTS.size
+                entries = list(cls.CONTENTS_ENTRY.iter_unpack(data[start:start + count * cls.CONTENTS_ENTRY.size]))
+            except struct.error as e:
+                raise BadFileFormat(f"Damaged table of contents in {file_name}: {e}")
+            view = memoryview(data)
+            leagues = [(BinaryFormat.read_league(view[offset:offset + size]), offset, size)
+                       for oid, offset, size in entries]
+            db._saved_leagues = {league.oid: (offset, size) for league, offset, size in leagues}
+            db._saved_file = (file_name, cls._file_stamp(file_name))
+        for league, offset, size in leagues:
+            db._leagues.append(league)
+            league.add_observer(db)
+        db._share_objects()
+        return db
+
+    @classmethod
+    @instrumented("LeagueDatabase.read_shards")
+    def read_shards(cls, directory, workers=None):
+        """return the database saved in directory by save_shards(). The shard files are
+        read and unpacked (see BinaryFormat.unpack_league) by a pool of workers processes
+        at once, and the leagues made from the records in order as they arrive: making the
+        objects is left to this process, which keeps them. With workers=1, or a single
+        shard, or on a single processor by default, everything is done here.
+        Shards and manifests written as pickles by older versions are read too."""
+        last_oid, generation, manifest = cls._read_manifest(directory)
+        db = cls()
+        db._last_oid = last_oid
+        oids = [oid for oid, name, shard in manifest]
+        paths = [os.path.join(directory, shard) for oid, name, shard in manifest]
+        workers = workers or os.cpu_count() or 1
+        if len(paths) > 1 and workers > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                db._add_shards(oids, paths, pool.map(_read_shard, paths))
+        else:
+            db._add_shards(oids, paths, map(_read_shard, paths))
+        db._share_objects()
+        return db
+
+    def _add_shards(self, oids, paths, shards):
+        """add the leagues of the (records or pickle, stamp) of shards read by _read_shard"""
+        for oid, path, (records, stamp) in zip(oids, paths, shards):
+            if isinstance(records, bytes):
+                league = pickle.loads(records)
+            else:
+                league = BinaryFormat.build_league(records)
+                self._saved_shards[oid] = (path, stamp)
+            self._leagues.append(league)
+            league.add_observer(self)
+
+    @classmethod
+    def read_league(cls, directory, name):
+        """return the league called name from the database saved in directory by
+        save_shards(), reading only the manifest and that league's shard, or None if
+        there is no such league. The league is not attached to a database, and the teams
+        it shares with other leagues are its own copies."""
+        last_oid, generation, manifest = cls._read_manifest(directory)
+        for oid, league_name, shard in manifest:
+            if league_name == name:
+                with open(os.path.join(directory, shard), mode="rb") as f:
+                    return cls._decode_shard(f.read())
+        return None
+
+    @classmethod
+    def _shard_name(cls, oid, generation=None):
+        if generation is None:
+            return f"league-{oid}.dat"
+        return f"league-{oid}-{generation}.dat"
+
+    @classmethod
+    def _read_manifest(cls, directory):
+        """return the last oid, the generation of the save and the (oid, name, shard
+        file name) of the leagues in the manifest of directory"""
+        with open(os.path.join(directory, cls.MANIFEST), mode="rb") as f:
+            data = f.read()
+        if data.startswith(cls.MANIFEST_MARK):
+            mark, entry, names = cls.MANIFEST_MARK, cls.MANIFEST_ENTRY, 2
+        elif data.startswith(cls.FILE_MARK):
+            mark, entry, names = cls.FILE_MARK, cls.OLD_MANIFEST_ENTRY, 1
+        else:
+            manifest = pickle.loads(data)
+            return manifest["last_oid"], 0, manifest["leagues"]
+        try:
+            offset = len(mark)
+            if names == 2:
+                last_oid, generation, count = cls.MANIFEST_HEADER.unpack_from(data, offset)
+                offset += cls.MANIFEST_HEADER.size
+            else:
+                last_oid, count = cls.CONTENTS.unpack_from(data, offset)
+                generation = 0
+                offset += cls.CONTENTS.size
+            leagues = []
+            for i in range(count):
+                oid, *sizes = entry.unpack_from(data, offset)
+                offset += entry.size
+                texts = []
+                for size in sizes:
+                    texts.append(data[offset:offset + size].decode("utf-8"))
+                    offset += size
+                shard = texts[1] if names == 2 else cls._shard_name(oid)
+                leagues.append((oid, texts[0], shard))
+        except (struct.error, UnicodeDecodeError) as e:
+            raise BadFileFormat(f"Damaged manifest in {directory}: {e}")
+        return last_oid, generation, leagues
+
+    @classmethod
+    def _write_manifest(cls, directory, last_oid, generation, leagues):
+        """replace the manifest of directory with one for the (league, shard file name) of leagues"""
+        parts = [cls.MANIFEST_MARK, cls.MANIFEST_HEADER.pack(last_oid, generation, len(leagues))]
+        for league, shard in leagues:
+            name = league.name.encode("utf-8")
+            shard = shard.encode("utf-8")
+            parts += [cls.MANIFEST_ENTRY.pack(league.oid, len(name), len(shard)), name, shard]
+        cls._write_shard(os.path.join(directory, cls.MANIFEST), b"".join(parts))
+
+    @classmethod
+    def _decode_shard(cls, data):
+        """return the league of a shard file's bytes"""
+        if data.startswith(cls.FILE_MARK):
+            return BinaryFormat.read_league(memoryview(data)[len(cls.FILE_MARK):])
+        return pickle.loads(data)
+
+    @classmethod
+    def _write_shard(cls, path, data):
+        """replace the file at path with data, return its stamp"""
+        with open(path + ".tmp", mode="wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        return cls._file_stamp(path)
+
+    @staticmethod
+    def _file_stamp(file_name):
+        stat = os.stat(file_name)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _share_objects(self):
+        """the leagues are encoded apart, so a team or member held by several leagues
+        is loaded once per league. Keep the first copy and point the others at it."""
+        teams = {}
+        members = {}
+        for league in self._leagues:
+            for i, team in enumerate(league.teams):
+                shared = teams.setdefault(team.oid, team)
+                if shared is not team:
+                    league.teams[i] = shared
+                    shared.add_observer(league)
+                    continue
+                for j, member in enumerate(team.members):
+                    shared_member = members.setdefault(member.oid, member)
+                    if shared_member is not member:
+                        team.members[j] = shared_member
+                        shared_member.add_observer(team)
+            for competition in league.competitions:
+                teams_competing = competition.teams_competing
+                for i, team in enumerate(teams_competing):
+                    teams_competing[i] = teams.get(team.oid, team)
 
     def __init__(self):
         self._leagues = []
         self._last_oid = 0
         """private variable holding the last id number that was supplied."""
+        self._listeners = []
+        """objects told about every change to the leagues and the objects they hold."""
+        self._search_index = None
+        self._similarity_index = None
+        self._person_registry = None
+        self._saved_file = None
+        """(file name, (size, modification time)) of the file last saved or loaded"""
+        self._saved_leagues = {}
+        """league oid -> (offset, size) of the league in that file"""
+        self._saved_shards = {}
+        """league oid -> (path, (size, modification time)) of the shard last saved or loaded, see save_shards()"""
+        self._leagues_changed = False
+        """True when leagues were added or removed since the last save or load"""
+        self._undo_log = UndoLog(self.HISTORY_SIZE)
+        self.add_listener(self._undo_log)
+
+    def __getstate__(self):
+        """listeners, indexes and what was last saved are not saved"""
+        state = self.__dict__.copy()
+        for attribute in ("_listeners", "_search_index", "_similarity_index", "_person_registry",
+                          "_saved_file", "_saved_leagues", "_saved_shards", "_leagues_changed", "_undo_log"):
+            state.pop(attribute, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._listeners = []
+        self._search_index = None
+        self._similarity_index = None
+        self._person_registry = None
+        self._saved_file = None
+        self._saved_leagues = {}
+        self._saved_shards = {}
+        self._leagues_changed = False
+        self._undo_log = UndoLog(self.HISTORY_SIZE)
+        self.add_listener(self._undo_log)
+        for league in self._leagues:
+            league.add_observer(self)
 
     @property
     def leagues(self):
         """Read-only property. List of the leagues being managed."""
         return self._leagues
 
-    def add_league(self, league):
-        """add the specified league to the leagues list"""
-        self.leagues.append(league)
+    def add_listener(self, listener):
+        """register listener to be told about changes to the database, its leagues,
+        their teams and members. listener must have an object_changed(source, event, details) method."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """stop telling listener about changes"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def object_changed(self, source, event, details):
+        """called by the leagues when they or the objects they hold change.
+        Passes the change on to the listeners."""
+        for listener in list(self._listeners):
+            listener.object_changed(source, event, details)
+
+    @property
+    def undo_log(self):
+        """UndoLog of the changes made to the database, its leagues and the objects they hold"""
+        return self._undo_log
+
+    def command(self, name):
+        """group the changes made in a with block into one step of undo().
+        with db.command("Edit team"): ... See UndoLog.command."""
+        return self._undo_log.command(name)
+
+    def undo(self):
+        """reverse the last change (or command) and return its name, None if there is nothing to undo"""
+        return self._undo_log.undo()
+
+    def redo(self):
+        """apply the last undone change (or command) again and return its name,
+        None if there is nothing to redo"""
+        return self._undo_log.redo()
+
+    def snapshot(self):
+        """return a DatabaseSnapshot, a view of the database frozen as it is now for
+        readers working while it changes, on this thread or another. O(1) to take; close it when done.
+        with db.snapshot() as snapshot: ..."""
+        return DatabaseSnapshot(self)
+
+    @property
+    def search_index(self):
+        """prefix search index over the league, team and member names and member emails.
+        Built on first use and kept up to date as the database changes."""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.leagues)
+            self.add_listener(self._search_index)
+        return self._search_index
+
+    def search(self, prefix, limit=None):
+        """return the leagues, teams and members whose name, a word of the name or
+        email starts with prefix (case-insensitive). See SearchIndex.search."""
+        return self.search_index.search(prefix, limit)
+
+    @property
+    def similarity_index(self):
+        """trigram index over the names and emails of all the members in the database.
+        Built on first use and kept up to date as the database changes."""
+        if self._similarity_index is None:
+            self._similarity_index = MemberSimilarityIndex(self.leagues)
+            self.add_listener(self._similarity_index)
+        return self._similarity_index
+
+    def similar_members(self, name=None, email=None, k=10):
+        """return up to k (score, member) pairs for the members whose name or email is
+        most like the given name or email. See MemberSimilarityIndex.similar."""
+        return self.similarity_index.similar(name, email, k)
+
+    @property
+    def person_registry(self):
+        """PersonRegistry of the members of the database by casefolded email.
+        Built on first use and kept up to date as the database changes."""
+        if self._person_registry is None:
+            self._person_registry = PersonRegistry(self.leagues)
+            self.add_listener(self._person_registry)
+        return self._person_registry
+
+    def person(self, email):
+        """return the member who is the person with email (case-insensitive), or None.
+        See PersonRegistry."""
+        return self.person_registry.person(email)
+
+    @staticmethod
+    def probable_duplicates(league, min_score=0.0):
+        """return (score, member, other member) for the pairs of members in league that are
+        probably the same person, most similar first. See MemberSimilarityIndex.probable_duplicates."""
+        members = [member for team in league.teams for member in team.members]
+        return MemberSimilarityIndex.for_members(members).probable_duplicates(min_score)
+
+    @changing
+    def add_league(self, league, index=None):
+        """add the specified league to the leagues list, at index (as a league_removed
+        event reports it) if given"""
+        index = insert(self.leagues, league, index)
+        league.add_observer(self)
+        self._leagues_changed = True
+        self.object_changed(self, "league_added", {"league": league, "index": index})
 
-    def remove_league(self, league):
+    @changing
+    def remove_league(self, league, index=None):
         """remove the specified league from the leagues list.
-        If league is not in the leagues list, simply do nothing (not an error)."""
-        if league in self.leagues:
-            self.leagues.remove(league)
+        If league is not in the leagues list, simply do nothing (not an error).
+        index, when given, is where league was added (as a league_added event reports
+        it): league itself is removed from there, or from where it is now."""
+        if index is not None:
+            index = position(self.leagues, league, index)
+        elif league in self.leagues:
+            index = self.leagues.index(league)
+        if index is not None:
+            league = self.leagues.pop(index)
+            league.remove_observer(self)
+            self._leagues_changed = True
+            self.object_changed(self, "league_removed", {"league": league, "index": index})
 
+    @instrumented("LeagueDatabase.league_named")
     def league_named(self, name):
         """return the league with the given name or None of no such league exists"""
         for league in self.leagues:
@@ -63,56 +473,336 @@ class LeagueDatabase:
                 return league
         return None
 
+    def competitions_between(self, start=None, end=None):
+        """generate the competitions of all the leagues with start <= date_time < end
+        in date_time order, merging the leagues' sorted indexes as it goes."""
+        return heapq.merge(*[league.competitions_between(start, end) for league in self.leagues],
+                           key=lambda c: c.date_time)
+
+    def competitions_at(self, location, start=None, end=None):
+        """generate the competitions of all the leagues at location with
+        start <= date_time < end in date_time order"""
+        return heapq.merge(*[league.competitions_at(location, start, end) for league in self.leagues],
+                           key=lambda c: c.date_time)
+
     def next_oid(self):
         """increment _last_id and return its new value (used to generate oid's for your objects)"""
         self._last_oid += 1
         return self._last_oid
 
+    def schedule_round_robin(self, league, locations, date_times, rounds=1, duration=None):
+        """build a round-robin draw for the teams of league on the given locations and
+        date_time slots, with games lasting duration (see RoundRobinScheduler), add the
+        competitions to the league in one batch and return them."""
+        competitions = RoundRobinScheduler(league, locations, date_times, rounds, duration).schedule(self.next_oid)
+        league.add_competitions(competitions)
+        return competitions
+
+    def check_integrity(self, repair=False):
+        """return the IntegrityProblems of the database (see IntegrityChecker), one pass
+        over all its objects. With repair, the problems are also fixed: the repaired
+        leagues are marked changed, the indexes are built again on next use and the
+        undo history, which may no longer match, is cleared."""
+        problems = IntegrityChecker(self).check(repair)
+        if repair and problems:
+            for league in {id(problem.path[0]): problem.path[0] for problem in problems}.values():
+                league.repaired()
+            for index in (self._search_index, self._similarity_index, self._person_registry):
+                if index is not None:
+                    self.remove_listener(index)
+            self._search_index = None
+            self._similarity_index = None
+            self._person_registry = None
+            self._undo_log.clear()
+        return problems
+
+    def unsaved_leagues(self):
+        """return the leagues changed since the database was last saved or loaded"""
+        return [league for league in self.leagues if league.dirty]
+
+    def has_unsaved_changes(self):
+        """True when a league changed, or leagues were added or removed, since the
+        database was last saved or loaded"""
+        return self._leagues_changed or any(league.dirty for league in self.leagues)
+
+    @instrumented("LeagueDatabase.save", bytes_written=file_size)
     def save(self, file_name):
         """save this database on the specified file. Before saving,
-        check if the file exists and if it does, rename it to file_name with '.backup' added."""
+        check if the file exists and if it does, rename it to file_name with '.backup' added.
+        Only the leagues changed since the last save or load are encoded, the bytes of the
+        others are copied from the file they were saved in or loaded from (when that file
+        has not changed since). See read() for the layout of the file.
+        If file_name is a directory, save the database in it with save_shards()."""
+        if os.path.isdir(file_name):
+            self.save_shards(file_name)
+            return
+        previous = None
+        if self._saved_file is not None and os.path.isfile(self._saved_file[0]) \
+                and self._file_stamp(self._saved_file[0]) == self._saved_file[1]:
+            previous = self._saved_file[0]
+        kept = {}
+        """league oid -> bytes of the league, read before the rename replaces previous"""
         if os.path.isfile(file_name):
+            if previous == file_name + ".backup":
+                # loaded from the backup (see load()): the rename below overwrites it
+                kept = self._reusable_leagues(previous)
+                previous = None
             rename(file_name, file_name + ".backup")
-        with open(file_name, mode='wb') as f:
-            pickle.dump(self, f)
+            if previous == file_name:
+                previous = file_name + ".backup"
+        contents = []
+        old = open(previous, mode="rb") if previous is not None else None
+        try:
+            with open(file_name, mode='wb') as f:
+                f.write(self.FILE_MARK)
+                for league in self.leagues:
+                    offset = f.tell()
+                    saved = self._saved_leagues.get(league.oid)
+                    if league.oid in kept:
+                        f.write(kept[league.oid])
+                    elif old is not None and saved is not None and not league.dirty:
+                        old.seek(saved[0])
+                        f.write(old.read(saved[1]))
+                    else:
+                        f.write(BinaryFormat.write_league(league))
+                    contents.append((league.oid, offset, f.tell() - offset))
+                contents_offset = f.tell()
+                f.write(self.CONTENTS.pack(self._last_oid, len(contents)))
+                for entry in contents:
+                    f.write(self.CONTENTS_ENTRY.pack(*entry))
+                f.write(struct.pack("<Q", contents_offset))
+        finally:
+            if old is not None:
+                old.close()
+        for league in self.leagues:
+            league.mark_saved()
+        self._leagues_changed = False
+        self._saved_leagues = {oid: (offset, size) for oid, offset, size in contents}
+        self._saved_file = (file_name, self._file_stamp(file_name))
+        self._saved_shards = {}
+
+    def _reusable_leagues(self, file_name):
+        """return {league oid: bytes} of the leagues that save() would copy from file_name"""
+        kept = {}
+        with open(file_name, mode="rb") as old:
+            for league in self.leagues:
+                saved = self._saved_leagues.get(league.oid)
+                if saved is not None and not league.dirty:
+                    old.seek(saved[0])
+                    kept[league.oid] = old.read(saved[1])
+        return kept
+
+    @instrumented("LeagueDatabase.save_shards")
+    def save_shards(self, directory, workers=None):
+        """save this database in directory (created if needed): one file per league,
+        league-<oid>-<generation>.dat, holding FILE_MARK and the league encoded by
+        BinaryFormat, and MANIFEST: MANIFEST_MARK, MANIFEST_HEADER, then for each league in
+        order a MANIFEST_ENTRY, its name and the name of its shard file.
+        Only the shards of the leagues changed since they were last saved or loaded are
+        written, under names no manifest used yet (the generation is one more than the
+        highest in the directory), then the manifest is written beside the old one and
+        renamed over it. An interrupted save thus leaves the previous manifest with its
+        last oid and the shards it lists untouched. The shard files the new manifest does
+        not list are removed last.
+        Where worker processes can be forked, the leagues are encoded and written by a
+        pool of workers processes at once, which inherit the leagues instead of having
+        them sent. With workers=1 (the default on a single processor), a single shard to
+        write or no fork, that is done here."""
+        os.makedirs(directory, exist_ok=True)
+        existing = [self.SHARD_NAME.match(name) for name in os.listdir(directory)]
+        generation = 1 + max((int(match.group(2) or 0) for match in existing if match), default=0)
+        shards = []
+        writes = []
+        for i, league in enumerate(self.leagues):
+            saved = self._saved_shards.get(league.oid)
+            if league.dirty or saved is None or saved[0] != os.path.join(directory, os.path.basename(saved[0])) \
+                    or not os.path.isfile(saved[0]) or self._file_stamp(saved[0]) != saved[1]:
+                path = os.path.join(directory, self._shard_name(league.oid, generation))
+                writes.append((i, path))
+            else:
+                path = saved[0]
+            shards.append((league, os.path.basename(path)))
+        global _saving
+        workers = workers or os.cpu_count() or 1
+        if len(writes) > 1 and workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            _saving = self.leagues
+            try:
+                with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                    stamps = list(pool.map(_save_shard, [i for i, path in writes], [path for i, path in writes]))
+            finally:
+                _saving = None
+        else:
+            stamps = [self._write_shard(path, self.FILE_MARK + BinaryFormat.write_league(self.leagues[i]))
+                      for i, path in writes]
+        for (i, path), stamp in zip(writes, stamps):
+            self._saved_shards[self.leagues[i].oid] = (path, stamp)
+        self._write_manifest(directory, self._last_oid, generation, shards)
+        listed = {shard for league, shard in shards}
+        for match in existing:
+            if match and match.group(0) not in listed:
+                os.remove(os.path.join(directory, match.group(0)))
+        for league in self.leagues:
+            league.mark_saved()
+        self._leagues_changed = False
+        self._saved_shards = {league.oid: self._saved_shards[league.oid] for league in self.leagues}
+        self._saved_file = None
+        self._saved_leagues = {}
 
-    def import_league_teams(self, league, file_name):
+    @instrumented("import_league_teams", bytes_read=file_size)
+    def import_league_teams(self, league, file_name, mismatches=None):
         """Load the teams and team members in a league from a CSV formatted file.
         The file will contain three columns: team name, team member name, email.
         The first line of the file will be a "header" line and should be ignored.
         The file will be UTF-8 encoded and may contain non-ASCII text.
         Note that the first argument to this method must be a league object, not the name of a league.
-        If an error occurs while loading a league, display a message on the console. """
+        If an error occurs while loading a league, display a message on the console.
+        A row whose email (case-insensitive) is already a person's (see person_registry), or
+        is on an earlier row, adds that same member rather than a new one; the name on
+        the row is then not used, and (name on the row, member) is appended to
+        mismatches, if given, for each such row whose name is not the member's.
+        The whole file is checked before anything is added: if some rows would be rejected
+        (a duplicated email in a team, for example) InvalidBatch lists them all and the
+        league is left as it was."""
         try:
+            teams = {}
+            for team in reversed(league.teams):
+                teams[team.name] = team
+            new_teams = []
+            new_members = {}    # team -> the members read for it
+            team_lines = {}     # new team -> the line of the file that named it first
+            member_lines = {}   # team -> the line of the file of each member read for it
+            persons = {}        # casefolded email -> member made for an earlier row
             with open(file_name, newline='', encoding="utf-8") as f:
                 csv_reader = csv.reader(f)
                 for row in csv_reader:
                     if csv_reader.line_num > 1:
                         # ["Team name", "Member name", "Member email"]
-                        team = league.team_named(row[0])
+                        team = teams.get(row[0])
                         if team is None:
-                            team = Team(self.next_oid(), row[0])
-                            league.add_team(team)
-                        team.add_member(TeamMember(self.next_oid(), row[1], row[2]))
+                            team = teams[row[0]] = Team(self.next_oid(), row[0])
+                            new_teams.append(team)
+                            team_lines[team] = csv_reader.line_num
+                        member = self._member_for_row(row[1], row[2], persons, mismatches)
+                        new_members.setdefault(team, []).append(member)
+                        member_lines.setdefault(team, []).append(csv_reader.line_num)
+            problems = [(team_lines[team], (team, e)) for team, e in league.check_teams(new_teams)]
+            for team, members in new_members.items():
+                problems += self._problem_lines(team.check_members(members), members, member_lines[team])
+            if problems:
+                # in file order: the members resolved to persons have older oids than the rows around them
+                problems = [problem for line, problem in sorted(problems, key=lambda p: p[0])]
+                raise InvalidBatch.for_problems(problems, len(new_teams) + sum(map(len, new_members.values())))
+            with self.command(f"Import {file_name}"):
+                for team in new_teams:
+                    team.add_members(new_members.pop(team, []))
+                league.add_teams(new_teams)
+                for team, members in new_members.items():
+                    team.add_members(members)
             return league
         except FileNotFoundError:
             print("File not found.")
         except IOError:
             print("An error occurred.")
 
+    @staticmethod
+    def _problem_lines(problems, members, lines):
+        """return (line, problem) for the problems check_members found in members, read
+        from the lines of the file: the problems come in the order of members, and a
+        member on several rows has one problem per row after the first"""
+        found = []
+        i = 0
+        for problem in problems:
+            while members[i] is not problem[0]:
+                i += 1
+            found.append((lines[i], problem))
+            i += 1
+        return found
+
+    def _member_for_row(self, name, email, persons, mismatches=None):
+        """the member for a row of a roster file: the person with email (see person_registry),
+        or the member made for an earlier row with it (kept in persons by casefolded
+        email), or else a new member. (name, member) is appended to mismatches, if
+        given, when the member found has another name than the row's."""
+        key = self.person_registry.key(email) if email else None
+        member = (self.person_registry.person(email) or persons.get(key)) if key else None
+        if member is None:
+            member = TeamMember(self.next_oid(), name, email)
+            if key:
+                persons[key] = member
+        elif member.name != name and mismatches is not None:
+            mismatches.append((name, member))
+        return member
+
+    @instrumented("sync_league_teams", bytes_read=file_size)
+    def sync_league_teams(self, league, file_name):
+        """Bring the teams of league in line with a roster CSV file laid out as for
+        import_league_teams, a revised version of a file imported before for example,
+        and return the RosterSync listing what was inserted, updated and removed.
+        Members are matched by (team name, casefolded email), so syncing the same file
+        again changes nothing, and only the teams whose rows changed are compared member
+        by member. New rows are resolved to persons as by import_league_teams, members
+        of the file's teams missing from it are removed, and the league's other teams
+        are left alone. As for import_league_teams, nothing is changed if some rows would
+        be rejected (InvalidBatch), rows with fewer than three columns included, and
+        errors reading the file are shown on the console. A member's name or email is
+        updated on every team the person is on (see RosterSync).
+        The changes are one step of undo()."""
+        try:
+            sync = RosterSync.read(league, file_name)
+            teams = {}
+            for team in reversed(league.teams):
+                teams[team.name] = team
+            new_teams = []
+            for name in sync.new_teams:
+                teams[name] = Team(self.next_oid(), name)
+                new_teams.append(teams[name])
+            new_members = {}    # team -> the members inserted in it
+            persons = {}
+            for team_name, name, email in sync.inserted:
+                new_members.setdefault(teams[team_name], []).append(
+                    self._member_for_row(name, email or "", persons, sync.mismatched))
+            problems = sync.bad_rows + league.check_teams(new_teams)
+            for team, members in new_members.items():
+                problems += team.check_members(members)
+            if problems:
+                raise InvalidBatch.for_problems(problems, len(sync.bad_rows) + len(new_teams) + len(sync.inserted))
+            with self.command(f"Sync {file_name}"):
+                removed = {}
+                for team, member in sync.removed:
+                    removed.setdefault(team, []).append(member)
+                for team, members in removed.items():
+                    team.remove_members(members)
+                for team, member, fields in sync.updated:
+                    for field, (old, new) in fields.items():
+                        setattr(member, field, new)
+                for team in new_teams:
+                    team.add_members(new_members.pop(team, []))
+                league.add_teams(new_teams)
+                for team, members in new_members.items():
+                    team.add_members(members)
+            return sync
+        except FileNotFoundError:
+            print("File not found.")
+        except IOError:
+            print("An error occurred.")
+
+    @instrumented("export_league_teams", bytes_written=file_size)
     def export_league_teams(self, league, file_name):
         """write the specified league to a CSV formatted file.
         The first line of the file must be a "header" row containing the following text
         (without the leading spaces): Team name, Member name, Member email
-        If an error occurs while writing a league, display a message on the console."""
+        If an error occurs while writing a league, display a message on the console.
+        The league is written as it was when the export started (see snapshot), even
+        if it changes while the file is written."""
         try:
-            with open(file_name, 'w', newline='', encoding="utf-8") as f:
+            with open(file_name, 'w', newline='', encoding="utf-8") as f, self.snapshot() as snapshot:
                 csv_writer = csv.writer(f)
                 # csv_writer.writeheader(["Team name", "Member name", "Member email"])
                 csv_writer.writerow(["Team name", "Member name", "Member email"])
-                for team in league.teams:
-                    for member in team.members:
-                        csv_writer.writerow([team.name, member.name, member.email])
+                for team in snapshot.teams(league):
+                    team_name = snapshot.get(team, "name")
+                    for member in snapshot.members(team):
+                        csv_writer.writerow([team_name, snapshot.get(member, "name"), snapshot.get(member, "email")])
         except FileNotFoundError:
             print("File not found.")
         except IOError:
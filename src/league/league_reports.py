@@ -0,0 +1,149 @@
+"""Weekly roster and schedule reports of every league, in HTML and CSV.
+
+Run from the repository root:
+  python -m src.league.league_reports database.dat reports_dir [workers]
+"""
+import csv
+import hashlib
+import html
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from src.league.binary_format import BinaryFormat
+
+
+class LeagueReports:
+    """Writes, for each league of a database, into a directory:
+      league-<oid>.html           the teams with their members, then the schedule
+      league-<oid>-roster.csv     Team name, Member name, Member email (as export_league_teams)
+      league-<oid>-schedule.csv   Date, Location, Teams, Result of each competition
+    Each league is encoded by BinaryFormat and its report written from those bytes by a
+    pool of worker processes, one league per task, so the leagues are formatted on
+    several cores at once. The files are written row by row beside their old version
+    and renamed over it.
+    The SHA-256 of the encoded league is kept in MANIFEST with the files written, and
+    a league with the same hash and all its files still there is skipped, so a weekly
+    run costs the leagues that changed. The reports of leagues no longer in the
+    database are removed."""
+
+    MANIFEST = "reports.json"
+
+    def __init__(self, directory, workers=None):
+        self.directory = directory
+        self.workers = workers
+
+    @staticmethod
+    def file_names(oid):
+        """the names of the report files of the league with oid"""
+        return [f"league-{oid}.html", f"league-{oid}-roster.csv", f"league-{oid}-schedule.csv"]
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, self.MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        path = os.path.join(self.directory, self.MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def _up_to_date(self, entry, digest):
+        return entry is not None and entry["hash"] == digest and \
+            all(os.path.isfile(os.path.join(self.directory, name)) for name in entry["files"])
+
+    def write(self, leagues):
+        """write the reports of leagues that changed since the last run and return the
+        oids of the leagues written"""
+        os.makedirs(self.directory, exist_ok=True)
+        old = self._read_manifest()
+        manifest = {}
+        tasks = []
+        for league in leagues:
+            data = BinaryFormat.write_league(league)
+            digest = hashlib.sha256(data).hexdigest()
+            entry = old.get(str(league.oid))
+            if not self._up_to_date(entry, digest):
+                tasks.append(data)
+                entry = {"hash": digest, "files": self.file_names(league.oid)}
+            manifest[str(league.oid)] = entry
+        if len(tasks) > 1 and self.workers != 1:
+            with ProcessPoolExecutor(self.workers) as pool:
+                written = list(pool.map(_write_report, [self.directory] * len(tasks), tasks))
+        else:
+            written = [_write_report(self.directory, data) for data in tasks]
+        for oid, entry in old.items():
+            if oid not in manifest:
+                for name in entry["files"]:
+                    if os.path.isfile(os.path.join(self.directory, name)):
+                        os.remove(os.path.join(self.directory, name))
+        self._write_manifest(manifest)
+        return written
+
+    @staticmethod
+    def schedule(league):
+        """the competitions of league by date_time, the ones without one last"""
+        return sorted(league.competitions, key=lambda c: (c.date_time is None, c.date_time or 0, c.oid))
+
+    @staticmethod
+    def result(competition):
+        return "" if not competition.has_result else "-".join(str(score) for score in competition.final_scores)
+
+    @classmethod
+    def write_html(cls, league, f):
+        name = html.escape(league.name)
+        f.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{name}</title></head>\n"
+                f"<body>\n<h1>{name}</h1>\n<h2>Teams</h2>\n")
+        for team in league.teams:
+            f.write(f"<h3>{html.escape(team.name)}</h3>\n<table>\n<tr><th>Name</th><th>Email</th></tr>\n")
+            for member in team.members:
+                f.write(f"<tr><td>{html.escape(member.name)}</td>"
+                        f"<td>{html.escape(member.email or '')}</td></tr>\n")
+            f.write("</table>\n")
+        f.write("<h2>Schedule</h2>\n<table>\n<tr><th>Date</th><th>Location</th><th>Teams</th><th>Result</th></tr>\n")
+        for competition in cls.schedule(league):
+            teams = " vs ".join(team.name for team in competition.teams_competing)
+            f.write(f"<tr><td>{competition.date_time or ''}</td><td>{html.escape(competition.location or '')}</td>"
+                    f"<td>{html.escape(teams)}</td><td>{cls.result(competition)}</td></tr>\n")
+        f.write("</table>\n</body></html>\n")
+
+    @staticmethod
+    def write_roster(league, f):
+        writer = csv.writer(f)
+        writer.writerow(["Team name", "Member name", "Member email"])
+        for team in league.teams:
+            for member in team.members:
+                writer.writerow([team.name, member.name, member.email])
+
+    @classmethod
+    def write_schedule(cls, league, f):
+        writer = csv.writer(f)
+        writer.writerow(["Date", "Location", "Teams", "Result"])
+        for competition in cls.schedule(league):
+            writer.writerow([competition.date_time or "", competition.location,
+                             " vs ".join(team.name for team in competition.teams_competing),
+                             cls.result(competition)])
+
+
+def _write_report(directory, data):
+    """write the report files of the league encoded in data, return its oid.
+    Runs in the worker processes, so it is a function of the module."""
+    league = BinaryFormat.read_league(memoryview(data))
+    writers = [LeagueReports.write_html, LeagueReports.write_roster, LeagueReports.write_schedule]
+    for name, write in zip(LeagueReports.file_names(league.oid), writers):
+        path = os.path.join(directory, name)
+        with open(path + ".tmp", "w", newline="", encoding="utf-8") as f:
+            write(league, f)
+        os.replace(path + ".tmp", path)
+    return league.oid
+
+
+if __name__ == '__main__':
+    from src.league.league_database import LeagueDatabase
+    reports = LeagueReports(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else None)
+    changed = reports.write(LeagueDatabase.read(sys.argv[1]).leagues)
+    print(f"{len(changed)} league report(s) written to {sys.argv[2]}.")
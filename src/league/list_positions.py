@@ -0,0 +1,81 @@
+"""Places of objects in the lists of the model (a team's members, a league's teams
+and competitions, the database's leagues), as the change events report them.
+The undo log gives them back to put an object where it was, or to take out the
+object it added, with one list operation instead of a search with ==."""
+
+
+def position(items, obj, index=None):
+    """the index of obj itself (not an equal object) in items, or None.
+    index is where obj is expected: if it is there the list is not searched."""
+    if index is not None and index < len(items) and items[index] is obj:
+        return index
+    for i, item in enumerate(items):
+        if item is obj:
+            return i
+    return None
+
+
+def insert(items, obj, index=None):
+    """put obj at index of items, or at the end if index is None or past it, and
+    return where it went"""
+    if index is None or index >= len(items):
+        items.append(obj)
+        return len(items) - 1
+    items.insert(index, obj)
+    return index
+
+
+def put_in(items, objects, indexes=None):
+    """put objects in items at indexes, increasing places in items once they are in
+    (as a batch removal event reports them), or at the end if indexes is None, and
+    return where they went. One slice assignment when the places follow each other,
+    otherwise one pass over the list."""
+    if indexes is None or not objects:
+        start = len(items)
+        items.extend(objects)
+        return range(start, len(items))
+    if indexes[-1] - indexes[0] == len(objects) - 1:
+        start = min(indexes[0], len(items))
+        items[start:start] = objects
+        return range(start, start + len(objects))
+    merged = []
+    places = []
+    taken = 0
+    for index, obj in zip(indexes, objects):
+        if index > len(merged):
+            more = items[taken:taken + index - len(merged)]
+            merged += more
+            taken += len(more)
+        places.append(len(merged))
+        merged.append(obj)
+    merged += items[taken:]
+    items[:] = merged
+    return places
+
+
+def take_out(items, objects, indexes=None):
+    """remove objects themselves (not equal objects) from items and return the ones
+    removed, in list order, with their places in items before. Objects not in items
+    are ignored. indexes is where objects are expected (as a batch add event reports
+    them): if they follow each other there, that slice is deleted, otherwise items is
+    filtered in one pass against the identities of objects."""
+    if indexes is not None and objects and len(indexes) == len(objects) \
+            and indexes[-1] - indexes[0] == len(objects) - 1:
+        start = indexes[0]
+        here = items[start:start + len(objects)]
+        if len(here) == len(objects) and all(item is obj for item, obj in zip(here, objects)):
+            del items[start:start + len(objects)]
+            return here, range(start, start + len(objects))
+    ids = {id(obj) for obj in objects}
+    kept = []
+    removed = []
+    places = []
+    for i, item in enumerate(items):
+        if id(item) in ids:
+            removed.append(item)
+            places.append(i)
+        else:
+            kept.append(item)
+    if removed:
+        items[:] = kept
+    return removed, places
@@ -0,0 +1,168 @@
+"""Streams a LeagueDatabase to and from NDJSON, one JSON object per line.
+
+Run from the repository root ("-" is standard input or output):
+  python -m src.league.ndjson_format export leagues.dat leagues.ndjson
+  python -m src.league.ndjson_format import leagues.ndjson leagues.dat ["League name" ...]
+"""
+import datetime as dt
+import json
+import sys
+from src.league.competition import Competition
+from src.league.exception_bad_file_format import BadFileFormat
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class NdjsonFormat:
+    """Writes and reads a whole database as lines of JSON, oids included, so other
+    programs can consume it. Each line is one object with a "type":
+      {"type": "database", "version": 1, "last_oid": 30}                          first line
+      {"type": "league", "oid": 1, "name": "...", "reject_conflicts": false}
+      {"type": "team", "oid": 2, "league": 1, "name": "...",
+       "members": [{"oid": 4, "name": "...", "email": "..."}, ...]}
+      {"type": "competition", "oid": 7, "league": 1, "teams": [2, 3], "location": "...",
+       "date_time": "2024-01-05T19:30:00", "duration": 7200.0,
+       "end_scores": [[1, 0], [0, 2]], "final_scores": [1, 2]}
+    A league's line comes before the lines of its teams, then its competitions. A team
+    or member held by several containers is written each time and read once (the first
+    line with its oid wins). A team that plays in a competition without being in its
+    league has "listed": false. date_time is ISO 8601 or null, duration in seconds,
+    end_scores and final_scores null when there is no result.
+    Both directions go line by line: nothing but the current line is held besides the
+    database being read, so a database can be piped between programs, and read() can
+    keep only some of the leagues."""
+
+    VERSION = 1
+
+    @classmethod
+    def lines(cls, db):
+        """generate the lines (without line ends) for db"""
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        yield dumps({"type": "database", "version": cls.VERSION, "last_oid": db._last_oid})
+        for league in db.leagues:
+            yield dumps({"type": "league", "oid": league.oid, "name": league.name,
+                         "reject_conflicts": league.reject_conflicts})
+            for team in league.teams:
+                yield dumps(cls._team(team, league))
+            listed = {id(team) for team in league.teams}
+            for competition in league.competitions:
+                for team in competition.teams_competing:
+                    if id(team) not in listed:
+                        listed.add(id(team))
+                        record = cls._team(team, league)
+                        record["listed"] = False
+                        yield dumps(record)
+                yield dumps({"type": "competition", "oid": competition.oid, "league": league.oid,
+                             "teams": [team.oid for team in competition.teams_competing],
+                             "location": competition.location,
+                             "date_time": competition.date_time.isoformat()
+                             if competition.date_time is not None else None,
+                             "duration": competition.duration.total_seconds(),
+                             "end_scores": competition.end_scores, "final_scores": competition.final_scores})
+
+    @staticmethod
+    def _team(team, league):
+        return {"type": "team", "oid": team.oid, "league": league.oid, "name": team.name,
+                "members": [{"oid": m.oid, "name": m.name, "email": m.email} for m in team.members]}
+
+    @classmethod
+    def write(cls, db, f):
+        """write db to the text file f"""
+        for line in cls.lines(db):
+            f.write(line)
+            f.write("\n")
+
+    @classmethod
+    def read(cls, f, leagues=None):
+        """return a new LeagueDatabase (not the sole instance) made from the lines of f,
+        an open text file or any iterable of lines. With leagues, a collection of league
+        names, only those leagues are kept: the lines of the others are skipped.
+        The leagues read are marked changed. Raises BadFileFormat for a line that is
+        not part of the format, naming its line number."""
+        db = LeagueDatabase()
+        teams = {}
+        members = {}
+        kept = {}
+        """oid -> League of the leagues being read"""
+        line_number = 0
+        try:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                kind = record["type"]
+                if kind == "database":
+                    if record["version"] > cls.VERSION:
+                        raise BadFileFormat(f"Version {record['version']} is newer than {cls.VERSION}.")
+                    db._last_oid = max(db._last_oid, record["last_oid"])
+                elif kind == "league":
+                    if leagues is None or record["name"] in leagues:
+                        league = kept[record["oid"]] = League(record["oid"], record["name"])
+                        league.reject_conflicts = record.get("reject_conflicts", False)
+                        db._leagues.append(league)
+                        league.add_observer(db)
+                elif kind == "team":
+                    league = kept.get(record["league"])
+                    if league is not None:
+                        team = teams.get(record["oid"])
+                        if team is None:
+                            team = teams[record["oid"]] = cls._read_team(record, members)
+                        if record.get("listed", True):
+                            league._teams.append(team)
+                            team.add_observer(league)
+                elif kind == "competition":
+                    league = kept.get(record["league"])
+                    if league is not None:
+                        league._competitions.append(cls._read_competition(record, teams))
+                        league._competitions[-1].add_observer(league)
+                else:
+                    raise BadFileFormat(f"Unknown type {kind!r}.")
+        except (ValueError, KeyError, TypeError) as e:
+            raise BadFileFormat(f"Line {line_number}: {e}")
+        for league in db._leagues:
+            league.repaired()    # its lists were filled directly
+        db._leagues_changed = True
+        return db
+
+    @staticmethod
+    def _read_team(record, members):
+        team = Team(record["oid"], record["name"])
+        for m in record["members"]:
+            member = members.get(m["oid"])
+            if member is None:
+                member = members[m["oid"]] = TeamMember(m["oid"], m["name"], m["email"])
+            team._members.append(member)
+            member.add_observer(team)
+        return team
+
+    @staticmethod
+    def _read_competition(record, teams):
+        date_time = record.get("date_time")
+        duration = record.get("duration")
+        competition = Competition(record["oid"], [teams[oid] for oid in record["teams"]], record.get("location"),
+                                  dt.datetime.fromisoformat(date_time) if date_time is not None else None,
+                                  dt.timedelta(seconds=duration) if duration is not None else None)
+        if record.get("final_scores") is not None:
+            competition._end_scores = [tuple(end) for end in record["end_scores"]]
+            competition._final_scores = tuple(record["final_scores"])
+        return competition
+
+
+def _open(file_name, mode):
+    if file_name == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(file_name, mode, encoding="utf-8")
+
+
+if __name__ == '__main__':
+    command, source, target = sys.argv[1:4]
+    if command == "export":
+        with _open(target, "w") as out:
+            NdjsonFormat.write(LeagueDatabase.read(source), out)
+    elif command == "import":
+        with _open(source, "r") as lines:
+            NdjsonFormat.read(lines, sys.argv[4:] or None).save(target)
+    else:
+        sys.exit(f"Unknown command {command}, use export or import.")
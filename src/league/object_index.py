@@ -0,0 +1,115 @@
+from src.league.league import League
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class ObjectIndex:
+    """Base class for the indexes that a LeagueDatabase keeps up to date by telling
+    them about every change (see LeagueDatabase.add_listener).
+    This class keeps track of which leagues, teams and members are reachable from the
+    database, counting the paths to each one since a member may be on several teams
+    and a team in several leagues. Subclasses are told when objects become reachable,
+    stop being reachable or change, in batches so they can update in bulk."""
+
+    def __init__(self, leagues=()):
+        self._counts = {}
+        """(kind, oid) -> number of paths from the database to that object"""
+        added = []
+        for league in leagues:
+            self._add_tree(league, added)
+        self._objects_added(added)
+
+    @staticmethod
+    def _kind(obj):
+        if isinstance(obj, League):
+            return "league"
+        if isinstance(obj, Team):
+            return "team"
+        if isinstance(obj, TeamMember):
+            return "member"
+        return None
+
+    def _objects_added(self, objects):
+        """called with the objects that just became reachable"""
+        pass
+
+    def _objects_removed(self, objects):
+        """called with the objects that are no longer reachable"""
+        pass
+
+    def _object_updated(self, obj, event):
+        """called when a reachable object reports a change other than adding or removing a child"""
+        pass
+
+    def _add(self, obj, added):
+        ident = (self._kind(obj), obj.oid)
+        count = self._counts.get(ident, 0)
+        self._counts[ident] = count + 1
+        if count == 0:
+            added.append(obj)
+
+    def _discard(self, obj, removed):
+        ident = (self._kind(obj), obj.oid)
+        count = self._counts.get(ident, 0)
+        if count == 1:
+            del self._counts[ident]
+            removed.append(obj)
+        elif count > 1:
+            self._counts[ident] = count - 1
+
+    def _add_tree(self, obj, added):
+        self._add(obj, added)
+        if isinstance(obj, League):
+            for team in obj.teams:
+                self._add_tree(team, added)
+        elif isinstance(obj, Team):
+            for member in obj.members:
+                self._add(member, added)
+
+    def _discard_tree(self, obj, removed):
+        self._discard(obj, removed)
+        if isinstance(obj, League):
+            for team in obj.teams:
+                self._discard_tree(team, removed)
+        elif isinstance(obj, Team):
+            for member in obj.members:
+                self._discard(member, removed)
+
+    def contains(self, obj):
+        """return True if obj is reachable from the database"""
+        return (self._kind(obj), obj.oid) in self._counts
+
+    def object_changed(self, source, event, details):
+        """keep the index up to date with a change reported by the database"""
+        added = []
+        removed = []
+        if event == "league_added":
+            self._add_tree(details["league"], added)
+        elif event == "league_removed":
+            self._discard_tree(details["league"], removed)
+        elif event == "team_added":
+            self._add_tree(details["team"], added)
+        elif event == "teams_added":
+            for team in details["teams"]:
+                self._add_tree(team, added)
+        elif event == "team_removed":
+            self._discard_tree(details["team"], removed)
+        elif event == "teams_removed":
+            for team in details["teams"]:
+                self._discard_tree(team, removed)
+        elif event == "member_added":
+            self._add(details["member"], added)
+        elif event == "members_added":
+            for member in details["members"]:
+                self._add(member, added)
+        elif event == "member_removed":
+            self._discard(details["member"], removed)
+        elif event == "members_removed":
+            for member in details["members"]:
+                self._discard(member, removed)
+        elif self._kind(source) is not None and self.contains(source):
+            self._object_updated(source, event)
+        if removed:
+            self._objects_removed(removed)
+        if added:
+            self._objects_added(added)
@@ -0,0 +1,94 @@
+class ObjectPager:
+    """The rows of a list view over a list of league objects (team.members, league.teams),
+    handed out a page at a time so a view of a huge roster only makes the rows it shows.
+    The pager holds the list itself, not a copy: until a filter or a sort is set, a row
+    is the object at that index of the list, so making a pager costs the same for ten
+    members as for fifty thousand. A filter or a sort builds the list of rows once, in
+    the pager, and the view then pages through that.
+      fetched        number of rows handed out so far
+      can_fetch_more whether len(pager) > fetched
+      fetch_more()   hands out the next page
+    Call reset() after the list changes."""
+
+    PAGE = 256
+
+    def __init__(self, objects, page=PAGE):
+        self._objects = objects
+        self.page = page
+        self._filter = ""
+        self._sort_key = None
+        self._reverse = False
+        self._rows = None
+        """the objects shown, in order, when filtered or sorted; None for all of _objects"""
+        self.fetched = min(page, len(objects))
+
+    def __len__(self):
+        """number of rows, fetched or not"""
+        return len(self._objects) if self._rows is None else len(self._rows)
+
+    def __getitem__(self, row):
+        """the object in row"""
+        return self._objects[row] if self._rows is None else self._rows[row]
+
+    @property
+    def can_fetch_more(self):
+        return self.fetched < len(self)
+
+    def fetch_more(self, rows=None):
+        """hand out the next page (or rows rows) and return the range of the new rows"""
+        first = self.fetched
+        self.fetched = min(len(self), first + (rows or self.page))
+        return range(first, self.fetched)
+
+    def row(self, obj):
+        """return the row of obj, fetched or not, or -1 if it is not shown"""
+        rows = self._objects if self._rows is None else self._rows
+        for i, o in enumerate(rows):
+            if o is obj:
+                return i
+        return -1
+
+    @property
+    def filter(self):
+        return self._filter
+
+    def set_filter(self, text):
+        """show only the objects whose name or email contains text, ignoring case"""
+        self._filter = text.casefold()
+        self.reset()
+
+    def sort(self, key=None, reverse=False):
+        """show the objects in the order of key, a function of an object, by default
+        the casefolded name"""
+        self._sort_key = key or self._name
+        self._reverse = reverse
+        self.reset()
+
+    def unsort(self):
+        """show the objects in the order of the list again"""
+        self._sort_key = None
+        self.reset()
+
+    def reset(self):
+        """rebuild the rows after the list, the filter or the sort changed, keeping as
+        many rows fetched as before (at least a page)"""
+        if not self._filter and self._sort_key is None:
+            self._rows = None
+        else:
+            rows = self._objects
+            if self._filter:
+                rows = [o for o in rows if self._matches(o)]
+            if self._sort_key is not None:
+                rows = sorted(rows, key=self._sort_key, reverse=self._reverse)
+            self._rows = list(rows)
+        self.fetched = min(len(self), max(self.fetched, self.page))
+
+    @staticmethod
+    def _name(obj):
+        return obj.name.casefold()
+
+    def _matches(self, obj):
+        if self._filter in obj.name.casefold():
+            return True
+        email = getattr(obj, "email", None)
+        return email is not None and self._filter in email.casefold()
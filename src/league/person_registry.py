@@ -0,0 +1,65 @@
+from src.league.object_index import ObjectIndex
+
+
+class PersonRegistry(ObjectIndex):
+    """The people of a database, keyed by casefolded email, so that the same person on
+    several teams can be the same TeamMember (see LeagueDatabase.import_league_teams)
+    and links such as League.teams_for_member hold across teams. The person for an
+    email is the first member reachable from the database with that email. Members
+    without an email are not registered. Kept up to date by listening to the database
+    (see LeagueDatabase.person_registry)."""
+
+    def __init__(self, leagues=()):
+        self._persons = {}
+        """casefolded email -> list of the members with that email, the person first"""
+        self._emails = {}
+        """member oid -> the casefolded email it is registered under"""
+        super().__init__(leagues)
+
+    def __len__(self):
+        """number of distinct people"""
+        return len(self._persons)
+
+    @staticmethod
+    def key(email):
+        """the key of email in the registry, None for no email"""
+        return email.casefold() if email is not None else None
+
+    def person(self, email):
+        """return the member who is the person with email (case-insensitive), or None"""
+        members = self._persons.get(self.key(email))
+        return members[0] if members else None
+
+    def duplicates(self):
+        """return the lists of distinct members sharing an email, the person first:
+        they were made before the registry or edited to the same email"""
+        return [members for members in self._persons.values() if len(members) > 1]
+
+    def _objects_added(self, objects):
+        for member in objects:
+            if self._kind(member) != "member":
+                continue
+            key = self.key(member.email)
+            if key is not None:
+                self._emails[member.oid] = key
+                self._persons.setdefault(key, []).append(member)
+
+    def _objects_removed(self, objects):
+        for member in objects:
+            if self._kind(member) != "member":
+                continue
+            key = self._emails.pop(member.oid, None)
+            if key is None:
+                continue
+            members = self._persons[key]
+            for i, m in enumerate(members):
+                if m is member:
+                    del members[i]
+                    break
+            if not members:
+                del self._persons[key]
+
+    def _object_updated(self, obj, event):
+        if event == "email" and self._kind(obj) == "member":
+            self._objects_removed([obj])
+            self._objects_added([obj])
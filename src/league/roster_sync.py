@@ -0,0 +1,107 @@
+import csv
+
+
+class RosterSync:
+    """The changes that make the teams of a league match a roster file (rows of team
+    name, member name, email, as written by export_league_teams), for
+    LeagueDatabase.sync_league_teams. A member is matched by (team name, casefolded
+    email), or by its casefolded name when it has no email, with one dict lookup.
+    A team whose rows are exactly its members' names and emails, in order, is left
+    out at once; only the teams that changed are compared member by member.
+      new_teams  names of the teams of the file not in the league, in file order
+      inserted   [(team name, member name, email)] of the rows of no member yet
+      updated    [(team, member, {field: (old value, new value)})] of the members whose
+                 name, or the case of whose email, differs from their row
+      removed    [(team, member)] of the members of the file's teams not in it
+      mismatched [(member name, member)] of the inserted rows that were resolved to an
+                 existing person with another name (filled in by sync_league_teams)
+      bad_rows   [(row, ValueError)] of the rows with fewer than three columns, left out
+    Teams of the league that are not in the file are left alone. A member is one person
+    shared by all its teams: an update of its name or email is seen on every team it
+    is on, not only the team of its row (str lists those other teams)."""
+
+    def __init__(self, league, rows, lines=None):
+        """lines, if given, is the line of the file of each of rows, for bad_rows"""
+        self.league = league
+        self.new_teams = []
+        self.inserted = []
+        self.updated = []
+        self.removed = []
+        self.mismatched = []
+        self.bad_rows = []
+        blocks = {}
+        for i, row in enumerate(rows):
+            if len(row) < 3:
+                where = f"Line {lines[i]}" if lines is not None else f"Row {i + 1}"
+                self.bad_rows.append((row, ValueError(f"{where} has {len(row)} of the 3 columns: {row}")))
+                continue
+            team_name, name, email = row[:3]
+            blocks.setdefault(team_name, []).append((name, email or None))
+        teams = {}
+        for team in reversed(league.teams):
+            teams[team.name] = team
+        for team_name, block in blocks.items():
+            team = teams.get(team_name)
+            if team is None:
+                self.new_teams.append(team_name)
+                self.inserted += [(team_name, name, email) for name, email in block]
+            elif [(m.name, m.email or None) for m in team.members] != block:
+                self._compare(team, block)
+
+    @classmethod
+    def read(cls, league, file_name):
+        """the RosterSync of league with the CSV file file_name, whose first line is a header"""
+        with open(file_name, newline='', encoding="utf-8") as f:
+            csv_reader = csv.reader(f)
+            next(csv_reader, None)
+            rows = []
+            lines = []
+            for row in csv_reader:
+                if row:
+                    rows.append(row[:3])
+                    lines.append(csv_reader.line_num)
+            return cls(league, rows, lines)
+
+    @staticmethod
+    def key(name, email):
+        return ("email", email.casefold()) if email else ("name", name.casefold())
+
+    def _compare(self, team, block):
+        members = {}
+        for member in team.members:
+            members.setdefault(self.key(member.name, member.email), []).append(member)
+        for name, email in block:
+            matches = members.get(self.key(name, email))
+            if not matches:
+                self.inserted.append((team.name, name, email))
+                continue
+            member = matches.pop(0)
+            fields = {}
+            if member.name != name:
+                fields["name"] = (member.name, name)
+            if (member.email or None) != email:
+                fields["email"] = (member.email, email)
+            if fields:
+                self.updated.append((team, member, fields))
+        self.removed += [(team, member) for matches in members.values() for member in matches]
+
+    def _also_on(self, team, member):
+        """the end of the line of an update naming the league's other teams member is on"""
+        others = [other.name for other in self.league.teams_for_member(member) if other is not team]
+        return f" (also on {', '.join(others)})" if others else ""
+
+    def __bool__(self):
+        return bool(self.inserted or self.updated or self.removed)
+
+    def __str__(self):
+        """one line per change: + inserted, ~ updated, - removed"""
+        lines = [f"+ team {name}" for name in self.new_teams]
+        lines += [f"+ {team_name}: {name}<{email or ''}>" for team_name, name, email in self.inserted]
+        lines += [f"~ {team.name}: member {member.oid} " +
+                  ", ".join(f"{field}: {old!r} -> {new!r}" for field, (old, new) in sorted(fields.items())) +
+                  self._also_on(team, member)
+                  for team, member, fields in self.updated]
+        lines += [f"- {team.name}: {member.name}<{member.email or ''}>" for team, member in self.removed]
+        lines += [f"! {name} is {member.name}<{member.email}>, the person with that email"
+                  for name, member in self.mismatched]
+        return "\n".join(lines)
@@ -0,0 +1,98 @@
+from bisect import bisect_left, bisect_right
+
+from src.league.competition import Competition
+
+
+class RoundRobinScheduler:
+    """Builds a balanced round-robin draw for the teams of a league.
+    Every team meets every other team once per round (rounds=2 gives a double
+    round-robin with the teams swapped). The games are placed on the sheets
+    (locations) of the date_time slots in order, first fit, so that no team, no
+    member and no sheet is in two games at once. A game lasts duration, so when the
+    slots are closer together than that a game also takes its sheet, its teams and
+    their members in the slots it runs into.
+    Each team gets a bitset (a Python int) with one bit for the team and one bit
+    for each of its members, so checking a game against everyone already playing
+    in a slot is a single AND, even when members are on several teams."""
+
+    def __init__(self, league, locations, date_times, rounds=1, duration=None):
+        """locations is a list of the sheets that can be used at the same time,
+        date_times a list of the datetimes that games can start at, in order,
+        duration how long each game lasts (Competition.DEFAULT_DURATION if not given)."""
+        if not locations:
+            raise ValueError("At least one location is needed to make a schedule.")
+        self.league = league
+        self.locations = list(locations)
+        self.date_times = sorted(date_times)
+        self.rounds = rounds
+        self.duration = Competition.DEFAULT_DURATION if duration is None else duration
+
+    def pairings(self):
+        """return the draw as a list of rounds, each a list of (team, team) games,
+        using the circle method: one team stays put while the others rotate.
+        With an odd number of teams one team sits out each round."""
+        teams = list(self.league.teams)
+        if len(teams) % 2 == 1:
+            teams.append(None)
+        n = len(teams)
+        draw = []
+        for cycle in range(self.rounds):
+            order = list(teams)
+            for _ in range(n - 1):
+                games = []
+                for i in range(n // 2):
+                    home, away = order[i], order[n - 1 - i]
+                    if home is not None and away is not None:
+                        games.append((away, home) if cycle % 2 == 1 else (home, away))
+                draw.append(games)
+                order.insert(1, order.pop())
+        return draw
+
+    def masks(self):
+        """return {team oid: bitset of the team and its members}"""
+        bits = {}
+        masks = {}
+        for team in self.league.teams:
+            mask = 1 << bits.setdefault(("team", team.oid), len(bits))
+            for member in team.members:
+                mask |= 1 << bits.setdefault(("member", member.oid), len(bits))
+            masks[team.oid] = mask
+        return masks
+
+    def overlaps(self):
+        """return, for each slot, the range of the slots whose games would overlap a
+        game starting in it (the slots starting less than duration before or after)"""
+        return [range(bisect_right(self.date_times, start - self.duration),
+                      bisect_left(self.date_times, start + self.duration))
+                for start in self.date_times]
+
+    def schedule(self, next_oid):
+        """return the list of Competitions for the draw, without adding them to the league.
+        next_oid is called to get the oid of each competition (e.g. LeagueDatabase.next_oid).
+        Raises ValueError if the games do not fit in the date_time slots."""
+        masks = self.masks()
+        overlaps = self.overlaps()
+        all_sheets = (1 << len(self.locations)) - 1
+        busy = [0] * len(self.date_times)  # bitset of the teams and members playing during each slot
+        taken = [0] * len(self.date_times)  # bitset of the sheets in use during each slot
+        first_open = 0  # slots before this one are full
+        placed = []
+        for games in self.pairings():
+            for home, away in games:
+                mask = masks[home.oid] | masks[away.oid]
+                slot = first_open
+                while slot < len(busy) and (taken[slot] == all_sheets or busy[slot] & mask):
+                    slot += 1
+                if slot == len(busy):
+                    raise ValueError(f"{len(self.date_times)} time slots are not enough "
+                                     f"for the games of {self.league.name}.")
+                sheet = (~taken[slot] & (taken[slot] + 1)).bit_length() - 1  # the first free sheet
+                for other in overlaps[slot]:
+                    busy[other] |= mask
+                    taken[other] |= 1 << sheet
+                placed.append((slot, sheet, home, away))
+                while first_open < len(taken) and taken[first_open] == all_sheets:
+                    first_open += 1
+        placed.sort(key=lambda p: (p[0], p[1]))
+        return [Competition(next_oid(), [home, away], self.locations[sheet], self.date_times[slot], self.duration)
+                for slot, sheet, home, away in placed]
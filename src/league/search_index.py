@@ -0,0 +1,113 @@
+from bisect import bisect_left, insort
+
+from src.league.object_index import ObjectIndex
+
+
+class SearchIndex(ObjectIndex):
+    """A prefix index over league names, team names, member names and member emails.
+    The keys are kept in one sorted list so a prefix query is a bisect to the first
+    match followed by a walk over the matches only. The index is kept up to date by
+    listening to the database (see LeagueDatabase.search_index) instead of being rebuilt."""
+
+    _BULK_SIZE = 32
+    """Batches at least this big are merged into the sorted list instead of inserted one by one."""
+
+    def __init__(self, leagues=()):
+        self._keys = []
+        """sorted list of (key, kind, oid) tuples"""
+        self._objects = {}
+        """(kind, oid) -> indexed object"""
+        self._object_keys = {}
+        """(kind, oid) -> list of the keys currently in _keys for that object"""
+        super().__init__(leagues)
+
+    def __len__(self):
+        """number of distinct objects in the index"""
+        return len(self._objects)
+
+    @staticmethod
+    def _key_words(text):
+        """the whole text plus the tail starting at each later word, so that
+        "smi" finds "John Smith" as well as "jo" does."""
+        if not text:
+            return []
+        text = text.casefold()
+        words = [text]
+        for i in range(1, len(text)):
+            if text[i - 1] == " " and text[i] != " ":
+                words.append(text[i:])
+        return words
+
+    def _keys_for(self, obj, kind):
+        words = self._key_words(obj.name)
+        if kind == "member":
+            words += self._key_words(obj.email)
+        return [(word, kind, obj.oid) for word in set(words)]
+
+    def _objects_added(self, objects):
+        added = []
+        for obj in objects:
+            kind = self._kind(obj)
+            keys = self._keys_for(obj, kind)
+            self._objects[(kind, obj.oid)] = obj
+            self._object_keys[(kind, obj.oid)] = keys
+            added.extend(keys)
+        self._insert_keys(added)
+
+    def _objects_removed(self, objects):
+        removed = []
+        for obj in objects:
+            kind = self._kind(obj)
+            del self._objects[(kind, obj.oid)]
+            removed.extend(self._object_keys.pop((kind, obj.oid)))
+        self._remove_keys(removed)
+
+    def _object_updated(self, obj, event):
+        if event not in ("name", "email"):
+            return
+        kind = self._kind(obj)
+        ident = (kind, obj.oid)
+        keys = self._keys_for(obj, kind)
+        if sorted(keys) != sorted(self._object_keys[ident]):
+            self._remove_keys(self._object_keys[ident])
+            self._object_keys[ident] = keys
+            self._insert_keys(keys)
+
+    def _insert_keys(self, keys):
+        if len(keys) < self._BULK_SIZE:
+            for key in keys:
+                insort(self._keys, key)
+        else:
+            # the list is one sorted run and the sorted batch another, sort() merges them
+            self._keys.extend(sorted(keys))
+            self._keys.sort()
+
+    def _remove_keys(self, keys):
+        if len(keys) < self._BULK_SIZE:
+            for key in keys:
+                i = bisect_left(self._keys, key)
+                if i < len(self._keys) and self._keys[i] == key:
+                    del self._keys[i]
+        else:
+            gone = set(keys)
+            self._keys = [key for key in self._keys if key not in gone]
+
+    def search(self, prefix, limit=None):
+        """return the leagues, teams and members with a name, a word of the name or
+        an email starting with prefix (case-insensitive), in key order, each object once.
+        At most limit objects are returned if limit is given."""
+        prefix = prefix.casefold()
+        found = []
+        seen = set()
+        if not prefix:
+            return found
+        i = bisect_left(self._keys, (prefix,))
+        while i < len(self._keys) and (limit is None or len(found) < limit):
+            key, kind, oid = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            if (kind, oid) not in seen:
+                seen.add((kind, oid))
+                found.append(self._objects[(kind, oid)])
+            i += 1
+        return found
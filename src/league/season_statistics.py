@@ -0,0 +1,177 @@
+import numpy as np
+
+
+class SeasonStatistics:
+    """Season analytics for a league, computed from a columnar view of its results.
+    Every two-team competition with a result is one row of NumPy arrays: the two team
+    columns, the final scores and the per-end scores. The arrays are built once; after
+    that the object listens to the league and refresh() only rewrites the rows of the
+    competitions added, removed or re-scored since the last refresh. The statistics are
+    then array operations (bincount, add.at) instead of Python loops over the objects.
+    Call close() to stop listening to the league."""
+
+    def __init__(self, league):
+        self.league = league
+        self._team_columns = {}
+        """team oid -> column number"""
+        self._teams = []
+        """column number -> team"""
+        self._rows = {}
+        """competition oid -> row number"""
+        self._size = 0
+        capacity = max(16, len(league.competitions))
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._home = np.zeros(capacity, dtype=np.int32)
+        self._away = np.zeros(capacity, dtype=np.int32)
+        self._scores = np.zeros((capacity, 2), dtype=np.int32)
+        self._ends = np.zeros((capacity, 8, 2), dtype=np.int32)
+        self._end_counts = np.zeros(capacity, dtype=np.int32)
+        self._changed = {}
+        """competition oid -> (competition, still in the league) for the rows to rewrite on the next refresh"""
+        for competition in league.competitions:
+            self._store(competition)
+        league.add_observer(self)
+
+    def close(self):
+        """stop following the changes of the league"""
+        self.league.remove_observer(self)
+
+    def object_changed(self, source, event, details):
+        """remember which competitions changed, refresh() will rewrite their rows"""
+        if event == "result":
+            self._changed[source.oid] = (source, True)
+        elif event == "competition_added":
+            self._changed[details["competition"].oid] = (details["competition"], True)
+        elif event == "competition_removed":
+            self._changed[details["competition"].oid] = (details["competition"], False)
+        elif event == "competitions_added":
+            for competition in details["competitions"]:
+                self._changed[competition.oid] = (competition, True)
+        elif event == "competitions_removed":
+            for competition in details["competitions"]:
+                self._changed[competition.oid] = (competition, False)
+
+    def refresh(self):
+        """bring the arrays up to date with the changes since the last refresh"""
+        for oid, (competition, in_league) in self._changed.items():
+            if in_league:
+                self._store(competition)
+            elif oid in self._rows:
+                self._valid[self._rows[oid]] = False
+        self._changed = {}
+
+    def _column(self, team):
+        column = self._team_columns.get(team.oid)
+        if column is None:
+            column = self._team_columns[team.oid] = len(self._teams)
+            self._teams.append(team)
+        return column
+
+    def _grow(self, rows, ends):
+        capacity, width = self._ends.shape[0], self._ends.shape[1]
+        if rows > capacity:
+            capacity = max(rows, 2 * capacity)
+            self._valid = np.resize(self._valid, capacity)
+            self._valid[self._size:] = False
+            self._home = np.resize(self._home, capacity)
+            self._away = np.resize(self._away, capacity)
+            self._scores = np.resize(self._scores, (capacity, 2))
+            self._end_counts = np.resize(self._end_counts, capacity)
+        if ends > width or capacity > self._ends.shape[0]:
+            grown = np.zeros((capacity, max(ends, width), 2), dtype=np.int32)
+            grown[:self._ends.shape[0], :width] = self._ends
+            self._ends = grown
+
+    def _store(self, competition):
+        row = self._rows.get(competition.oid)
+        if len(competition.teams_competing) != 2 or not competition.has_result:
+            if row is not None:
+                self._valid[row] = False
+            return
+        if row is None:
+            row = self._rows[competition.oid] = self._size
+            self._size += 1
+        ends = competition.end_scores or []
+        self._grow(self._size, len(ends))
+        home, away = competition.teams_competing
+        self._valid[row] = True
+        self._home[row] = self._column(home)
+        self._away[row] = self._column(away)
+        self._scores[row] = competition.final_scores
+        self._ends[row] = 0
+        if ends:
+            self._ends[row, :len(ends)] = ends
+        self._end_counts[row] = len(ends)
+
+    def _results(self):
+        self.refresh()
+        valid = self._valid[:self._size]
+        return self._home[:self._size][valid], self._away[:self._size][valid], self._scores[:self._size][valid]
+
+    def team_records(self):
+        """return {team: (wins, losses, ties)} for the teams that played"""
+        home, away, scores = self._results()
+        teams = len(self._teams)
+        home_won = scores[:, 0] > scores[:, 1]
+        away_won = scores[:, 1] > scores[:, 0]
+        tied = ~(home_won | away_won)
+        wins = np.bincount(home[home_won], minlength=teams) + np.bincount(away[away_won], minlength=teams)
+        losses = np.bincount(home[away_won], minlength=teams) + np.bincount(away[home_won], minlength=teams)
+        ties = np.bincount(home[tied], minlength=teams) + np.bincount(away[tied], minlength=teams)
+        return {team: (int(wins[i]), int(losses[i]), int(ties[i]))
+                for i, team in enumerate(self._teams) if wins[i] + losses[i] + ties[i]}
+
+    def team_win_percentage(self):
+        """return {team: win percentage} counting ties as half a win,
+        for the teams that played"""
+        return {team: (w + t / 2) / (w + l + t) for team, (w, l, t) in self.team_records().items()}
+
+    def member_win_percentage(self):
+        """return {member: win percentage} over the games of all the member's teams in
+        the league, counting ties as half a win, for the members whose teams played"""
+        records = self.team_records()
+        totals = {}
+        for team in self.league.teams:
+            record = records.get(team)
+            if record is None:
+                continue
+            for member in team.members:
+                total = totals.setdefault(member, [0, 0])
+                total[0] += record[0] + record[2] / 2
+                total[1] += sum(record)
+        return {member: won / games for member, (won, games) in totals.items()}
+
+    def scoring_distribution(self):
+        """return a 2-D array counts where counts[e, p] is the number of times end e + 1
+        was scored p points (by the team that scored, 0 for a blank end)"""
+        self.refresh()
+        valid = self._valid[:self._size]
+        ends = self._ends[:self._size][valid]
+        end_counts = self._end_counts[:self._size][valid]
+        width = int(end_counts.max(initial=0))
+        points = ends[:, :width].max(axis=2)
+        played = np.arange(width)[np.newaxis, :] < end_counts[:, np.newaxis]
+        end_numbers = np.broadcast_to(np.arange(width), points.shape)[played]
+        points = points[played]
+        counts = np.zeros((width, int(points.max(initial=0)) + 1), dtype=np.int64)
+        np.add.at(counts, (end_numbers, points), 1)
+        return counts
+
+    def scoring_by_end(self):
+        """return an array with the average number of points scored in each end
+        (over the games that played that end)"""
+        counts = self.scoring_distribution()
+        games = counts.sum(axis=1)
+        points = counts @ np.arange(counts.shape[1])
+        return np.divide(points, games, out=np.zeros(len(games)), where=games > 0)
+
+    def head_to_head(self):
+        """return (teams, wins) where wins[i, j] is the number of times teams[i] beat teams[j]"""
+        home, away, scores = self._results()
+        teams = len(self._teams)
+        wins = np.zeros((teams, teams), dtype=np.int64)
+        home_won = scores[:, 0] > scores[:, 1]
+        away_won = scores[:, 1] > scores[:, 0]
+        np.add.at(wins, (home[home_won], away[home_won]), 1)
+        np.add.at(wins, (away[away_won], home[away_won]), 1)
+        return list(self._teams), wins
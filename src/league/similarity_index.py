@@ -0,0 +1,154 @@
+import heapq
+
+from src.league.object_index import ObjectIndex
+
+
+class MemberSimilarityIndex(ObjectIndex):
+    """A trigram index over team member names and emails for finding near duplicates
+    such as "Jon Smith" and "John Smith" or emails that differ by case or a typo.
+    Candidates are found through the posting lists of the trigrams a query shares with
+    them, so only members with something in common are compared. Trigrams found in more
+    than max_posting members (".com", "@gm" ...) are not used to find candidates, which
+    keeps the work per query bounded on big leagues, but they still count in the score.
+    The batch duplicate report pairs members up through one-edit deletion keys instead,
+    which finds every case or one-typo difference without comparing all the pairs."""
+
+    def __init__(self, leagues=(), max_posting=500):
+        self.max_posting = max_posting
+        self._members = {}
+        """oid -> member"""
+        self._grams = {}
+        """oid -> (frozenset of name trigrams, frozenset of email trigrams)"""
+        self._postings = {}
+        """(field, trigram) -> set of member oids. field is 0 for names and 1 for emails"""
+        super().__init__(leagues)
+
+    @classmethod
+    def for_members(cls, members, max_posting=500):
+        """return an index over the given members only (not kept up to date)"""
+        index = cls(max_posting=max_posting)
+        index._objects_added(list(members))
+        return index
+
+    def __len__(self):
+        return len(self._members)
+
+    @staticmethod
+    def trigrams(text):
+        """return the set of casefolded trigrams of text, padded so that
+        short words and the start of the text have trigrams too."""
+        if not text:
+            return frozenset()
+        text = "  " + " ".join(text.casefold().split()) + " "
+        return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+    @staticmethod
+    def _jaccard(a, b):
+        if not a or not b:
+            return 0.0
+        shared = len(a & b)
+        return shared / (len(a) + len(b) - shared)
+
+    def _objects_added(self, objects):
+        for member in objects:
+            if self._kind(member) != "member" or member.oid in self._members:
+                continue
+            grams = (self.trigrams(member.name), self.trigrams(member.email))
+            self._members[member.oid] = member
+            self._grams[member.oid] = grams
+            for field in (0, 1):
+                for gram in grams[field]:
+                    self._postings.setdefault((field, gram), set()).add(member.oid)
+
+    def _objects_removed(self, objects):
+        for member in objects:
+            if self._kind(member) != "member" or member.oid not in self._members:
+                continue
+            grams = self._grams.pop(member.oid)
+            del self._members[member.oid]
+            for field in (0, 1):
+                for gram in grams[field]:
+                    posting = self._postings[(field, gram)]
+                    posting.discard(member.oid)
+                    if not posting:
+                        del self._postings[(field, gram)]
+
+    def _object_updated(self, obj, event):
+        if event in ("name", "email") and self._kind(obj) == "member":
+            self._objects_removed([obj])
+            self._objects_added([obj])
+
+    def _score(self, grams, other):
+        """the best of the name and email Jaccard similarities"""
+        return max(self._jaccard(grams[0], other[0]), self._jaccard(grams[1], other[1]))
+
+    def _top(self, grams, k, min_score, exclude=None):
+        """count the usable trigrams shared with each candidate, then score only the
+        candidates sharing the most since only they can be the most similar"""
+        counts = {}
+        for field in (0, 1):
+            for gram in grams[field]:
+                posting = self._postings.get((field, gram))
+                if posting is not None and len(posting) <= self.max_posting:
+                    for oid in posting:
+                        counts[oid] = counts.get(oid, 0) + 1
+        counts.pop(exclude, None)
+        shortlist = heapq.nlargest(max(4 * k, 50), counts, key=counts.get)
+        scored = ((self._score(grams, self._grams[oid]), oid) for oid in shortlist)
+        best = heapq.nlargest(k, (pair for pair in scored if pair[0] >= min_score))
+        return [(score, self._members[oid]) for score, oid in best]
+
+    def similar(self, name=None, email=None, k=10, min_score=0.0):
+        """return up to k (score, member) pairs, most similar first, for the members
+        whose name or email is like the given name or email. Scores are between 0 and 1."""
+        return self._top((self.trigrams(name), self.trigrams(email)), k, min_score)
+
+    def similar_to(self, member, k=10, min_score=0.0):
+        """return up to k (score, member) pairs for the other members most like member"""
+        return self._top((self.trigrams(member.name), self.trigrams(member.email)), k, min_score, member.oid)
+
+    @staticmethod
+    def _normalized(text):
+        return " ".join(text.casefold().split()) if text else ""
+
+    @classmethod
+    def deletion_keys(cls, text):
+        """return the normalized text and every way of deleting one character from it.
+        Two texts within one insertion, deletion or substitution of each other share a key."""
+        text = cls._normalized(text)
+        if not text:
+            return set()
+        keys = {text[:i] + text[i + 1:] for i in range(len(text))}
+        keys.add(text)
+        keys.discard("")
+        return keys
+
+    def _one_edit_pairs(self, field, pairs):
+        """add the pairs of members whose names (field 0) or emails (field 1) are the same
+        apart from case or one typo, found through shared deletion keys"""
+        buckets = {}
+        for oid, member in self._members.items():
+            for key in self.deletion_keys(member.email if field else member.name):
+                buckets.setdefault(key, []).append(oid)
+        for oids in buckets.values():
+            for i in range(len(oids)):
+                for j in range(i + 1, len(oids)):
+                    pairs.add((oids[i], oids[j]) if oids[i] < oids[j] else (oids[j], oids[i]))
+
+    def probable_duplicates(self, min_score=0.0):
+        """return (score, member, other member) for the pairs of indexed members that are
+        probably the same person, most similar first, each pair once. A pair is reported
+        when the names or the emails are the same apart from case, spacing or one typo,
+        and the score is their name or email trigram similarity.
+        Pairs are found through shared deletion keys rather than by comparing every pair,
+        so the work grows with the length of the names and emails plus the pairs found."""
+        candidates = set()
+        for field in (0, 1):
+            self._one_edit_pairs(field, candidates)
+        pairs = []
+        for a, b in candidates:
+            score = self._score(self._grams[a], self._grams[b])
+            if score >= min_score:
+                pairs.append((score, a, b))
+        pairs.sort(key=lambda p: (-p[0], p[1], p[2]))
+        return [(score, self._members[a], self._members[b]) for score, a, b in pairs]
@@ -0,0 +1,51 @@
+import smtplib
+from email.message import EmailMessage
+
+from src.league.instrumentation import instrumented
+
+
+class SmtpEmailer:
+    """Sends email through any SMTP server with smtplib, as Emailer does through Gmail.
+    Has the same send_plain_email, so it can be given to Team.send_email,
+    Competition.send_email or EmailSpool.drain, and used with a local server such as SmtpSink."""
+
+    def __init__(self, host, port, sender_address, user=None, password=None, starttls=False):
+        self.host = host
+        self.port = port
+        self.sender_address = sender_address
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+
+    def message(self, recipient, subject, message):
+        """return the EmailMessage sending message to recipient"""
+        email = EmailMessage()
+        email["From"] = self.sender_address
+        email["To"] = recipient
+        email["Subject"] = subject
+        email.set_content(message)
+        return email
+
+    @instrumented("SmtpEmailer.send_plain_email")
+    def send_plain_email(self, recipients, subject, message):
+        """send message to each of recipients (email addresses) on its own, over one
+        connection. Raises smtplib.SMTPRecipientsRefused if the server refuses a
+        recipient, after the others were sent."""
+        refused = {}
+        with smtplib.SMTP(self.host, self.port) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.user is not None:
+                smtp.login(self.user, self.password)
+            for recipient in recipients:
+                try:
+                    self._send(smtp, recipient, subject, message)
+                except smtplib.SMTPRecipientsRefused as e:
+                    refused.update(e.recipients)
+        if refused:
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+    @instrumented("SmtpEmailer.message")
+    def _send(self, smtp, recipient, subject, message):
+        """one SMTP transaction, timed on its own for the latency of a message"""
+        smtp.send_message(self.message(recipient, subject, message), self.sender_address, [recipient])
@@ -0,0 +1,134 @@
+"""A local SMTP server that keeps the messages it is sent instead of delivering them.
+
+Run from the repository root:  python -m src.league.smtp_sink [port]
+"""
+import socketserver
+import sys
+import threading
+
+
+class SmtpSink:
+    """An in-process SMTP stand-in for the tests and benchmarks, and for trying the
+    email spool without a mail server. It speaks just enough SMTP for smtplib (HELO,
+    EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) and keeps each message it accepts.
+      with SmtpSink() as sink:
+          SmtpEmailer("127.0.0.1", sink.port, "league@curl.org").send_plain_email(...)
+          sink.messages   [(sender, [recipients], message text)]
+    Recipients in reject are refused with a 550, as a server does for an unknown mailbox."""
+
+    def __init__(self, host="127.0.0.1", port=0, reject=()):
+        self.reject = {address.casefold() for address in reject}
+        self.messages = []
+        """(sender, recipients, message text) of the messages accepted"""
+        self.transactions = 0
+        """number of MAIL ... DATA transactions that ended with a message accepted"""
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def recipients(self):
+        """every recipient of every message accepted, in order"""
+        with self._lock:
+            return [recipient for sender, recipients, text in self.messages for recipient in recipients]
+
+    def _accepted(self, sender, recipients, text):
+        with self._lock:
+            self.messages.append((sender, recipients, text))
+            self.transactions += 1
+
+    def _handler(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode("ascii") + b"\r\n")
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                self.reply("220 localhost SMTP sink")
+                sender, recipients = None, []
+                for raw in self.rfile:
+                    line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                    verb = line[:4].upper()
+                    if verb == "EHLO":
+                        self.wfile.write(b"250-localhost\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n")
+                    elif verb == "HELO":
+                        self.reply("250 localhost")
+                    elif verb == "MAIL":
+                        sender, recipients = self.address(line), []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        recipient = self.address(line)
+                        if recipient.casefold() in sink.reject:
+                            self.reply("550 No such mailbox")
+                        else:
+                            recipients.append(recipient)
+                            self.reply("250 OK")
+                    elif verb == "DATA":
+                        if not recipients:
+                            self.reply("503 No valid recipients")
+                            continue
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        lines = []
+                        for data in self.rfile:
+                            data = data.decode("utf-8", "replace").rstrip("\r\n")
+                            if data == ".":
+                                break
+                            lines.append(data[1:] if data.startswith("..") else data)
+                        sink._accepted(sender, recipients, "\n".join(lines))
+                        sender, recipients = None, []
+                        self.reply("250 OK")
+                    elif verb == "RSET":
+                        sender, recipients = None, []
+                        self.reply("250 OK")
+                    elif verb == "NOOP":
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+            @staticmethod
+            def address(line):
+                """the address of a MAIL FROM:<...> or RCPT TO:<...> line"""
+                value = line.split(":", 1)[1].strip()
+                return value[1:value.index(">")] if value.startswith("<") else value.split()[0]
+
+        return Handler
+
+
+if __name__ == '__main__':
+    with SmtpSink(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8025) as running:
+        print(f"SMTP sink listening on {running.host}:{running.port}, Ctrl-C to stop.")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            print(f"{running.transactions} message(s) received.")
@@ -0,0 +1,89 @@
+class TeamRecord:
+    """The season record of one team in a league's standings."""
+
+    def __init__(self, team):
+        self.team = team
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        self.points_for = 0
+        self.points_against = 0
+        self.ends_won = 0
+
+    @property
+    def games(self):
+        return self.wins + self.losses + self.ties
+
+    @property
+    def point_differential(self):
+        return self.points_for - self.points_against
+
+    def sort_key(self):
+        """most wins first, then fewest losses, then the tiebreakers:
+        point differential, points for, ends won and finally the team name"""
+        return (-self.wins, self.losses, -self.point_differential, -self.points_for,
+                -self.ends_won, str(self.team.name))
+
+    def __str__(self):
+        """return a string like 'Team Name: W-L-T, PF-PA'"""
+        return f"{self.team.name}: {self.wins}-{self.losses}-{self.ties}, {self.points_for}-{self.points_against}"
+
+
+class Standings:
+    """The standings of a league, kept up to date one result at a time.
+    Recording or correcting a result takes the old result's contribution back out
+    and adds the new one in, so the cost does not depend on how many games have
+    been played. A table is one sort of the teams, O(teams log teams)."""
+
+    def __init__(self, league):
+        self.league = league
+        self._records = {}
+        """team oid -> TeamRecord"""
+        for competition in league.competitions:
+            if competition.has_result:
+                self._apply(competition, competition.end_scores, competition.final_scores, 1)
+
+    def record(self, team):
+        """return the TeamRecord of team"""
+        record = self._records.get(team.oid)
+        if record is None:
+            record = self._records[team.oid] = TeamRecord(team)
+        return record
+
+    def _apply(self, competition, end_scores, final_scores, sign):
+        """add (sign 1) or take back (sign -1) the contribution of a result"""
+        if final_scores is None:
+            return
+        teams = competition.teams_competing
+        best = max(final_scores)
+        tied = final_scores.count(best) > 1
+        total = sum(final_scores)
+        for team, score in zip(teams, final_scores):
+            record = self.record(team)
+            if score < best:
+                record.losses += sign
+            elif tied:
+                record.ties += sign
+            else:
+                record.wins += sign
+            record.points_for += sign * score
+            record.points_against += sign * (total - score)
+        for end in end_scores or ():
+            high = max(end)
+            if high > 0 and end.count(high) == 1:
+                self.record(teams[end.index(high)]).ends_won += sign
+
+    def competition_added(self, competition):
+        self._apply(competition, competition.end_scores, competition.final_scores, 1)
+
+    def competition_removed(self, competition):
+        self._apply(competition, competition.end_scores, competition.final_scores, -1)
+
+    def result_changed(self, competition, old):
+        """old is the (end_scores, final_scores) the competition had before"""
+        self._apply(competition, old[0], old[1], -1)
+        self._apply(competition, competition.end_scores, competition.final_scores, 1)
+
+    def table(self):
+        """return the TeamRecords of all the teams of the league, best first"""
+        return sorted((self.record(team) for team in self.league.teams), key=TeamRecord.sort_key)
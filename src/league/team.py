@@ -1,6 +1,9 @@
-from src.league.identified_object import IdentifiedObject
+from src.league.identified_object import IdentifiedObject, changing
 from src.league.exception_duplicate_oid import DuplicateOid
 from src.league.exception_duplicate_email import DuplicateEmail
+from src.league.exception_invalid_batch import InvalidBatch
+from src.league.instrumentation import instrumented
+from src.league.list_positions import position, insert, put_in, take_out
 
 
 class Team(IdentifiedObject):
@@ -10,27 +13,98 @@ class Team(IdentifiedObject):
         name properties as specified in the arguments
         (note: should call superclass constructor)"""
         super().__init__(oid)
-        self.name = name
+        self._name = name
         self._members = []
 
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        for member in self._members:
+            member.add_observer(self)
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    @changing
+    def name(self, name):
+        old = self._name
+        self._name = name
+        self._changed("name", old=old)
+
     @property
     def members(self):
         return self._members
 
-    def add_member(self, member):
+    @changing
+    def add_member(self, member, index=None):
         """Adds new member to team. Ignore request to add team member that is
         already in members. Raises DuplicateOid and DuplicateEmail exceptions if email or
-        oid is already in use for that member. DuplicateEmail is case-insensitive."""
+        oid is already in use for that member. DuplicateEmail is case-insensitive.
+        index, when given, is the place of the member in members (as a member_removed
+        event reports it), to put it back where it was; by default it is appended."""
         if member is not None:
             if member in self.members:
                 raise DuplicateOid("The oid is duplicated for the intended member addition.")
-            elif member.email is None:
-                self.members.append(member)
-            elif member.email.upper() in [m.email.upper() for m in self.members]:
+            elif member.email is not None and member.email.upper() in [m.email.upper() for m in self.members]:
                 raise DuplicateEmail("The member has a duplicated email address.")
             else:
-                self.members.append(member)
+                index = insert(self.members, member, index)
+                member.add_observer(self)
+                self._changed("member_added", member=member, index=index)
+
+    def check_members(self, members):
+        """return (member, exception) for each of members that add_members would reject:
+        a member already on the team or earlier in members (DuplicateOid), or an email
+        already used on the team or earlier in members (DuplicateEmail, case-insensitive).
+        One pass over the team and the batch."""
+        in_use = set(self.members)
+        emails = {m.email.upper() for m in self.members if m.email is not None}
+        problems = []
+        for member in members:
+            if member is None:
+                continue
+            if member in in_use:
+                problems.append((member, DuplicateOid(f"The oid of {member} is already in use.")))
+            elif member.email is not None and member.email.upper() in emails:
+                problems.append((member, DuplicateEmail(f"The email of {member} is already in use.")))
+            else:
+                in_use.add(member)
+                if member.email is not None:
+                    emails.add(member.email.upper())
+        return problems
+
+    @changing
+    def add_members(self, members, indexes=None):
+        """Adds all the members at once. Raises InvalidBatch listing every member that
+        add_member would reject (see check_members), and adds none of them in that case.
+        indexes, when given, are the places of the members in members once added (as a
+        members_removed event reports them), to put them back where they were; by
+        default they are appended."""
+        members = [m for m in members if m is not None]
+        problems = self.check_members(members)
+        if problems:
+            raise InvalidBatch.for_problems(problems, len(members))
+        indexes = put_in(self.members, members, indexes)
+        for member in members:
+            member.add_observer(self)
+        if members:
+            self._changed("members_added", members=members, indexes=indexes)
+
+    @changing
+    def remove_members(self, members, indexes=None):
+        """Removes all of members that are on the team at once, in one pass over the
+        list, and sends one members_removed event with the members removed and their
+        indexes. A member is removed if it is itself on the team (not an equal member);
+        the others are ignored. indexes, when given, are where the members were added (as
+        a members_added event reports them), so they are taken out without a search."""
+        removed, indexes = take_out(self.members, [m for m in members if m is not None], indexes)
+        for member in removed:
+            member.remove_observer(self)
+        if removed:
+            self._changed("members_removed", members=removed, indexes=indexes)
 
+    @instrumented("Team.member_named")
     def member_named(self, s):
         """return the member of this team
         whose name equals s (case-sensitive)
@@ -40,10 +114,22 @@ class Team(IdentifiedObject):
                 return member
         return None
 
-    def remove_member(self, member):
-        """remove the specified member from this team"""
-        if member is not None and member in self.members:
-            self.members.remove(member)
+    @changing
+    def remove_member(self, member, index=None):
+        """remove the specified member from this team.
+        index, when given, is where member was added (as a member_added event reports
+        it): member itself, not an equal member, is removed from there, or from where
+        it is now if the list moved since."""
+        if member is None:
+            return
+        if index is not None:
+            index = position(self.members, member, index)
+        elif member in self.members:
+            index = self.members.index(member)
+        if index is not None:
+            member = self.members.pop(index)
+            member.remove_observer(self)
+            self._changed("member_removed", member=member, index=index)
 
     def send_email(self, emailer, subject, message):
         """use the emailer argument to email
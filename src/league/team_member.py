@@ -1,4 +1,4 @@
-from src.league.identified_object import IdentifiedObject
+from src.league.identified_object import IdentifiedObject, changing
 
 
 class TeamMember(IdentifiedObject):
@@ -8,8 +8,30 @@ class TeamMember(IdentifiedObject):
         name and email properties as specified in the arguments
         (note: should call superclass constructor)"""
         super().__init__(oid)
-        self.name = name
-        self.email = email
+        self._name = name
+        self._email = email
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    @changing
+    def name(self, name):
+        old = self._name
+        self._name = name
+        self._changed("name", old=old)
+
+    @property
+    def email(self):
+        return self._email
+
+    @email.setter
+    @changing
+    def email(self, email):
+        old = self._email
+        self._email = email
+        self._changed("email", old=old)
 
     def send_email(self, emailer, subject, message):
         """use the emailer argument to email this member"""
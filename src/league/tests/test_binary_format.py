@@ -0,0 +1,80 @@
+import unittest
+import datetime as dt
+
+from src.league.binary_format import BinaryFormat
+from src.league.competition import Competition
+from src.league.exception_bad_file_format import BadFileFormat
+from src.league.league import League
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class BinaryFormatTests(unittest.TestCase):
+    def setUp(self):
+        self.league = League(1, "Ligue de curling du Québec")
+        self.league.reject_conflicts = True
+        t1 = Team(2, "Flintstones")
+        t2 = Team(3, "Rubbles")
+        visitors = Team(9, "Visitors")
+        fred = TeamMember(4, "Fred", "fred@bedrock.com")
+        t1.add_member(fred)
+        t1.add_member(TeamMember(5, "Wilma", None))
+        t2.add_member(fred)
+        t2.add_member(TeamMember(6, "Barney", "barney@bedrock.com"))
+        self.league.add_teams([t1, t2])
+        played = Competition(7, [t1, t2], "Sheet A", dt.datetime(2024, 1, 5, 19, 30), dt.timedelta(minutes=90))
+        played.record_result([(1, 0), (0, 2), (3, 0)], (4, 3))
+        self.league.add_competition(played)
+        # a team not in the league (see IntegrityChecker) is kept too
+        self.league.competitions.append(Competition(8, [t2, visitors], "Sheet B"))
+
+    def test_round_trip(self):
+        data = BinaryFormat.write_league(self.league)
+        league = BinaryFormat.read_league(data)
+        self.assertEqual((1, "Ligue de curling du Québec", True, False),
+                         (league.oid, league.name, league.reject_conflicts, league.dirty))
+        t1, t2 = league.teams
+        self.assertEqual([(4, "Fred", "fred@bedrock.com"), (5, "Wilma", None)],
+                         [(m.oid, m.name, m.email) for m in t1.members])
+        self.assertIs(t1.members[0], t2.members[0])
+        played, unplayed = league.competitions
+        self.assertEqual([t1, t2], played.teams_competing)
+        self.assertIs(t1, played.teams_competing[0])
+        self.assertEqual(("Sheet A", dt.datetime(2024, 1, 5, 19, 30), dt.timedelta(minutes=90)),
+                         (played.location, played.date_time, played.duration))
+        self.assertEqual(([(1, 0), (0, 2), (3, 0)], (4, 3)), (played.end_scores, played.final_scores))
+        self.assertEqual((None, Competition.DEFAULT_DURATION, None),
+                         (unplayed.date_time, unplayed.duration, unplayed.final_scores))
+        self.assertEqual("Visitors", unplayed.teams_competing[1].name)
+        self.assertEqual(data, BinaryFormat.write_league(league))
+
+    def test_events_after_read(self):
+        league = BinaryFormat.read_league(BinaryFormat.write_league(self.league))
+        league.teams[1].members[0].name = "Freddy"
+        self.assertTrue(league.dirty)
+        self.assertEqual("Freddy", league.competitions[0].teams_competing[0].members[0].name)
+
+    def test_damaged(self):
+        data = BinaryFormat.write_league(self.league)
+        with self.assertRaises(BadFileFormat):
+            BinaryFormat.read_league(data[:len(data) // 2])
+        # a date_time out of range
+        start = data.index((7).to_bytes(8, "little"))  # the record of the competition with oid 7
+        damaged = bytearray(data)
+        damaged[start + 13:start + 21] = (2 ** 62).to_bytes(8, "little")
+        with self.assertRaises(BadFileFormat):
+            BinaryFormat.read_league(bytes(damaged))
+
+    def test_same_oid_twice(self):
+        self.league.teams[1].members.append(TeamMember(5, "Not Wilma", None))
+        with self.assertRaises(ValueError):
+            BinaryFormat.write_league(self.league)
+
+    def test_not_str(self):
+        self.league.competitions[1].location = 7
+        league = BinaryFormat.read_league(BinaryFormat.write_league(self.league))
+        self.assertEqual("7", league.competitions[1].location)
+
+
+if __name__ == '__main__':
+    unittest.main()
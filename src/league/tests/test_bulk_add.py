@@ -0,0 +1,141 @@
+import unittest
+import os.path
+
+from src.league.competition import Competition
+from src.league.exception_duplicate_email import DuplicateEmail
+from src.league.exception_duplicate_oid import DuplicateOid
+from src.league.exception_invalid_batch import InvalidBatch
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class BulkAddTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        self.db.add_league(self.league)
+        self.team = Team(self.db.next_oid(), "Flintstones")
+        self.league.add_team(self.team)
+        self.team.add_member(TeamMember(self.db.next_oid(), "Fred", "fred@bedrock.com"))
+
+    def test_add_members(self):
+        members = [TeamMember(self.db.next_oid(), f"Member {i}", f"m{i}@bedrock.com") for i in range(1000)]
+        self.team.add_members(members)
+        self.assertEqual(1001, len(self.team.members))
+        self.assertEqual(1, len(self.db.search("m999@")))
+        self.db.undo()
+        self.assertEqual(1, len(self.team.members))
+        self.assertEqual([], self.db.search("m999@"))
+
+    def test_rejected_members(self):
+        barney = TeamMember(self.db.next_oid(), "Barney", "barney@bedrock.com")
+        batch = [barney,
+                 TeamMember(self.db.next_oid(), "Freddy", "FRED@bedrock.com"),
+                 TeamMember(self.db.next_oid(), "Wilma", "wilma@bedrock.com"),
+                 barney,
+                 TeamMember(self.db.next_oid(), "Barney Rubble", "Barney@Bedrock.com")]
+        with self.assertRaises(InvalidBatch) as raised:
+            self.team.add_members(batch)
+        self.assertEqual([(batch[1], DuplicateEmail), (batch[3], DuplicateOid), (batch[4], DuplicateEmail)],
+                         [(item, type(e)) for item, e in raised.exception.problems])
+        self.assertIn("3 of the 5 items were rejected", str(raised.exception))
+        self.assertEqual(1, len(self.team.members))
+
+    def test_add_teams_and_competitions(self):
+        teams = [Team(self.db.next_oid(), f"Team {i}") for i in range(20)]
+        with self.assertRaises(InvalidBatch) as raised:
+            self.league.add_teams(teams + [Team(self.team.oid, "Copy"), teams[3]])
+        self.assertEqual(2, len(raised.exception.problems))
+        self.assertEqual([self.team], self.league.teams)
+        self.league.add_teams(teams)
+        self.assertEqual(teams[0], self.db.search("team 0")[0])
+        outsider = Team(self.db.next_oid(), "Outsider")
+        competitions = [Competition(self.db.next_oid(), [teams[i], teams[i + 1]], "Sheet A") for i in range(19)]
+        bad = [Competition(self.db.next_oid(), [teams[0], outsider], "Sheet B"), competitions[5]]
+        with self.assertRaises(ValueError) as raised:
+            self.league.add_competitions(competitions + bad)
+        self.assertEqual(bad, [item for item, e in raised.exception.problems])
+        self.assertEqual([], self.league.competitions)
+        self.league.add_competitions(competitions)
+        self.assertEqual(competitions, self.league.competitions)
+
+    def test_import_is_checked_first(self):
+        file_name = "bulk_import_test.csv"
+        with open(file_name, "w", newline="", encoding="utf-8") as f:
+            f.write("Team name,Member name,Member email\n"
+                    "Rubbles,Barney,barney@bedrock.com\n"
+                    "Flintstones,Freddy,FRED@bedrock.com\n"
+                    "Rubbles,Betty,betty@bedrock.com\n"
+                    "Rubbles,Bamm-Bamm,BETTY@bedrock.com\n")
+        with self.assertRaises(InvalidBatch) as raised:
+            self.db.import_league_teams(self.league, file_name)
+        # the rows for an email already in use name the member who has it
+        self.assertEqual(["Fred", "Betty"], [item.name for item, e in raised.exception.problems])
+        self.assertEqual([self.team], self.league.teams)
+        self.assertEqual(1, len(self.team.members))
+        os.remove(file_name)
+        with open(file_name, "w", newline="", encoding="utf-8") as f:
+            f.write("Team name,Member name,Member email\n"
+                    "Rubbles,Betty,betty@bedrock.com\n"
+                    "Rubbles,Bamm-Bamm,BETTY@bedrock.com\n"
+                    "Flintstones,Freddy,FRED@bedrock.com\n")
+        with self.assertRaises(InvalidBatch) as raised:
+            self.db.import_league_teams(self.league, file_name)
+        # Fred, the person of the last row, has the oldest oid but is reported last
+        self.assertEqual(["Betty", "Fred"], [item.name for item, e in raised.exception.problems])
+        os.remove(file_name)
+        self.db.import_league_teams(self.league, "Teams.csv")
+        self.assertEqual(5, len(self.league.team_named("Flintstones").members))
+        self.db.undo()
+        self.assertEqual([self.team], self.league.teams)
+        self.assertEqual(1, len(self.team.members))
+
+    def test_bulk_remove_and_undo(self):
+        events = []
+
+        class Listener:
+            def object_changed(self, source, event, details):
+                events.append(event)
+
+        fred = self.team.members[0]
+        members = [TeamMember(self.db.next_oid(), f"Member {i}", f"m{i}@bedrock.com") for i in range(20000)]
+        self.team.add_members(members)
+        self.db.add_listener(Listener())
+        self.db.undo()
+        self.assertEqual([fred], self.team.members)
+        self.db.redo()
+        self.assertEqual(["members_removed", "members_added"], events)
+        self.assertEqual([fred] + members, self.team.members)
+        # members here and there, and one not on the team, put back where they were
+        gone = members[5:20000:7] + [TeamMember(self.db.next_oid(), "Stranger", None)]
+        self.team.remove_members(gone)
+        self.assertEqual(20001 - len(gone) + 1, len(self.team.members))
+        self.assertEqual([], self.db.search("m5@"))
+        self.db.undo()
+        self.assertEqual([fred] + members, self.team.members)
+        self.assertEqual([members[5]], self.db.search("m5@"))
+        self.db.redo()
+        self.assertNotIn(members[12], self.team.members)
+
+    def test_bulk_remove_teams_and_competitions(self):
+        teams = [Team(self.db.next_oid(), f"Team {i}") for i in range(10)]
+        self.league.add_teams(teams)
+        competitions = [Competition(self.db.next_oid(), [teams[i], teams[i + 1]], "Sheet A") for i in range(9)]
+        self.league.add_competitions(competitions)
+        with self.assertRaises(ValueError):
+            self.league.remove_teams(teams[2:4])
+        self.assertEqual(11, len(self.league.teams))
+        self.league.remove_competitions(competitions[::2])
+        self.assertEqual(competitions[1::2], self.league.competitions)
+        self.league.remove_teams([teams[0], teams[9]])
+        self.assertEqual([self.team] + teams[1:9], self.league.teams)
+        self.db.undo()
+        self.db.undo()
+        self.assertEqual([self.team] + teams, self.league.teams)
+        self.assertEqual(competitions, self.league.competitions)
+
+
+if __name__ == '__main__':
+    unittest.main()
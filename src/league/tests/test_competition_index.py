@@ -0,0 +1,73 @@
+import unittest
+import datetime
+import types
+
+from src.league.competition import Competition
+from src.league.competition_index import CompetitionIndex
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+
+
+class CompetitionIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        self.other = League(self.db.next_oid(), "GA State Curling League")
+        self.db.add_league(self.league)
+        self.db.add_league(self.other)
+        self.start = datetime.datetime(2024, 1, 6, 19, 0)
+        self.days = [self.start + datetime.timedelta(days=i) for i in range(10)]
+        self.c = [Competition(i, [], "Sheet A" if i % 2 else "Sheet B", self.days[i]) for i in range(10)]
+        for c in reversed(self.c[:6]):
+            self.league.add_competition(c)
+        self.undated = Competition(20, [], "Sheet A", None)
+        self.league.add_competition(self.undated)
+
+    def test_between(self):
+        between = self.league.competitions_between(self.days[1], self.days[4])
+        self.assertIsInstance(between, types.GeneratorType)
+        self.assertEqual(self.c[1:4], list(between))
+        self.assertEqual(self.c[:6], list(self.league.competitions_between()))
+        self.assertEqual(self.c[4:6], list(self.league.competitions_between(self.days[4])))
+        self.assertEqual([], list(self.league.competitions_between(self.days[7])))
+        self.assertEqual([self.undated], list(self.league.competition_index.undated()))
+
+    def test_at(self):
+        self.assertEqual([self.c[1], self.c[3], self.c[5]], list(self.league.competitions_at("Sheet A")))
+        self.assertEqual([self.c[2]], list(self.league.competitions_at("Sheet B", self.days[1], self.days[4])))
+        self.assertEqual([], list(self.league.competitions_at("Sheet Z")))
+        self.assertEqual(["Sheet A", "Sheet B"], self.league.competition_index.locations())
+
+    def test_same_oid_and_date_time(self):
+        index = CompetitionIndex(self.c[:2])
+        copy = Competition(self.c[1].oid, [], "Sheet A", self.days[1])
+        index.add(copy)
+        self.assertEqual([self.c[0], self.c[1], copy], list(index.between()))
+        index.remove(self.c[1])
+        self.assertEqual([copy], list(index.at("Sheet A")))
+
+    def test_maintained(self):
+        self.league.competition_index
+        self.league.add_competitions(self.c[6:8])
+        self.league.remove_competition(self.c[2])
+        self.league.remove_competition(self.c[2])
+        self.assertEqual([self.c[1], self.c[3], self.c[4], self.c[5], self.c[6], self.c[7]],
+                         list(self.league.competitions_between(self.days[1])))
+        self.c[7].date_time = self.days[0] - datetime.timedelta(days=1)
+        self.c[6].location = "Sheet C"
+        self.assertEqual(self.c[7], next(self.league.competitions_between()))
+        self.assertEqual([self.c[6]], list(self.league.competitions_at("Sheet C")))
+        self.assertNotIn(self.c[6], list(self.league.competitions_at("Sheet B")))
+        self.undated.date_time = self.days[9]
+        self.assertEqual([self.undated], list(self.league.competitions_between(self.days[9])))
+        self.assertEqual([], list(self.league.competition_index.undated()))
+        self.assertEqual(8, len(self.league.competition_index))
+
+    def test_database_view(self):
+        self.other.add_competitions(self.c[6:])
+        self.assertEqual(self.c[4:], list(self.db.competitions_between(self.days[4])))
+        self.assertEqual([self.c[5], self.c[7]], list(self.db.competitions_at("Sheet A", self.days[5], self.days[9])))
+
+
+if __name__ == '__main__':
+    unittest.main()
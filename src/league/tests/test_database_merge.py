@@ -0,0 +1,111 @@
+import unittest
+import copy
+
+from src.league.competition import Competition
+from src.league.database_diff import DatabaseDiff
+from src.league.database_merge import DatabaseMerge
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class DatabaseMergeTests(unittest.TestCase):
+    def setUp(self):
+        self.base = LeagueDatabase()
+        league = League(self.base.next_oid(), "AL State Curling League")
+        self.base.add_league(league)
+        t1 = Team(self.base.next_oid(), "Flintstones")
+        t2 = Team(self.base.next_oid(), "Rubbles")
+        t1.add_member(TeamMember(self.base.next_oid(), "Fred", "fred@bedrock.com"))
+        t2.add_member(TeamMember(self.base.next_oid(), "Barney", "barney@bedrock.com"))
+        league.add_teams([t1, t2])
+        league.add_competition(Competition(self.base.next_oid(), [t1, t2], "Sheet A"))
+        self.ours = copy.deepcopy(self.base)
+        self.theirs = copy.deepcopy(self.base)
+
+    @staticmethod
+    def parts(db):
+        league = db.leagues[0]
+        return league, league.teams[0], league.teams[1] if len(league.teams) > 1 else None
+
+    def test_diff(self):
+        self.assertFalse(DatabaseDiff(self.base, self.ours))
+        league, t1, t2 = self.parts(self.ours)
+        t1.members[0].name = "Freddy"
+        t2.add_member(TeamMember(self.ours.next_oid(), "Betty", "betty@bedrock.com"))
+        league.remove_competition(league.competitions[0])
+        diff = DatabaseDiff(self.base, self.ours)
+        self.assertEqual([("member", 7, {"name": "Betty", "email": "betty@bedrock.com"})], diff.added)
+        self.assertEqual([("competition", 6)], [r[:2] for r in diff.removed])
+        self.assertEqual({("league", 1): {"competitions": ((6,), ())},
+                          ("team", 3): {"members": ((5,), (5, 7))},
+                          ("member", 4): {"name": ("Fred", "Freddy")}},
+                         {(kind, oid): fields for kind, oid, fields in diff.changed})
+        self.assertIn("~ member 4 name: 'Fred' -> 'Freddy'", str(diff))
+
+    def test_merge_without_conflicts(self):
+        league, t1, t2 = self.parts(self.ours)
+        t1.members[0].name = "Freddy"
+        t2.add_member(TeamMember(self.ours.next_oid(), "Betty", "betty@bedrock.com"))
+        league, t1, t2 = self.parts(self.theirs)
+        t1.members[0].email = "fred@slaterock.com"
+        self.theirs.next_oid()
+        t2.add_member(TeamMember(self.theirs.next_oid(), "Bamm-Bamm", "bamm@bedrock.com"))
+        league.competitions[0].record_result([(3, 1)])
+        merge = DatabaseMerge(self.base, self.ours, self.theirs)
+        self.assertEqual([], merge.conflicts)
+        league, t1, t2 = self.parts(merge.merged)
+        self.assertEqual(("Freddy", "fred@slaterock.com"), (t1.members[0].name, t1.members[0].email))
+        self.assertEqual(["Barney", "Betty", "Bamm-Bamm"], [m.name for m in t2.members])
+        self.assertEqual((3, 1), league.competitions[0].final_scores)
+        self.assertEqual(8, merge.merged.next_oid() - 1)
+        self.assertEqual([], merge.merged.check_integrity())
+
+    def test_merge_conflicts(self):
+        league, t1, t2 = self.parts(self.ours)
+        t1.members[0].name = "Freddy"
+        league.remove_competition(league.competitions[0])
+        league.remove_team(t2)
+        league, t1, t2 = self.parts(self.theirs)
+        t1.members[0].name = "Frederick"
+        t2.name = "The Rubbles"
+        merge = DatabaseMerge(self.base, self.ours, self.theirs)
+        self.assertEqual([("member", 4, "name", "ours"), ("team", 3, None, "theirs")],
+                         [(c.kind, c.oid, c.field, c.resolution) for c in merge.conflicts])
+        league, t1, t2 = self.parts(merge.merged)
+        self.assertEqual("Freddy", t1.members[0].name)
+        self.assertEqual(["Flintstones", "The Rubbles"], [team.name for team in league.teams])
+        self.assertEqual(["Barney"], [member.name for member in league.teams[1].members])
+        self.assertEqual([], league.competitions)
+        self.assertEqual([], merge.merged.check_integrity())
+
+    def test_merge_keeps_teams_of_kept_competition(self):
+        league, t1, t2 = self.parts(self.ours)
+        league.remove_competition(league.competitions[0])
+        league.remove_team(t2)
+        league = self.parts(self.theirs)[0]
+        league.competitions[0].record_result([(3, 1)])
+        merge = DatabaseMerge(self.base, self.ours, self.theirs)
+        self.assertEqual([("competition", 6, "theirs"), ("team", 3, "kept for competition 6")],
+                         [(c.kind, c.oid, c.resolution) for c in merge.conflicts])
+        league, t1, t2 = self.parts(merge.merged)
+        self.assertEqual(["Flintstones", "Rubbles"], [team.name for team in league.teams])
+        self.assertEqual(["Barney"], [member.name for member in t2.members])
+        self.assertEqual([t1, t2], league.competitions[0].teams_competing)
+        self.assertEqual((3, 1), league.competitions[0].final_scores)
+        self.assertEqual([], merge.merged.check_integrity())
+
+    def test_merge_rejects_duplicate_email(self):
+        league, t1, t2 = self.parts(self.ours)
+        t1.add_member(TeamMember(self.ours.next_oid(), "Wilma", "wilma@bedrock.com"))
+        league, t1, t2 = self.parts(self.theirs)
+        self.theirs.next_oid()
+        t1.add_member(TeamMember(self.theirs.next_oid(), "Wilma F", "WILMA@bedrock.com"))
+        merge = DatabaseMerge(self.base, self.ours, self.theirs)
+        self.assertEqual([("team", 2, 8)], [(c.kind, c.oid, c.ours) for c in merge.conflicts])
+        self.assertEqual(["Fred", "Wilma"], [m.name for m in self.parts(merge.merged)[1].members])
+
+
+if __name__ == '__main__':
+    unittest.main()
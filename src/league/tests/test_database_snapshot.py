@@ -0,0 +1,145 @@
+import os
+import sys
+import threading
+import unittest
+
+from src.league.competition import Competition
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class DatabaseSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        self.db.add_league(self.league)
+        self.team = Team(self.db.next_oid(), "Flintstones")
+        self.other = Team(self.db.next_oid(), "Rubbles")
+        self.league.add_teams([self.team, self.other])
+        self.fred = TeamMember(self.db.next_oid(), "Fred", "fred@bedrock.com")
+        self.wilma = TeamMember(self.db.next_oid(), "Wilma", "wilma@bedrock.com")
+        self.barney = TeamMember(self.db.next_oid(), "Barney", "barney@bedrock.com")
+        self.team.add_members([self.fred, self.wilma])
+        self.other.add_members([self.barney, self.fred])
+        self.game = Competition(self.db.next_oid(), [self.team, self.other], "Sheet A")
+        self.league.add_competition(self.game)
+
+    def test_frozen_view(self):
+        with self.db.snapshot() as snapshot:
+            self.assertEqual(0, snapshot.changes)
+            pebbles = TeamMember(self.db.next_oid(), "Pebbles", "pebbles@bedrock.com")
+            self.team.add_member(pebbles)
+            self.team.remove_member(self.fred)
+            self.other.remove_member(self.barney)
+            self.fred.name = "Freddy"
+            self.fred.name = "Fred F"
+            self.fred.email = "ff@bedrock.com"
+            self.game.record_result([(1, 0), (0, 2)])
+            self.league.remove_competition(self.game)
+            third = Team(self.db.next_oid(), "Slates")
+            self.league.add_team(third)
+            self.db.remove_league(self.league)
+            self.assertEqual((self.league,), snapshot.leagues())
+            self.assertEqual((self.team, self.other), snapshot.teams(self.league))
+            self.assertEqual((self.fred, self.wilma), snapshot.members(self.team))
+            self.assertEqual((self.barney, self.fred), snapshot.members(self.other))
+            self.assertEqual((), snapshot.members(third))
+            self.assertEqual((self.game,), snapshot.competitions(self.league))
+            self.assertEqual("Fred", snapshot.get(self.fred, "name"))
+            self.assertEqual("fred@bedrock.com", snapshot.get(self.fred, "email"))
+            self.assertEqual("Wilma", snapshot.get(self.wilma, "name"))
+            self.assertEqual((None, None), snapshot.get(self.game, "result"))
+            self.assertEqual(8, snapshot.changes)
+            self.assertEqual([self.wilma, pebbles], self.team.members)
+        self.assertNotIn(snapshot, self.db._listeners)
+
+    def test_removed_objects_stay_frozen(self):
+        with self.db.snapshot() as snapshot:
+            self.team.remove_member(self.wilma)
+            self.wilma.name = "Wilma F"
+            self.league.remove_competition(self.game)
+            self.league.remove_team(self.other)
+            self.other.name = "The Rubbles"
+            self.other.remove_member(self.barney)
+            self.barney.email = "rubble@bedrock.com"
+            self.assertEqual((self.fred, self.wilma), snapshot.members(self.team))
+            self.assertEqual("Wilma", snapshot.get(self.wilma, "name"))
+            self.assertEqual("Rubbles", snapshot.get(self.other, "name"))
+            self.assertEqual((self.barney, self.fred), snapshot.members(self.other))
+            self.assertEqual("barney@bedrock.com", snapshot.get(self.barney, "email"))
+        self.assertEqual([], self.wilma._observers)
+        self.assertEqual([], self.other._observers)
+
+    def test_readers_on_other_threads(self):
+        members = [TeamMember(self.db.next_oid(), f"Member {i}", f"m{i}@bedrock.com") for i in range(200)]
+        self.team.add_members(members)
+        before = tuple(self.team.members)
+        with self.db.snapshot() as snapshot:
+            views = []
+            errors = []
+
+            def read():
+                # each view is read twice, the writer going on in between
+                try:
+                    for i in range(2000):
+                        with self.db.snapshot() as view:
+                            first = (view.members(self.team), view.get(self.fred, "name"))
+                            second = (view.members(self.team), view.get(self.fred, "name"))
+                        views.append((first, second))
+                except Exception as e:
+                    errors.append(e)
+
+            def write():
+                i = 0
+                while len(views) < 2000 and not errors:
+                    self.team.remove_members(members[i % 7::7])
+                    self.fred.name = f"Fred {i}"
+                    self.team.add_members(members[i % 7::7])
+                    i += 1
+
+            threads = [threading.Thread(target=read), threading.Thread(target=write)]
+            interval = sys.getswitchinterval()
+            # switch threads as often as possible, between a change and its event too
+            sys.setswitchinterval(1e-6)
+            try:
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            finally:
+                sys.setswitchinterval(interval)
+            self.assertEqual([], errors)
+            self.assertEqual(2000, len(views))
+            batches = [set()] + [set(members[i::7]) for i in range(7)]
+            for first, second in views:
+                self.assertEqual(first, second)
+                missing = set(before) - set(first[0])
+                self.assertIn(missing, batches)
+                self.assertEqual(len(before), len(first[0]) + len(missing))
+            self.assertEqual(before, snapshot.members(self.team))
+            self.assertEqual("Fred", snapshot.get(self.fred, "name"))
+
+    def test_undo_after_snapshot(self):
+        self.team.remove_member(self.wilma)
+        with self.db.snapshot() as snapshot:
+            self.db.undo()
+            self.assertEqual([self.fred, self.wilma], self.team.members)
+            self.assertEqual((self.fred,), snapshot.members(self.team))
+
+    def test_export_uses_snapshot(self):
+        file_name = "snapshot_export_test.csv"
+        try:
+            self.db.export_league_teams(self.league, file_name)
+            with open(file_name, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        finally:
+            os.remove(file_name)
+        self.assertEqual(["Team name,Member name,Member email", "Flintstones,Fred,fred@bedrock.com",
+                          "Flintstones,Wilma,wilma@bedrock.com", "Rubbles,Barney,barney@bedrock.com",
+                          "Rubbles,Fred,fred@bedrock.com"], lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
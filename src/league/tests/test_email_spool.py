@@ -0,0 +1,73 @@
+import unittest
+import tempfile
+
+from src.league.email_spool import EmailSpool
+from src.league.smtp_emailer import SmtpEmailer
+from src.league.smtp_sink import SmtpSink
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class CrashingEmailer:
+    """sends through emailer until it has sent count messages, then fails like a lost connection"""
+
+    def __init__(self, emailer, count):
+        self.emailer = emailer
+        self.count = count
+
+    def send_plain_email(self, recipients, subject, message):
+        if self.count == 0:
+            raise ConnectionResetError("connection lost")
+        self.count -= 1
+        self.emailer.send_plain_email(recipients, subject, message)
+
+
+class EmailSpoolTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.spool = EmailSpool(self.directory.name)
+        self.team = Team(1, "Flintstones")
+        for i, name in enumerate(["fred", "wilma", "pebbles", "dino"]):
+            self.team.add_member(TeamMember(i + 2, name.title(), f"{name}@bedrock.com"))
+        self.sink = SmtpSink(reject=["dino@bedrock.com"]).start()
+        self.emailer = SmtpEmailer(self.sink.host, self.sink.port, "league@curl.org")
+
+    def tearDown(self):
+        self.sink.stop()
+        self.directory.cleanup()
+
+    def test_drain_resumes(self):
+        self.team.send_email(self.spool, "Practice", "Practice is at 7.")
+        job_id = self.spool.jobs()[0]
+        self.assertEqual("queued", self.spool.status(job_id).state)
+        with self.assertRaises(ConnectionResetError):
+            self.spool.drain(CrashingEmailer(self.emailer, 2))
+        with open(f"{self.directory.name}/cur/{job_id}.state", "a") as f:
+            f.write("2 se")     # the crash cut this line short
+        status = EmailSpool(self.directory.name).status(job_id)
+        self.assertEqual("sending", status.state)
+        self.assertEqual(["fred@bedrock.com", "wilma@bedrock.com"], status.sent)
+        self.assertEqual(["pebbles@bedrock.com", "dino@bedrock.com"], status.pending)
+        self.assertEqual(1, EmailSpool(self.directory.name).drain(self.emailer))
+        status = self.spool.status(job_id)
+        self.assertEqual("done", status.state)
+        self.assertEqual(["dino@bedrock.com"], [recipient for recipient, reason in status.failed])
+        self.assertIn("550", status.failed[0][1])
+        self.assertEqual(["fred@bedrock.com", "wilma@bedrock.com", "pebbles@bedrock.com"], self.sink.recipients())
+        self.assertIn("Subject: Practice", self.sink.messages[0][2])
+        self.assertEqual([], self.spool.jobs())
+        self.assertEqual(0, self.spool.drain(self.emailer))
+
+    def test_limit_and_order(self):
+        first = self.spool.send_plain_email(["a@curl.org", "b@curl.org"], "First", "1")
+        second = self.spool.send_plain_email(["c@curl.org"], "Second", "2")
+        self.assertEqual([first, second], self.spool.jobs())
+        self.assertEqual(1, self.spool.drain(self.emailer, limit=1))
+        self.assertEqual(2, self.spool.drain(self.emailer))
+        self.assertEqual(["a@curl.org", "b@curl.org", "c@curl.org"], self.sink.recipients())
+        self.assertEqual([first, second], self.spool.jobs(include_done=True))
+        self.assertIsNone(self.spool.status("no-such-job"))
+
+
+if __name__ == '__main__':
+    unittest.main()
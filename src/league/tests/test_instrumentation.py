@@ -0,0 +1,84 @@
+import unittest
+import os.path
+
+from src.league.instrumentation import Instrumentation, instrumented
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+
+
+class InstrumentationTests(unittest.TestCase):
+    def setUp(self):
+        Instrumentation.instance().reset()
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "Test League")
+        self.db.add_league(self.league)
+
+    def tearDown(self):
+        Instrumentation.enable(False)
+        Instrumentation.instance().reset()
+
+    def test_off_by_default(self):
+        self.db.import_league_teams(self.league, "Teams.csv")
+        self.league.team_named("Flintstones")
+        self.assertEqual({}, Instrumentation.instance().snapshot())
+
+    def test_records_operations(self):
+        Instrumentation.enable()
+        self.db.import_league_teams(self.league, "Teams.csv")
+        for i in range(3):
+            self.league.team_named("Curl Jam")
+        self.db.league_named("Test League")
+        self.league.team_named("Flintstones").member_named("nobody")
+        file_name = "instrumented_test.dat"
+        self.db.save(file_name)
+        LeagueDatabase.load(file_name)
+        stats = Instrumentation.instance().snapshot()
+        self.assertEqual(4, stats["League.team_named"]["count"])
+        self.assertEqual(1, stats["LeagueDatabase.league_named"]["count"])
+        self.assertEqual(1, stats["Team.member_named"]["count"])
+        self.assertEqual(os.path.getsize("Teams.csv"), stats["import_league_teams"]["bytes_read"])
+        self.assertEqual(os.path.getsize(file_name), stats["LeagueDatabase.save"]["bytes_written"])
+        self.assertEqual(os.path.getsize(file_name), stats["LeagueDatabase.load"]["bytes_read"])
+        self.assertIn("LeagueDatabase.save", Instrumentation.instance().report())
+        os.remove(file_name)
+
+    def test_file_argument_by_name(self):
+        Instrumentation.enable()
+        mismatches = []
+        self.db.import_league_teams(self.league, "Teams.csv", mismatches)
+        directory = "instrumented_shards"
+        self.db.save_shards(directory)
+        LeagueDatabase.load(directory)
+        stats = Instrumentation.instance().snapshot()
+        self.assertEqual(os.path.getsize("Teams.csv"), stats["import_league_teams"]["bytes_read"])
+        shards = [os.path.join(directory, name) for name in os.listdir(directory)]
+        self.assertEqual(sum(os.path.getsize(path) for path in shards), stats["LeagueDatabase.load"]["bytes_read"])
+        for path in shards:
+            os.remove(path)
+        os.rmdir(directory)
+
+    def test_percentiles(self):
+        instrumentation = Instrumentation.instance()
+        for i in range(1, 101):
+            instrumentation.record("op", i / 1000, bytes_written=10)
+        stats = instrumentation.snapshot()["op"]
+        self.assertEqual(100, stats["count"])
+        self.assertAlmostEqual(5.05, stats["total"])
+        self.assertAlmostEqual(0.051, stats["p50"])
+        self.assertAlmostEqual(0.091, stats["p90"])
+        self.assertAlmostEqual(0.1, stats["p99"])
+        self.assertAlmostEqual(0.1, stats["max"])
+        self.assertEqual(1000, stats["bytes_written"])
+
+    def test_failing_calls_are_counted(self):
+        @instrumented("fails")
+        def fails():
+            raise ValueError("no")
+        Instrumentation.enable()
+        with self.assertRaises(ValueError):
+            fails()
+        self.assertEqual(1, Instrumentation.instance().snapshot()["fails"]["count"])
+
+
+if __name__ == '__main__':
+    unittest.main()
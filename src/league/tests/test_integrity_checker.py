@@ -0,0 +1,75 @@
+import unittest
+import os.path
+
+from src.league.competition import Competition
+from src.league.integrity_checker import IntegrityChecker
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class IntegrityCheckerTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        self.other = League(self.db.next_oid(), "GA State Curling League")
+        self.db.add_league(self.league)
+        self.db.add_league(self.other)
+        self.t1 = Team(self.db.next_oid(), "Flintstones")
+        self.t2 = Team(self.db.next_oid(), "Rubbles")
+        self.fred = TeamMember(self.db.next_oid(), "Fred", "fred@bedrock.com")
+        self.t1.add_member(self.fred)
+        self.t2.add_member(self.fred)
+        self.league.add_teams([self.t1, self.t2])
+        self.other.add_team(self.t2)
+        self.game = Competition(self.db.next_oid(), [self.t1, self.t2], "Sheet A")
+        self.league.add_competition(self.game)
+
+    def test_clean_database(self):
+        self.assertEqual([], self.db.check_integrity())
+
+    def test_finds_every_problem(self):
+        copy = TeamMember(self.fred.oid, "Fred Copy", "copy@bedrock.com")
+        self.t2.members.append(copy)
+        self.t2.members.append(TeamMember(self.db.next_oid(), "Freddy", "FRED@bedrock.com"))
+        self.t1.members.append(self.fred)
+        del self.league.teams[0]
+        self.other.add_team(Team(1000, "Slates"))
+        problems = self.db.check_integrity()
+        kinds = sorted(problem.kind for problem in problems)
+        self.assertEqual(sorted([IntegrityChecker.DUPLICATE_OID, IntegrityChecker.DUPLICATE_EMAIL,
+                                 IntegrityChecker.LISTED_TWICE, IntegrityChecker.NOT_IN_LEAGUE,
+                                 IntegrityChecker.OID_BEYOND_LAST]), kinds)
+        duplicate = [p for p in problems if p.kind == IntegrityChecker.DUPLICATE_OID][0]
+        self.assertEqual((self.league, self.t2, copy), duplicate.path)
+        self.assertEqual('League "AL State Curling League" (oid 1) / Team "Rubbles" (oid 4) / '
+                         'TeamMember "Fred Copy" (oid 5): oid 5 is also used by League "AL State Curling League" '
+                         '(oid 1) / Team "Rubbles" (oid 4) / TeamMember "Fred" (oid 5)', str(duplicate))
+        missing = [p for p in problems if p.kind == IntegrityChecker.NOT_IN_LEAGUE][0]
+        self.assertEqual((self.league, self.game, self.t1), missing.path)
+
+    def test_repair(self):
+        self.db.search("fred")
+        # saved before the damage: a league with two objects of the same oid cannot be saved
+        self.db.save("integrity_test.dat")
+        self.t2.members.append(TeamMember(self.fred.oid, "Fred Copy", "copy@bedrock.com"))
+        self.t2.members.append(TeamMember(self.db.next_oid(), "Freddy", "FRED@bedrock.com"))
+        self.t1.members.append(self.fred)
+        del self.league.teams[0]
+        self.other.add_team(Team(1000, "Slates"))
+        problems = self.db.check_integrity(repair=True)
+        self.assertTrue(all(problem.repaired for problem in problems))
+        self.assertEqual([], self.db.check_integrity())
+        self.assertEqual([self.t2, self.t1], self.league.teams)
+        self.assertEqual([self.fred], self.t1.members)
+        self.assertEqual(["Fred", "Fred Copy"], [m.name for m in self.t2.members])
+        self.assertEqual(1001, self.t2.members[1].oid)
+        self.assertEqual(1002, self.db.next_oid())
+        self.assertEqual(2, len(self.db.search("fred")))
+        self.assertEqual([self.league, self.other], self.db.unsaved_leagues())
+        os.remove("integrity_test.dat")
+
+
+if __name__ == '__main__':
+    unittest.main()
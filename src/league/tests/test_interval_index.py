@@ -0,0 +1,120 @@
+import unittest
+import datetime
+
+from src.league.competition import Competition
+from src.league.exception_schedule_conflict import ScheduleConflict
+from src.league.interval_index import IntervalIndex
+from src.league.league import League
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class IntervalIndexTests(unittest.TestCase):
+    def test_overlapping(self):
+        index = IntervalIndex()
+        index.add("a", 0, 10, 1)
+        index.add("a", 10, 12, 2)
+        index.add("a", 20, 60, 3)
+        index.add("b", 5, 6, 4)
+        self.assertEqual([1], [i[2] for i in index.overlapping("a", 5, 10)])
+        self.assertEqual([1, 2], [i[2] for i in index.overlapping("a", 9, 11)])
+        self.assertEqual([3], [i[2] for i in index.overlapping("a", 50, 70)])
+        self.assertEqual([], index.overlapping("a", 12, 20))
+        self.assertEqual([], index.overlapping("c", 0, 100))
+        index.remove("a", 20, 60, 3)
+        self.assertEqual([], index.overlapping("a", 50, 70))
+        self.assertEqual(3, len(index))
+
+    def test_same_oid_and_times(self):
+        index = IntervalIndex()
+        first = Competition(1, [], "Sheet A")
+        second = Competition(1, [], "Sheet A")
+        index.add("a", 0, 10, 1, first)
+        index.add("a", 0, 10, 1, second)
+        self.assertEqual([first, second], [i[3] for i in index.overlapping("a", 5, 6)])
+        self.assertEqual(1, len(index.overlapping_pairs()))
+        index.remove("a", 0, 10, 1, second)
+        self.assertEqual([(0, 10, 1, first)], index.overlapping("a", 5, 6))
+
+    def test_overlapping_pairs(self):
+        index = IntervalIndex()
+        index.add("a", 0, 10, 1)
+        index.add("a", 5, 15, 2)
+        index.add("a", 8, 9, 3)
+        index.add("a", 15, 20, 4)
+        index.add("b", 0, 10, 5)
+        pairs = {(key, a[2], b[2]) for key, a, b in index.overlapping_pairs()}
+        self.assertEqual({("a", 1, 2), ("a", 1, 3), ("a", 2, 3)}, pairs)
+
+
+class ScheduleConflictTests(unittest.TestCase):
+    def setUp(self):
+        self.league = League(1, "AL State Curling League")
+        self.teams = [Team(i, f"Team {i}") for i in range(1, 5)]
+        for team in self.teams:
+            team.add_member(TeamMember(10 + team.oid, f"Member {team.oid}", f"m{team.oid}@curl.org"))
+            self.league.add_team(team)
+        self.shared = TeamMember(20, "Shared", "shared@curl.org")
+        self.teams[0].add_member(self.shared)
+        self.teams[2].add_member(self.shared)
+        self.start = datetime.datetime(2024, 1, 6, 19, 0)
+
+    def test_duration(self):
+        c = Competition(1, self.teams[:2], "Sheet A", self.start)
+        self.assertEqual(Competition.DEFAULT_DURATION, c.duration)
+        self.assertEqual(self.start + Competition.DEFAULT_DURATION, c.end_time)
+        c = Competition(2, self.teams[:2], "Sheet A", None, datetime.timedelta(hours=3))
+        self.assertIsNone(c.end_time)
+
+    def test_conflicts_are_allowed_by_default(self):
+        self.league.add_competition(Competition(1, self.teams[:2], "Sheet A", self.start))
+        self.league.add_competition(Competition(2, self.teams[2:], "Sheet A", self.start))
+        self.assertEqual(2, len(self.league.competitions))
+
+    def test_reject_location_conflict(self):
+        self.league.reject_conflicts = True
+        c1 = Competition(1, [self.teams[1], self.teams[3]], "Sheet A", self.start)
+        self.league.add_competition(c1)
+        with self.assertRaises(ScheduleConflict):
+            self.league.add_competition(Competition(2, [], "Sheet A", self.start + datetime.timedelta(hours=1)))
+        self.league.add_competition(Competition(3, [], "Sheet A", c1.end_time))
+        self.league.add_competition(Competition(4, [], "Sheet B", self.start))
+        self.league.add_competition(Competition(5, [], "Sheet A", None))
+        self.assertEqual(4, len(self.league.competitions))
+
+    def test_reject_member_and_team_conflicts(self):
+        self.league.reject_conflicts = True
+        self.league.add_competition(Competition(1, [self.teams[0], self.teams[1]], "Sheet A", self.start))
+        with self.assertRaises(ScheduleConflict):
+            self.league.add_competition(Competition(2, [self.teams[2], self.teams[3]], "Sheet B", self.start))
+        with self.assertRaises(ScheduleConflict):
+            self.league.add_competition(Competition(3, [self.teams[1], self.teams[3]], "Sheet C", self.start))
+        with self.assertRaises(ScheduleConflict):
+            self.league.add_competitions([Competition(4, [self.teams[3]], "Sheet D", self.start),
+                                          Competition(5, [self.teams[3]], "Sheet E", self.start)])
+        self.assertEqual(1, len(self.league.competitions))
+        self.league.add_competitions([Competition(6, [self.teams[3]], "Sheet D", self.start)])
+        self.assertEqual(2, len(self.league.competitions))
+
+    def test_index_follows_moves_and_roster_changes(self):
+        self.league.reject_conflicts = True
+        c1 = Competition(1, [self.teams[1]], "Sheet A", self.start)
+        self.league.add_competition(c1)
+        c2 = Competition(2, [self.teams[3]], "Sheet B", self.start)
+        c1.location = "Sheet C"
+        self.league.add_competition(c2)
+        self.teams[3].add_member(self.teams[1].members[0])
+        self.assertEqual(1, len(self.league.conflicts_for(c1)))
+
+    def test_schedule_conflicts(self):
+        c1 = Competition(1, [self.teams[0], self.teams[1]], "Sheet A", self.start)
+        c2 = Competition(2, [self.teams[2], self.teams[3]], "Sheet A", self.start + datetime.timedelta(hours=1))
+        c3 = Competition(3, [self.teams[1]], "Sheet B", self.start + datetime.timedelta(hours=5))
+        self.league.add_competitions([c1, c2, c3])
+        conflicts = self.league.schedule_conflicts()
+        self.assertEqual({("location", "Sheet A"), ("member", self.shared.oid)}, {key for key, a, b in conflicts})
+        self.assertTrue(all({a, b} == {c1, c2} for key, a, b in conflicts))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ from src.league.competition import Competition
 from src.league.league import League
 from src.league.team import Team
 from src.league.team_member import TeamMember
+from src.league.tests.fake_emailer import FakeEmailer
 
 
 class LeagueTests(unittest.TestCase):
@@ -89,3 +90,10 @@ class LeagueTests(unittest.TestCase):
         # so use sets.
         cs_names = {c.location for c in cs}  # set comprehensionq
         self.assertEqual({"t3 vs t1", "t3 vs t2", "t2 vs t3", "t1 vs t3"}, cs_names)
+
+    def test_send_email(self):
+        league = self.build_league()
+        league.teams[1].add_member(league.teams[0].members[0])
+        fe = FakeEmailer()
+        league.send_email(fe, "Subject", "Message")
+        self.assertEqual(["fred", "barney", "wilma", "betty", "pebbles", "bam-bam", "dino", "mrslate"], fe.recipients)
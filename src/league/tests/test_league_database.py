@@ -1,7 +1,12 @@
 import unittest
 import os.path
+import pickle
+import struct
+import tempfile
 from src.league.league_database import LeagueDatabase
 from src.league.league import League
+from src.league.team import Team
+from src.league.team_member import TeamMember
 
 
 class TestingLeagueDatabase(unittest.TestCase):
@@ -72,6 +77,183 @@ class TestingLeagueDatabase(unittest.TestCase):
         self.assertTrue(league.team_named("Curl Power"))
         self.assertTrue(league.team_named("Cold Fingers"))
 
+    def test_unsaved_leagues(self):
+        league_db = LeagueDatabase()
+        league = League(league_db.next_oid(), "Test League")
+        league_db.import_league_teams(league, "Teams.csv")
+        league_db.add_league(league)
+        other = League(league_db.next_oid(), "Other League")
+        league_db.add_league(other)
+        self.assertEqual([league, other], league_db.unsaved_leagues())
+        file_name = "dirty_test.dat"
+        league_db.save(file_name)
+        self.assertEqual([], league_db.unsaved_leagues())
+        self.assertFalse(league_db.has_unsaved_changes())
+        league.team_named("Flintstones").members[0].name = "Wilma"
+        self.assertEqual([league], league_db.unsaved_leagues())
+        league_db.save(file_name)
+        league_db.remove_league(other)
+        self.assertEqual([], league_db.unsaved_leagues())
+        self.assertTrue(league_db.has_unsaved_changes())
+        os.remove(file_name)
+        os.remove(file_name + ".backup")
+
+    def test_save_only_changed_leagues(self):
+        league_db = LeagueDatabase()
+        league = League(league_db.next_oid(), "Test League")
+        league_db.import_league_teams(league, "Teams.csv")
+        other = League(league_db.next_oid(), "Other League")
+        shared = Team(league_db.next_oid(), "Shared")
+        member = TeamMember(league_db.next_oid(), "Fred", "fred@bedrock.com")
+        shared.add_member(member)
+        league.team_named("Flintstones").add_member(member)
+        other.add_team(shared)
+        league_db.add_league(league)
+        league_db.add_league(other)
+        file_name = "incremental_test.dat"
+        league_db.save(file_name)
+        # changed without telling anyone: only a save that pickles the league again keeps it
+        other._name = "Renamed without notice"
+        league.team_named("Curl Jam").name = "Curl Jammers"
+        league_db.save(file_name)
+        LeagueDatabase.load(file_name)
+        loaded = LeagueDatabase.instance()
+        self.assertEqual(["Test League", "Other League"], [l.name for l in loaded.leagues])
+        self.assertTrue(loaded.leagues[0].team_named("Curl Jammers"))
+        self.assertEqual([], loaded.unsaved_leagues())
+        self.assertEqual(league_db.next_oid(), loaded.next_oid())
+        fred = loaded.leagues[1].teams[0].members[0]
+        self.assertIs(fred, loaded.leagues[0].team_named("Flintstones").members[-1])
+        fred.name = "Freddy"
+        self.assertEqual(loaded.leagues, loaded.unsaved_leagues())
+        os.remove(file_name)
+        os.remove(file_name + ".backup")
+
+    def test_save_after_loading_backup(self):
+        league_db = LeagueDatabase()
+        for name in ("Test League", "Other League"):
+            league = League(league_db.next_oid(), name)
+            league_db.import_league_teams(league, "Teams.csv")
+            league_db.add_league(league)
+        file_name = "backup_reuse_test.dat"
+        league_db.save(file_name)
+        league_db.save(file_name)
+        with open(file_name, mode="r+b") as f:
+            f.truncate(20)
+        LeagueDatabase.load(file_name)
+        loaded = LeagueDatabase.instance()
+        loaded.leagues[0].name = "Renamed League"
+        loaded.save(file_name)
+        saved = LeagueDatabase.read(file_name)
+        self.assertEqual(["Renamed League", "Other League"], [l.name for l in saved.leagues])
+        self.assertEqual([t.name for t in league_db.leagues[1].teams], [t.name for t in saved.leagues[1].teams])
+        os.remove(file_name)
+        os.remove(file_name + ".backup")
+
+    def test_load_single_pickle_file(self):
+        league_db = LeagueDatabase()
+        league_db.add_league(League(league_db.next_oid(), "Test League"))
+        file_name = "single_pickle_test.dat"
+        with open(file_name, mode="wb") as f:
+            pickle.dump(league_db, f)
+        LeagueDatabase.load(file_name)
+        loaded = LeagueDatabase.instance()
+        self.assertTrue(loaded.league_named("Test League"))
+        self.assertFalse(loaded.has_unsaved_changes())
+        loaded.save(file_name)
+        LeagueDatabase.load(file_name)
+        self.assertTrue(LeagueDatabase.instance().league_named("Test League"))
+        os.remove(file_name)
+        os.remove(file_name + ".backup")
+
+    def test_load_pickled_leagues_file(self):
+        league_db = LeagueDatabase()
+        league = League(league_db.next_oid(), "Test League")
+        league_db.import_league_teams(league, "Teams.csv")
+        league_db.add_league(league)
+        file_name = "pickled_leagues_test.dat"
+        with open(file_name, mode="wb") as f:
+            f.write(LeagueDatabase.PICKLE_FILE_MARK)
+            pickle.dump(league, f)
+            contents_offset = f.tell()
+            pickle.dump({"last_oid": league_db._last_oid,
+                         "leagues": [(league.oid, len(LeagueDatabase.PICKLE_FILE_MARK),
+                                      contents_offset - len(LeagueDatabase.PICKLE_FILE_MARK))]}, f)
+            f.write(struct.pack("<Q", contents_offset))
+        loaded = LeagueDatabase.read(file_name)
+        self.assertEqual(len(league.teams), len(loaded.leagues[0].teams))
+        loaded.save(file_name)
+        with open(file_name, mode="rb") as f:
+            self.assertEqual(LeagueDatabase.FILE_MARK, f.read(len(LeagueDatabase.FILE_MARK)))
+        migrated = LeagueDatabase.read(file_name)
+        self.assertEqual([team.name for team in league.teams], [team.name for team in migrated.leagues[0].teams])
+        self.assertEqual(league_db.next_oid(), migrated.next_oid())
+        os.remove(file_name)
+        os.remove(file_name + ".backup")
+
+    def test_save_shards(self):
+        league_db = LeagueDatabase()
+        league = League(league_db.next_oid(), "Test League")
+        league_db.import_league_teams(league, "Teams.csv")
+        other = League(league_db.next_oid(), "Other League")
+        other.add_team(league.team_named("Flintstones"))
+        gone = League(league_db.next_oid(), "Gone League")
+        for added in (league, other, gone):
+            league_db.add_league(added)
+        with tempfile.TemporaryDirectory() as directory:
+            league_db.save(directory)
+            self.assertEqual(["league-1-1.dat", "league-24-1.dat", "league-25-1.dat", "manifest.dat"],
+                             sorted(os.listdir(directory)))
+            # changed without telling anyone: only a rewritten shard would have it
+            league._name = "Renamed without notice"
+            other.name = "Renamed League"
+            league_db.remove_league(gone)
+            league_db.save_shards(directory, workers=2)
+            self.assertEqual(["league-1-1.dat", "league-24-2.dat", "manifest.dat"], sorted(os.listdir(directory)))
+            LeagueDatabase.load(directory)
+            loaded = LeagueDatabase.instance()
+            self.assertEqual(["Test League", "Renamed League"], [l.name for l in loaded.leagues])
+            self.assertIs(loaded.leagues[0].team_named("Flintstones"), loaded.leagues[1].teams[0])
+            self.assertFalse(loaded.has_unsaved_changes())
+            self.assertEqual(league_db.next_oid(), loaded.next_oid())
+            single = LeagueDatabase.read_league(directory, "Renamed League")
+            self.assertEqual(["Flintstones"], [team.name for team in single.teams])
+            self.assertIsNone(LeagueDatabase.read_league(directory, "Gone League"))
+            loaded = LeagueDatabase.read_shards(directory, workers=2)
+            self.assertIs(loaded.leagues[0].team_named("Flintstones"), loaded.leagues[1].teams[0])
+
+    def test_interrupted_save_shards(self):
+        league_db = LeagueDatabase()
+        league = League(league_db.next_oid(), "Test League")
+        league_db.import_league_teams(league, "Teams.csv")
+        league_db.add_league(league)
+        with tempfile.TemporaryDirectory() as directory:
+            league_db.save_shards(directory)
+            last_oid = league_db.next_oid()
+            league.add_team(Team(last_oid, "Added"))
+            league_db.add_league(League(league_db.next_oid(), "Added League"))
+
+            def interrupted(*args):
+                raise KeyboardInterrupt()
+
+            original = LeagueDatabase._write_manifest
+            LeagueDatabase._write_manifest = interrupted
+            try:
+                with self.assertRaises(KeyboardInterrupt):
+                    league_db.save_shards(directory, workers=2)
+            finally:
+                LeagueDatabase._write_manifest = original
+            # the shards written are not the ones the manifest lists
+            loaded = LeagueDatabase.read_shards(directory)
+            self.assertEqual(["Test League"], [l.name for l in loaded.leagues])
+            self.assertIsNone(loaded.leagues[0].team_named("Added"))
+            self.assertEqual(last_oid, loaded.next_oid())
+            # the next save uses names after the leftovers, then removes them
+            league_db.save_shards(directory)
+            self.assertEqual(["league-1-3.dat", "league-25-3.dat", "manifest.dat"], sorted(os.listdir(directory)))
+            loaded = LeagueDatabase.read_shards(directory)
+            self.assertEqual(["Test League", "Added League"], [l.name for l in loaded.leagues])
+
 
 if __name__ == '__main__':
     unittest.main()
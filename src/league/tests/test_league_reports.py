@@ -0,0 +1,68 @@
+import datetime as dt
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.league.competition import Competition
+from src.league.league import League
+from src.league.league_reports import LeagueReports
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class LeagueReportsTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.leagues = []
+        oid = 1
+        for name in ("North & South", "West"):
+            league = League(oid, name)
+            teams = []
+            for t in range(2):
+                team = Team(oid + 1 + t, f"{name} team {t}")
+                team.add_member(TeamMember(oid + 3 + t, f"Player {t}", f"player{oid + t}@curl.org"))
+                teams.append(team)
+            league.add_teams(teams)
+            later = Competition(oid + 5, teams, "Sheet <B>", dt.datetime(2024, 1, 8, 19))
+            later.record_result([(2, 1), (0, 3)])
+            league.add_competitions([later, Competition(oid + 6, teams, "Sheet A", dt.datetime(2024, 1, 1, 19))])
+            self.leagues.append(league)
+            oid += 10
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, name):
+        with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+            return f.read()
+
+    def test_write(self):
+        reports = LeagueReports(self.directory, workers=2)
+        self.assertEqual([1, 11], reports.write(self.leagues))
+        self.assertEqual("Team name,Member name,Member email\nNorth & South team 0,Player 0,player1@curl.org\n"
+                         "North & South team 1,Player 1,player2@curl.org\n", self.read("league-1-roster.csv"))
+        self.assertEqual("Date,Location,Teams,Result\n2024-01-01 19:00:00,Sheet A,West team 0 vs West team 1,\n"
+                         "2024-01-08 19:00:00,Sheet <B>,West team 0 vs West team 1,2-4\n",
+                         self.read("league-11-schedule.csv"))
+        page = self.read("league-1.html")
+        self.assertIn("<h1>North &amp; South</h1>", page)
+        self.assertIn("<td>player2@curl.org</td>", page)
+        self.assertIn("<td>Sheet &lt;B&gt;</td>", page)
+
+    def test_skip_unchanged(self):
+        reports = LeagueReports(self.directory, workers=1)
+        reports.write(self.leagues)
+        self.assertEqual([], reports.write(self.leagues))
+        self.leagues[1].teams[0].members[0].name = "Renamed"
+        self.assertEqual([11], reports.write(self.leagues))
+        self.assertIn("Renamed", self.read("league-11-roster.csv"))
+        os.remove(os.path.join(self.directory, "league-1.html"))
+        self.assertEqual([1], reports.write(self.leagues))
+        self.assertEqual([], reports.write(self.leagues[1:]))
+        self.assertEqual(["league-11-roster.csv", "league-11-schedule.csv", "league-11.html", "reports.json"],
+                         sorted(os.listdir(self.directory)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import datetime as dt
+import io
+import json
+
+from src.league.competition import Competition
+from src.league.database_diff import DatabaseDiff
+from src.league.exception_bad_file_format import BadFileFormat
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.ndjson_format import NdjsonFormat
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class NdjsonFormatTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        league = League(self.db.next_oid(), "AL State Curling League")
+        other = League(self.db.next_oid(), "Ligue du Québec")
+        t1 = Team(self.db.next_oid(), "Flintstones")
+        t2 = Team(self.db.next_oid(), "Rubbles")
+        fred = TeamMember(self.db.next_oid(), "Fred", "fred@bedrock.com")
+        t1.add_member(fred)
+        t2.add_members([fred, TeamMember(self.db.next_oid(), "Barney", None)])
+        league.add_teams([t1, t2])
+        other.add_team(t2)
+        played = Competition(self.db.next_oid(), [t1, t2], "Sheet A", dt.datetime(2024, 1, 5, 19, 30))
+        played.record_result([(1, 0), (0, 2)])
+        league.add_competitions([played, Competition(self.db.next_oid(), [t2, t1], "Sheet B")])
+        self.db.add_league(league)
+        self.db.add_league(other)
+
+    def round_trip(self, leagues=None):
+        out = io.StringIO()
+        NdjsonFormat.write(self.db, out)
+        return out.getvalue(), NdjsonFormat.read(io.StringIO(out.getvalue()), leagues)
+
+    def test_round_trip(self):
+        text, db = self.round_trip()
+        self.assertEqual(8, len(text.splitlines()))
+        self.assertEqual({"type": "database", "version": 1, "last_oid": 8}, json.loads(text.splitlines()[0]))
+        self.assertFalse(DatabaseDiff(self.db, db))
+        self.assertEqual(self.db.next_oid(), db.next_oid())
+        league, other = db.leagues
+        self.assertIs(league.teams[1], other.teams[0])
+        self.assertIs(league.teams[0].members[0], other.teams[0].members[0])
+        self.assertIs(league.teams[0], league.competitions[1].teams_competing[1])
+        self.assertEqual([(1, 0), (0, 2)], league.competitions[0].end_scores)
+        self.assertEqual([], db.check_integrity())
+        self.assertTrue(db.has_unsaved_changes())
+
+    def test_partial_read(self):
+        text, db = self.round_trip({"Ligue du Québec"})
+        self.assertEqual(["Ligue du Québec"], [league.name for league in db.leagues])
+        self.assertEqual(["Fred", "Barney"], [m.name for m in db.leagues[0].teams[0].members])
+
+    def test_bad_line(self):
+        text, db = self.round_trip()
+        with self.assertRaises(BadFileFormat) as raised:
+            NdjsonFormat.read(io.StringIO(text + '{"type": "player"}\n'))
+        self.assertIn("Line 9", str(raised.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from src.league.object_pager import ObjectPager
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class ObjectPagerTests(unittest.TestCase):
+    def setUp(self):
+        self.team = Team(1, "Everyone")
+        self.team.add_members([TeamMember(i + 2, f"Member {i:04}", f"member{i}@curl.org") for i in range(1000)])
+
+    def test_fetch_more(self):
+        pager = ObjectPager(self.team.members, page=300)
+        self.assertEqual(1000, len(pager))
+        self.assertEqual(300, pager.fetched)
+        self.assertEqual(range(300, 600), pager.fetch_more())
+        self.assertEqual(range(600, 900), pager.fetch_more())
+        self.assertEqual(range(900, 1000), pager.fetch_more())
+        self.assertFalse(pager.can_fetch_more)
+        self.assertEqual(range(1000, 1000), pager.fetch_more())
+        self.assertIs(self.team.members[10], pager[10])
+        self.assertEqual(10, pager.row(self.team.members[10]))
+        self.assertEqual(-1, pager.row(TeamMember(5000, "Nobody", "nobody@curl.org")))
+
+    def test_filter_and_sort(self):
+        pager = ObjectPager(self.team.members, page=10)
+        pager.set_filter("MEMBER99")
+        self.assertEqual(["Member 0099"] + [f"Member {i:04}" for i in range(990, 1000)],
+                         [pager[i].name for i in range(len(pager))])
+        self.assertEqual(10, pager.fetched)
+        pager.sort(reverse=True)
+        self.assertEqual("Member 0999", pager[0].name)
+        self.assertEqual("Member 0099", pager[len(pager) - 1].name)
+        pager.set_filter("")
+        self.assertEqual(1000, len(pager))
+        self.assertEqual("Member 0999", pager[0].name)
+        pager.unsort()
+        self.assertIs(self.team.members[0], pager[0])
+
+    def test_reset(self):
+        pager = ObjectPager(self.team.members, page=10)
+        pager.fetch_more()
+        first = self.team.members[0]
+        self.team.remove_member(first)
+        pager.reset()
+        self.assertEqual(999, len(pager))
+        self.assertEqual(20, pager.fetched)
+        self.assertEqual(-1, pager.row(first))
+        pager.set_filter("Member 0")
+        self.assertEqual(999, len(pager))
+        empty = ObjectPager([])
+        self.assertEqual(0, empty.fetched)
+        self.assertFalse(empty.can_fetch_more)
+
+
+if __name__ == '__main__':
+    unittest.main()
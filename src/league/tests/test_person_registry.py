@@ -0,0 +1,64 @@
+import unittest
+import os.path
+
+from src.league.competition import Competition
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+from src.league.tests.fake_emailer import FakeEmailer
+
+
+class PersonRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        self.db.add_league(self.league)
+        self.team = Team(self.db.next_oid(), "Flintstones")
+        self.league.add_team(self.team)
+        self.fred = TeamMember(self.db.next_oid(), "Fred", "Fred@Bedrock.com")
+        self.team.add_member(self.fred)
+
+    def test_person(self):
+        self.assertIs(self.fred, self.db.person("fred@BEDROCK.com"))
+        self.assertIsNone(self.db.person("barney@bedrock.com"))
+        self.assertIsNone(self.db.person(None))
+        self.fred.email = "fred@slaterock.com"
+        self.assertIsNone(self.db.person("fred@bedrock.com"))
+        self.assertIs(self.fred, self.db.person("FRED@slaterock.com"))
+        other = Team(self.db.next_oid(), "Slaterock")
+        copy = TeamMember(self.db.next_oid(), "Fred F", "fred@slaterock.com")
+        other.add_member(copy)
+        self.league.add_team(other)
+        self.assertEqual([[self.fred, copy]], self.db.person_registry.duplicates())
+        self.team.remove_member(self.fred)
+        self.assertIs(copy, self.db.person("fred@slaterock.com"))
+        self.assertEqual(1, len(self.db.person_registry))
+
+    def test_import_resolves_persons(self):
+        file_name = "person_import_test.csv"
+        with open(file_name, "w", newline="", encoding="utf-8") as f:
+            f.write("Team name,Member name,Member email\n"
+                    "Rubbles,Freddy,FRED@bedrock.com\n"
+                    "Rubbles,Barney,barney@bedrock.com\n"
+                    "Rocks,Barney Rubble,Barney@bedrock.com\n")
+        mismatches = []
+        self.db.import_league_teams(self.league, file_name, mismatches)
+        os.remove(file_name)
+        rubbles = self.league.team_named("Rubbles")
+        rocks = self.league.team_named("Rocks")
+        self.assertEqual([("Freddy", self.fred), ("Barney Rubble", rubbles.members[1])], mismatches)
+        self.assertIs(self.fred, rubbles.members[0])
+        self.assertIs(rubbles.members[1], rocks.members[0])
+        self.assertEqual("Barney", rocks.members[0].name)
+        self.assertEqual([self.team, rubbles], self.league.teams_for_member(self.fred))
+        competition = Competition(self.db.next_oid(), [self.team, rubbles], "Sheet A")
+        self.league.add_competition(competition)
+        self.assertEqual([competition], self.league.competitions_for_member(rocks.members[0]))
+        emailer = FakeEmailer()
+        competition.send_email(emailer, "Draw", "See you there")
+        self.assertEqual(["Fred@Bedrock.com", "barney@bedrock.com"], emailer.recipients)
+
+
+if __name__ == '__main__':
+    unittest.main()
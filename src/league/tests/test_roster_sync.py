@@ -0,0 +1,95 @@
+import os
+import unittest
+
+from src.league.exception_invalid_batch import InvalidBatch
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+
+
+class RosterSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        self.db.add_league(self.league)
+        self.file_name = "roster_sync_test.csv"
+
+    def tearDown(self):
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+
+    def sync(self, *rows):
+        with open(self.file_name, "w", newline="", encoding="utf-8") as f:
+            f.write("Team name,Member name,Member email\n")
+            for row in rows:
+                f.write(",".join(row) + "\n")
+        return self.db.sync_league_teams(self.league, self.file_name)
+
+    def test_sync_twice(self):
+        self.db.import_league_teams(self.league, "Teams.csv")
+        members = {member.oid for team in self.league.teams for member in team.members}
+        sync = self.db.sync_league_teams(self.league, "Teams.csv")
+        self.assertFalse(sync)
+        self.assertEqual("", str(sync))
+        self.assertEqual(members, {member.oid for team in self.league.teams for member in team.members})
+
+    def test_inserts_updates_removals(self):
+        self.sync(("Flintstones", "Fred", "fred@bedrock.com"), ("Flintstones", "Wilma", "wilma@bedrock.com"),
+                  ("Rubbles", "Barney", "barney@bedrock.com"), ("Rubbles", "Fred", "fred@bedrock.com"))
+        flintstones, rubbles = self.league.teams
+        fred, wilma = flintstones.members
+        self.assertIs(fred, rubbles.members[1])
+        self.league.add_team(Team(self.db.next_oid(), "Slates"))
+        sync = self.sync(("Flintstones", "Fred Flintstone", "FRED@bedrock.com"),
+                         ("Flintstones", "Pebbles", "pebbles@bedrock.com"),
+                         ("Rubbles", "Barney", "barney@bedrock.com"), ("Rubbles", "Fred", "fred@bedrock.com"),
+                         ("Gazoos", "Barney", "barney@bedrock.com"), ("Gazoos", "Wilma F", "wilma@bedrock.com"))
+        self.assertEqual(["Gazoos"], sync.new_teams)
+        self.assertEqual([("Flintstones", "Pebbles", "pebbles@bedrock.com"),
+                          ("Gazoos", "Barney", "barney@bedrock.com"), ("Gazoos", "Wilma F", "wilma@bedrock.com")],
+                         sync.inserted)
+        self.assertEqual([(flintstones, fred, {"name": ("Fred", "Fred Flintstone"),
+                                               "email": ("fred@bedrock.com", "FRED@bedrock.com")})], sync.updated)
+        self.assertEqual([(flintstones, wilma)], sync.removed)
+        self.assertIn("- Flintstones: Wilma<wilma@bedrock.com>", str(sync))
+        self.assertEqual(["Fred Flintstone", "Pebbles"], [m.name for m in flintstones.members])
+        # Fred is one person on both teams: the update of his row is seen on the Rubbles too
+        self.assertEqual(("Fred Flintstone", "FRED@bedrock.com"), (rubbles.members[1].name, rubbles.members[1].email))
+        self.assertIn("name: 'Fred' -> 'Fred Flintstone' (also on Rubbles)", str(sync))
+        self.assertEqual(["Flintstones", "Rubbles", "Slates", "Gazoos"], [t.name for t in self.league.teams])
+        self.assertIs(rubbles.members[0], self.league.teams[3].members[0])
+        self.assertEqual([rubbles.members[0], wilma], self.league.teams[3].members)
+        self.assertEqual([("Wilma F", wilma)], sync.mismatched)
+        self.assertIn("! Wilma F is Wilma<wilma@bedrock.com>", str(sync))
+        self.assertEqual(f"Sync {self.file_name}", self.db.undo())
+        self.assertEqual([fred, wilma], flintstones.members)
+        self.assertEqual("Fred", fred.name)
+
+    def test_rejected_rows_change_nothing(self):
+        self.sync(("Flintstones", "Fred", "fred@bedrock.com"))
+        team = self.league.teams[0]
+        with self.assertRaises(InvalidBatch) as caught:
+            self.sync(("Flintstones", "Fred", "fred@bedrock.com"), ("Flintstones", "Freddy", "FRED@BEDROCK.COM"),
+                      ("Flintstones", "Dino", ""))
+        self.assertEqual(1, len(caught.exception.problems))
+        self.assertEqual(["Fred"], [m.name for m in team.members])
+        sync = self.sync(("Flintstones", "Fred", "fred@bedrock.com"), ("Flintstones", "Dino", ""))
+        self.assertEqual([("Flintstones", "Dino", None)], sync.inserted)
+        self.assertEqual("Dino<>", str(team.members[1]))
+        sync = self.sync(("Flintstones", "Fred", "fred@bedrock.com"), ("Flintstones", "DINO", ""))
+        self.assertEqual([], sync.inserted)
+        self.assertEqual("DINO", team.members[1].name)
+
+    def test_short_rows_are_rejected(self):
+        self.sync(("Flintstones", "Fred", "fred@bedrock.com"))
+        with self.assertRaises(InvalidBatch) as caught:
+            self.sync(("Flintstones", "Fred", "fred@bedrock.com"), ("Flintstones", "Wilma"),
+                      ("Flintstones", "Pebbles", "pebbles@bedrock.com"), ("Rubbles",))
+        self.assertEqual([["Flintstones", "Wilma"], ["Rubbles"]], [row for row, e in caught.exception.problems])
+        self.assertIn("Line 3 has 2 of the 3 columns", str(caught.exception))
+        self.assertEqual(["Fred"], [m.name for m in self.league.teams[0].members])
+        self.assertEqual(1, len(self.league.teams))
+
+
+if __name__ == '__main__':
+    unittest.main()
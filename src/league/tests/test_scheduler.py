@@ -0,0 +1,101 @@
+import unittest
+import datetime
+
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.scheduler import RoundRobinScheduler
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class RoundRobinSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        start = datetime.datetime(2024, 1, 6, 19, 0)
+        self.slots = [start + datetime.timedelta(days=7 * i) for i in range(20)]
+
+    def add_teams(self, n):
+        teams = []
+        for i in range(n):
+            team = Team(self.db.next_oid(), f"Team {i}")
+            team.add_member(TeamMember(self.db.next_oid(), f"Member {i}", f"m{i}@curl.org"))
+            self.league.add_team(team)
+            teams.append(team)
+        return teams
+
+    def assert_no_one_plays_twice_in_a_slot(self, competitions):
+        playing = {}
+        for c in competitions:
+            people = playing.setdefault(c.date_time, [])
+            for team in c.teams_competing:
+                self.assertNotIn(team, people)
+                for member in team.members:
+                    self.assertNotIn(member, people)
+            for team in c.teams_competing:
+                people.append(team)
+                people.extend(team.members)
+
+    def test_every_pair_meets_once(self):
+        teams = self.add_teams(6)
+        competitions = self.db.schedule_round_robin(self.league, ["Sheet A", "Sheet B", "Sheet C"], self.slots)
+        self.assertEqual(15, len(competitions))
+        self.assertEqual(competitions, self.league.competitions)
+        pairs = {frozenset(c.teams_competing) for c in competitions}
+        self.assertEqual(15, len(pairs))
+        for team in teams:
+            self.assertEqual(5, len(self.league.competitions_for_team(team)))
+        self.assertEqual(5, len({c.date_time for c in competitions}))
+        self.assert_no_one_plays_twice_in_a_slot(competitions)
+
+    def test_odd_number_of_teams_and_double_round(self):
+        self.add_teams(5)
+        scheduler = RoundRobinScheduler(self.league, ["Sheet A", "Sheet B"], self.slots, rounds=2)
+        draw = scheduler.pairings()
+        self.assertEqual(10, len(draw))
+        self.assertEqual(20, sum(len(games) for games in draw))
+        self.assertEqual(draw[0][0], tuple(reversed(draw[5][0])))
+        competitions = scheduler.schedule(self.db.next_oid)
+        self.assertEqual(20, len(competitions))
+        self.assert_no_one_plays_twice_in_a_slot(competitions)
+
+    def test_shared_members_never_play_twice_in_a_slot(self):
+        teams = self.add_teams(4)
+        shared = TeamMember(self.db.next_oid(), "Shared", "shared@curl.org")
+        teams[0].add_member(shared)
+        teams[1].add_member(shared)
+        scheduler = RoundRobinScheduler(self.league, ["Sheet A", "Sheet B"], self.slots)
+        self.assertTrue(scheduler.masks()[teams[0].oid] & scheduler.masks()[teams[1].oid])
+        competitions = scheduler.schedule(self.db.next_oid)
+        self.assertEqual(6, len(competitions))
+        for c in competitions:
+            others = [o for o in competitions if o is not c and o.date_time == c.date_time]
+            if teams[0] in c.teams_competing:
+                self.assertTrue(all(teams[1] not in o.teams_competing for o in others))
+
+    def test_games_longer_than_the_slot_spacing(self):
+        self.add_teams(4)
+        start = datetime.datetime(2024, 1, 6, 9, 0)
+        hourly = [start + datetime.timedelta(hours=i) for i in range(12)]
+        competitions = self.db.schedule_round_robin(self.league, ["Sheet A", "Sheet B"], hourly)
+        self.assertEqual(6, len(competitions))
+        self.assertEqual([], self.league.schedule_conflicts())
+        # two hour games every hour: a sheet is used every other slot
+        self.assertEqual([hourly[0], hourly[0], hourly[2], hourly[2], hourly[4], hourly[4]],
+                         [c.date_time for c in competitions])
+        scheduler = RoundRobinScheduler(self.league, ["Sheet A"], hourly, duration=datetime.timedelta(hours=1))
+        competitions = scheduler.schedule(self.db.next_oid)
+        self.assertEqual(hourly[:6], [c.date_time for c in competitions])
+        self.assertTrue(all(c.duration == datetime.timedelta(hours=1) for c in competitions))
+
+    def test_not_enough_slots(self):
+        self.add_teams(6)
+        with self.assertRaises(ValueError):
+            self.db.schedule_round_robin(self.league, ["Sheet A"], self.slots[:3])
+        self.assertEqual(0, len(self.league.competitions))
+        with self.assertRaises(ValueError):
+            RoundRobinScheduler(self.league, [], self.slots)
+
+
+if __name__ == '__main__':
+    unittest.main()
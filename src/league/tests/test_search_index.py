@@ -0,0 +1,86 @@
+import unittest
+import os.path
+
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class SearchIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        self.team = Team(self.db.next_oid(), "Flintstones")
+        self.fred = TeamMember(self.db.next_oid(), "Fred Flintstone", "fred@bedrock.com")
+        self.team.add_member(self.fred)
+        self.league.add_team(self.team)
+        self.db.add_league(self.league)
+
+    def test_prefix_search(self):
+        self.assertEqual([self.league], self.db.search("al st"))
+        self.assertEqual([self.fred, self.team], self.db.search("flint"))
+        self.assertEqual([self.fred], self.db.search("FRED@"))
+        self.assertEqual([self.league], self.db.search("curling"))
+        self.assertEqual([], self.db.search("barney"))
+        self.assertEqual([], self.db.search(""))
+
+    def test_limit(self):
+        self.assertEqual(1, len(self.db.search("f", limit=1)))
+        self.assertEqual(2, len(self.db.search("f")))
+
+    def test_additions_and_removals(self):
+        self.db.search("x")
+        barney = TeamMember(self.db.next_oid(), "Barney Rubble", "barney@bedrock.com")
+        self.team.add_member(barney)
+        self.assertEqual([barney], self.db.search("rubble"))
+        self.team.remove_member(barney)
+        self.assertEqual([], self.db.search("rubble"))
+        rubbles = Team(self.db.next_oid(), "Rubbles")
+        rubbles.add_member(barney)
+        self.league.add_team(rubbles)
+        self.assertEqual([barney, rubbles], self.db.search("rubble"))
+        self.league.remove_team(rubbles)
+        self.assertEqual([], self.db.search("rubble"))
+        self.db.remove_league(self.league)
+        self.assertEqual([], self.db.search("fred"))
+        self.assertEqual(0, len(self.db.search_index))
+
+    def test_renames(self):
+        self.db.search("x")
+        self.fred.name = "Frederick"
+        self.fred.email = "freddy@bedrock.com"
+        self.assertEqual([self.fred], self.db.search("frederick"))
+        self.assertEqual([self.fred], self.db.search("freddy@"))
+        self.assertEqual([], self.db.search("fred@"))
+        self.league.name = "Bedrock League"
+        self.assertEqual([self.league], self.db.search("bedrock l"))
+
+    def test_shared_member(self):
+        self.db.search("x")
+        other = Team(self.db.next_oid(), "Others")
+        other.add_member(self.fred)
+        self.league.add_team(other)
+        self.team.remove_member(self.fred)
+        self.assertEqual([self.fred], self.db.search("fred"))
+        other.remove_member(self.fred)
+        self.assertEqual([], self.db.search("fred"))
+
+    def test_bulk_build_and_load(self):
+        for i in range(100):
+            self.team.add_member(TeamMember(self.db.next_oid(), f"Member {i:03}", f"m{i:03}@bedrock.com"))
+        self.assertEqual(10, len(self.db.search("member 01")))
+        file_name = "search_test.dat"
+        self.db.save(file_name)
+        LeagueDatabase.load(file_name)
+        loaded = LeagueDatabase.instance()
+        self.assertEqual(10, len(loaded.search("m01")))
+        loaded.league_named("AL State Curling League").teams[0].members[0].name = "Wilma"
+        self.assertEqual(1, len(loaded.search("wilma")))
+        os.remove(file_name)
+        if os.path.isfile(file_name + ".backup"):
+            os.remove(file_name + ".backup")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from src.league.competition import Competition
+from src.league.league import League
+from src.league.season_statistics import SeasonStatistics
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class SeasonStatisticsTests(unittest.TestCase):
+    def setUp(self):
+        self.league = League(1, "AL State Curling League")
+        self.t1 = Team(1, "Flintstones")
+        self.t2 = Team(2, "Rubbles")
+        self.t3 = Team(3, "Slates")
+        self.fred = TeamMember(4, "Fred", "fred@bedrock.com")
+        self.t1.add_member(self.fred)
+        self.t3.add_member(self.fred)
+        for team in (self.t1, self.t2, self.t3):
+            self.league.add_team(team)
+        self.c1 = Competition(1, [self.t1, self.t2], "Sheet A")
+        self.c2 = Competition(2, [self.t2, self.t3], "Sheet B")
+        self.c3 = Competition(3, [self.t1, self.t3], "Sheet C")
+        self.c1.record_result([(1, 0), (0, 2), (3, 0)])
+        self.c2.record_result([(0, 1), (2, 0)], final_scores=(2, 1))
+        self.league.add_competitions([self.c1, self.c2, self.c3])
+        self.statistics = SeasonStatistics(self.league)
+
+    def tearDown(self):
+        self.statistics.close()
+
+    def test_team_and_member_win_percentage(self):
+        self.assertEqual({self.t1: (1, 0, 0), self.t2: (1, 1, 0), self.t3: (0, 1, 0)},
+                         self.statistics.team_records())
+        self.assertEqual({self.t1: 1.0, self.t2: 0.5, self.t3: 0.0}, self.statistics.team_win_percentage())
+        self.assertEqual(0.5, self.statistics.member_win_percentage()[self.fred])
+
+    def test_scoring_by_end(self):
+        counts = self.statistics.scoring_distribution()
+        self.assertEqual([[0, 2, 0, 0], [0, 0, 2, 0], [0, 0, 0, 1]], counts.tolist())
+        self.assertEqual([1.0, 2.0, 3.0], self.statistics.scoring_by_end().tolist())
+
+    def test_head_to_head(self):
+        teams, wins = self.statistics.head_to_head()
+        self.assertEqual(1, wins[teams.index(self.t1), teams.index(self.t2)])
+        self.assertEqual(0, wins[teams.index(self.t2), teams.index(self.t1)])
+        self.assertEqual(1, wins[teams.index(self.t2), teams.index(self.t3)])
+
+    def test_refreshed_incrementally(self):
+        self.c3.record_result([(2, 2)] + [(0, 0)] * 9 + [(1, 0)])
+        self.c1.record_result([(0, 1)])
+        self.league.remove_competition(self.c2)
+        self.assertEqual({self.t1: (1, 1, 0), self.t2: (1, 0, 0), self.t3: (0, 1, 0)},
+                         self.statistics.team_records())
+        self.assertEqual(11, self.statistics.scoring_distribution().shape[0])
+        extra = [Competition(10 + i, [self.t3, self.t2], "Sheet D") for i in range(40)]
+        for c in extra:
+            c.record_result([(3, 1)])
+        self.league.add_competitions(extra)
+        self.assertEqual((40, 1, 0), self.statistics.team_records()[self.t3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.similarity_index import MemberSimilarityIndex
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class MemberSimilarityIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        self.t1 = Team(self.db.next_oid(), "Flintstones")
+        self.t2 = Team(self.db.next_oid(), "Rubbles")
+        self.jon = TeamMember(self.db.next_oid(), "Jon Smith", "jsmith@bedrock.com")
+        self.john = TeamMember(self.db.next_oid(), "John Smith", "john.smith@quarry.com")
+        self.fred = TeamMember(self.db.next_oid(), "Fred Flintstone", "fred@bedrock.com")
+        self.freddy = TeamMember(self.db.next_oid(), "Freddy F", "FRED@bedrock.com")
+        self.barney = TeamMember(self.db.next_oid(), "Barney Rubble", "barney@bedrock.com")
+        self.t1.add_member(self.jon)
+        self.t1.add_member(self.fred)
+        self.t2.add_member(self.john)
+        self.t2.add_member(self.freddy)
+        self.t2.add_member(self.barney)
+        self.league.add_team(self.t1)
+        self.league.add_team(self.t2)
+        self.db.add_league(self.league)
+
+    def test_trigrams(self):
+        self.assertEqual(MemberSimilarityIndex.trigrams("Ab"), MemberSimilarityIndex.trigrams(" ab "))
+        self.assertEqual(frozenset(), MemberSimilarityIndex.trigrams(None))
+
+    def test_similar_members(self):
+        results = self.db.similar_members(name="John Smith", k=2)
+        self.assertEqual(2, len(results))
+        self.assertEqual(self.john, results[0][1])
+        self.assertEqual(1.0, results[0][0])
+        self.assertEqual(self.jon, results[1][1])
+        self.assertEqual([], self.db.similar_members(name="Zzzz"))
+
+    def test_similar_to(self):
+        index = self.db.similarity_index
+        (score, member), = index.similar_to(self.fred, k=1)
+        self.assertEqual(self.freddy, member)
+        self.assertEqual(1.0, score)
+
+    def test_probable_duplicates(self):
+        duplicates = self.db.probable_duplicates(self.league)
+        pairs = [{a, b} for score, a, b in duplicates]
+        self.assertEqual([{self.fred, self.freddy}, {self.jon, self.john}], pairs)
+        self.assertEqual(1.0, duplicates[0][0])
+        typo = TeamMember(self.db.next_oid(), "B. Rubble", "barnie@bedrock.com")
+        self.t1.add_member(typo)
+        pairs = [{a, b} for score, a, b in self.db.probable_duplicates(self.league)]
+        self.assertIn({self.barney, typo}, pairs)
+        self.assertEqual(1, len(self.db.probable_duplicates(self.league, min_score=0.99)))
+
+    def test_deletion_keys(self):
+        self.assertEqual({"ab", "a", "b"}, MemberSimilarityIndex.deletion_keys(" AB "))
+        self.assertEqual(set(), MemberSimilarityIndex.deletion_keys(""))
+        self.assertTrue(MemberSimilarityIndex.deletion_keys("Jon Smith") &
+                        MemberSimilarityIndex.deletion_keys("john smith"))
+
+    def test_kept_up_to_date(self):
+        index = self.db.similarity_index
+        self.assertEqual(5, len(index))
+        self.t2.remove_member(self.john)
+        self.assertNotIn(self.john, [m for s, m in index.similar(name="John Smith")])
+        self.jon.name = "Wilma"
+        self.assertEqual(self.jon, index.similar(name="wilma", k=1)[0][1])
+        self.db.remove_league(self.league)
+        self.assertEqual(0, len(index))
+
+    def test_common_trigrams_are_not_candidates(self):
+        members = [TeamMember(i, f"Member {i}", f"m{i}@example.com") for i in range(50)]
+        index = MemberSimilarityIndex.for_members(members, max_posting=10)
+        self.assertEqual([], index.similar(email="zz@example.com"))
+        self.assertEqual(members[7], index.similar(email="m7@example.com", k=1)[0][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from src.league.competition import Competition
+from src.league.league import League
+from src.league.team import Team
+
+
+class StandingsTests(unittest.TestCase):
+    def setUp(self):
+        self.league = League(1, "AL State Curling League")
+        self.t1 = Team(1, "Flintstones")
+        self.t2 = Team(2, "Rubbles")
+        self.t3 = Team(3, "Slates")
+        for team in (self.t1, self.t2, self.t3):
+            self.league.add_team(team)
+        self.c1 = Competition(1, [self.t1, self.t2], "Sheet A")
+        self.c2 = Competition(2, [self.t2, self.t3], "Sheet B")
+        self.c3 = Competition(3, [self.t1, self.t3], "Sheet C")
+        self.league.add_competitions([self.c1, self.c2, self.c3])
+
+    def test_record_result(self):
+        self.c1.record_result([(1, 0), (0, 2), (3, 0)])
+        self.assertEqual((4, 2), self.c1.final_scores)
+        self.assertEqual(self.t1, self.c1.winner())
+        self.c2.record_result([(1, 0)], final_scores=(0, 0))
+        self.assertIsNone(self.c2.winner())
+        self.assertIsNone(self.c3.winner())
+        self.assertFalse(self.c3.has_result)
+        with self.assertRaises(ValueError):
+            self.c3.record_result([(1, 0, 2)])
+        with self.assertRaises(ValueError):
+            self.c3.record_result([(1, -1)])
+        self.assertFalse(self.c3.has_result)
+
+    def test_standings_table(self):
+        self.c1.record_result([(1, 0), (0, 2), (3, 0)])
+        self.c2.record_result([(2, 0), (0, 1)])
+        table = self.league.standings_table()
+        self.assertEqual([self.t1, self.t2, self.t3], [r.team for r in table])
+        self.assertEqual("Flintstones: 1-0-0, 4-2", str(table[0]))
+        self.assertEqual((1, 1, 0, 4, 5, 2), (table[1].wins, table[1].losses, table[1].ties,
+                                              table[1].points_for, table[1].points_against,
+                                              table[1].ends_won))
+        self.assertEqual(0, table[2].wins)
+
+    def test_standings_follow_corrections(self):
+        standings = self.league.standings
+        self.c1.record_result([(5, 0)])
+        self.assertEqual(1, standings.record(self.t1).wins)
+        self.c1.record_result([(0, 5)])
+        self.assertEqual(0, standings.record(self.t1).wins)
+        self.assertEqual(1, standings.record(self.t1).losses)
+        self.assertEqual(1, standings.record(self.t2).wins)
+        self.assertEqual(5, standings.record(self.t2).points_for)
+        self.c1.clear_result()
+        self.assertEqual(0, standings.record(self.t2).games)
+        self.c3.record_result([(2, 2)])
+        self.assertEqual(1, standings.record(self.t3).ties)
+        self.league.remove_competition(self.c3)
+        self.assertEqual(0, standings.record(self.t3).ties)
+        c4 = Competition(4, [self.t3, self.t1], "Sheet D")
+        c4.record_result([(7, 1)])
+        self.league.add_competition(c4)
+        self.assertEqual(self.t3, self.league.standings_table()[0].team)
+
+
+if __name__ == '__main__':
+    unittest.main()
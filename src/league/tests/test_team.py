@@ -58,3 +58,15 @@ class TeamTests(unittest.TestCase):
         self.assertEqual(2, len(fe.recipients))
         self.assertEqual("S", fe.subject)
         self.assertEqual("M", fe.message)
+
+    def test_label(self):
+        t = Team(1, "Flintstones")
+        tm1 = TeamMember(5, "Fred", "fred@bedrock.com")
+        self.assertEqual("Flintstones: 0 members", t.label)
+        self.assertIs(t.label, t.label)
+        t.add_member(tm1)
+        self.assertEqual("Flintstones: 1 members", t.label)
+        t.name = "Flintstones 2"
+        self.assertEqual("Fred<fred@bedrock.com>", tm1.label)
+        tm1.email = "fred@slaterock.com"
+        self.assertEqual(["Flintstones 2: 1 members", "Fred<fred@slaterock.com>"], [t.label, tm1.label])
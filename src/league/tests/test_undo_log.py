@@ -0,0 +1,109 @@
+import unittest
+
+from src.league.competition import Competition
+from src.league.exception_duplicate_email import DuplicateEmail
+from src.league.league import League
+from src.league.league_database import LeagueDatabase
+from src.league.team import Team
+from src.league.team_member import TeamMember
+
+
+class UndoLogTests(unittest.TestCase):
+    def setUp(self):
+        self.db = LeagueDatabase()
+        self.league = League(self.db.next_oid(), "AL State Curling League")
+        self.team = Team(self.db.next_oid(), "Flintstones")
+        self.other = Team(self.db.next_oid(), "Rubbles")
+        self.fred = TeamMember(self.db.next_oid(), "Fred", "fred@bedrock.com")
+        self.barney = TeamMember(self.db.next_oid(), "Barney", "barney@bedrock.com")
+        self.db.add_league(self.league)
+        self.league.add_team(self.team)
+        self.league.add_team(self.other)
+        self.team.add_member(self.fred)
+        self.team.add_member(self.barney)
+        self.other.add_member(self.fred)
+
+    def test_undo_redo_edits(self):
+        self.fred.name = "Freddy"
+        with self.db.command("Edit member"):
+            self.barney.name = "Barney Rubble"
+            self.barney.email = "rubble@bedrock.com"
+        self.assertEqual("Edit member", self.db.undo())
+        self.assertEqual(("Barney", "barney@bedrock.com"), (self.barney.name, self.barney.email))
+        self.assertEqual("name", self.db.undo())
+        self.assertEqual("Fred", self.fred.name)
+        self.assertEqual("name", self.db.redo())
+        self.assertEqual("Freddy", self.fred.name)
+        self.assertEqual("Edit member", self.db.redo())
+        self.assertEqual("Barney Rubble", self.barney.name)
+        self.assertIsNone(self.db.redo())
+        self.db.undo()
+        self.fred.email = "freddy@bedrock.com"
+        self.assertFalse(self.db.undo_log.can_redo())
+
+    def test_undo_removals_in_place(self):
+        self.team.remove_member(self.fred)
+        self.league.remove_team(self.team)
+        self.db.remove_league(self.league)
+        self.db.undo()
+        self.db.undo()
+        self.db.undo()
+        self.assertEqual([self.league], self.db.leagues)
+        self.assertEqual([self.team, self.other], self.league.teams)
+        self.assertEqual([self.fred, self.barney], self.team.members)
+        self.assertEqual([self.fred], self.db.search("fred"))
+        self.db.redo()
+        self.assertEqual([self.barney], self.team.members)
+
+    def test_undo_competitions(self):
+        competitions = [Competition(self.db.next_oid(), [self.team, self.other], "Sheet A") for i in range(3)]
+        self.league.add_competitions(competitions)
+        competitions[0].record_result([(2, 1)])
+        competitions[1].location = "Sheet B"
+        self.db.undo()
+        self.db.undo()
+        self.assertEqual("Sheet A", competitions[1].location)
+        self.assertFalse(competitions[0].has_result)
+        self.db.undo()
+        self.assertEqual([], self.league.competitions)
+        self.db.redo()
+        self.assertEqual(competitions, self.league.competitions)
+
+    def test_refused_undo_is_rolled_back(self):
+        with self.db.command("Replace Barney"):
+            self.team.remove_member(self.barney)
+            self.fred.name = "Freddy"
+        # a change made without events, the log does not know about it
+        self.team.members.append(TeamMember(self.db.next_oid(), "Impostor", "BARNEY@bedrock.com"))
+        with self.assertRaises(DuplicateEmail):
+            self.db.undo()
+        self.assertEqual("Freddy", self.fred.name)
+        self.assertNotIn(self.barney, self.team.members)
+        self.assertEqual("Replace Barney", self.db.undo_log.undo_name())
+
+    def test_undo_takes_out_the_object_added(self):
+        wilma = TeamMember(self.db.next_oid(), "Wilma", "wilma@bedrock.com")
+        self.team.add_member(wilma)
+        # an equal copy put first without an event, the undo must not take it instead
+        copy = TeamMember(wilma.oid, "Wilma copy", None)
+        self.team.members.insert(0, copy)
+        self.db.undo()
+        self.assertEqual([copy, self.fred, self.barney], self.team.members)
+        self.team.members.remove(copy)
+        self.db.redo()
+        self.assertIs(wilma, self.team.members[2])
+        self.team.remove_member(self.fred)
+        self.db.undo()
+        self.assertEqual([self.fred, self.barney, wilma], self.team.members)
+
+    def test_history_size(self):
+        self.db.undo_log.history_size = 3
+        for i in range(10):
+            self.fred.name = f"Fred {i}"
+        while self.db.undo():
+            pass
+        self.assertEqual("Fred 6", self.fred.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
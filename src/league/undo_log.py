@@ -0,0 +1,173 @@
+from collections import deque
+from contextlib import contextmanager
+
+
+class UndoLog:
+    """Undo and redo for a LeagueDatabase, built from the change events the model sends.
+    Every event already says how to reverse it (the old name, the member that was added,
+    the place a team was removed from...), so a command is kept as the list of its
+    (source, event, details) and no object is copied.
+    Undoing a command reverses its events, newest first, and the events this sends become
+    the command to redo; redo works the same way back. An object added or removed is taken
+    out of or put back in its list at the index its event recorded, one list operation,
+    and a batch (add_members, remove_teams...) is reversed by one batch call and one
+    event, so each step costs the number of events of the command, whatever the size
+    of the database. Only the last history_size commands are kept."""
+
+    EVENTS = ("name", "email", "location", "date_time", "duration", "result",
+              "member_added", "members_added", "member_removed", "members_removed",
+              "team_added", "teams_added", "team_removed", "teams_removed",
+              "competition_added", "competition_removed", "competitions_added", "competitions_removed",
+              "league_added", "league_removed")
+    """the events the log knows how to reverse, the others are not recorded"""
+
+    def __init__(self, history_size=100):
+        self._undo = deque(maxlen=history_size)
+        """(name, events) of the commands that can be undone, the last one on the right"""
+        self._redo = deque(maxlen=history_size)
+        """(name, events) of the commands that can be redone, the next one on the right"""
+        self._command = None
+        """(name, events) of the command being recorded by command()"""
+        self._replaying = None
+        """events sent while undoing or redoing a command"""
+
+    @property
+    def history_size(self):
+        """how many commands can be undone"""
+        return self._undo.maxlen
+
+    @history_size.setter
+    def history_size(self, history_size):
+        self._undo = deque(self._undo, maxlen=history_size)
+        self._redo = deque(self._redo, maxlen=history_size)
+
+    def can_undo(self):
+        return len(self._undo) > 0
+
+    def can_redo(self):
+        return len(self._redo) > 0
+
+    def undo_name(self):
+        """name of the command undo() would reverse, or None"""
+        return self._undo[-1][0] if self._undo else None
+
+    def redo_name(self):
+        """name of the command redo() would apply again, or None"""
+        return self._redo[-1][0] if self._redo else None
+
+    def clear(self):
+        """forget every command"""
+        self._undo.clear()
+        self._redo.clear()
+
+    @contextmanager
+    def command(self, name):
+        """with log.command("Edit member"): ... records the changes made in the block as
+        one command, undone and redone in one step. A command inside another one is part
+        of the outer command."""
+        if self._command is not None:
+            yield
+            return
+        self._command = (name, [])
+        try:
+            yield
+        finally:
+            command, self._command = self._command, None
+            if command[1]:
+                self._undo.append(command)
+                self._redo.clear()
+
+    def object_changed(self, source, event, details):
+        """record a change. A change outside command() is a command of its own.
+        A change to an object held by several containers reaches the log once per
+        container, with the same details, and is recorded once."""
+        if event not in self.EVENTS:
+            return
+        if self._replaying is not None:
+            events = self._replaying
+        elif self._command is not None:
+            events = self._command[1]
+        elif self._undo and self._undo[-1][1][-1][2] is details:
+            return
+        else:
+            self._undo.append((event.replace("_", " "), []))
+            self._redo.clear()
+            events = self._undo[-1][1]
+        if events and events[-1][2] is details:
+            return
+        events.append((source, event, details))
+
+    def undo(self):
+        """reverse the last command and return its name, or None if there is nothing to undo"""
+        if not self._undo:
+            return None
+        name, events = self._undo.pop()
+        self._redo.append((name, self._reverse_all(events, self._undo, name)))
+        return name
+
+    def redo(self):
+        """apply the last undone command again and return its name, or None if there is nothing to redo"""
+        if not self._redo:
+            return None
+        name, events = self._redo.pop()
+        self._undo.append((name, self._reverse_all(events, self._redo, name)))
+        return name
+
+    def _reverse_all(self, events, origin, name):
+        """reverse events newest first and return the events that sent. If a change is
+        refused, the ones already reversed are put back, the command goes back on origin
+        and the exception is raised."""
+        self._replaying = []
+        try:
+            for source, event, details in reversed(events):
+                self._reverse(source, event, details)
+        except Exception:
+            done, self._replaying = self._replaying, []
+            for source, event, details in reversed(done):
+                self._reverse(source, event, details)
+            origin.append((name, events))
+            raise
+        finally:
+            replayed, self._replaying = self._replaying, None
+        return replayed
+
+    def _reverse(self, source, event, details):
+        """make the change that reverses event. The events say where in its list an
+        object was added or removed, so it is taken out or put back there, not
+        searched for."""
+        if event in ("name", "email", "location", "date_time", "duration"):
+            setattr(source, event, details["old"])
+        elif event == "result":
+            end_scores, final_scores = details["old"]
+            if final_scores is None:
+                source.clear_result()
+            else:
+                source.record_result(end_scores, final_scores)
+        elif event == "member_added":
+            source.remove_member(details["member"], details["index"])
+        elif event == "members_added":
+            source.remove_members(details["members"], details["indexes"])
+        elif event == "members_removed":
+            source.add_members(details["members"], details["indexes"])
+        elif event == "member_removed":
+            source.add_member(details["member"], details["index"])
+        elif event == "team_added":
+            source.remove_team(details["team"], details["index"])
+        elif event == "teams_added":
+            source.remove_teams(details["teams"], details["indexes"])
+        elif event == "teams_removed":
+            source.add_teams(details["teams"], details["indexes"])
+        elif event == "team_removed":
+            source.add_team(details["team"], details["index"])
+        elif event == "competition_added":
+            source.remove_competition(details["competition"], details["index"])
+        elif event == "competition_removed":
+            source.add_competition(details["competition"], details["index"])
+        elif event == "competitions_added":
+            source.remove_competitions(details["competitions"], details["indexes"])
+        elif event == "competitions_removed":
+            source.add_competitions(details["competitions"], details["indexes"])
+        elif event == "league_added":
+            source.remove_league(details["league"], details["index"])
+        elif event == "league_removed":
+            source.add_league(details["league"], details["index"])
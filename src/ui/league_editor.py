@@ -1,6 +1,8 @@
 from PyQt5 import uic
 from PyQt5.QtWidgets import QFileDialog, QMessageBox
+from src.league.exception_invalid_batch import InvalidBatch
 from src.league.league import League
+from src.ui.object_list_model import ObjectListModel
 from src.ui.team_editor import TeamEditorDialog
 
 Ui_MainWindow, QtBaseWindow = uic.loadUiType("ui/league_editor.ui")
@@ -25,6 +27,8 @@ class LeagueEditorDialog(QtBaseWindow, Ui_MainWindow):
         else:
             self.league = League(oid, f"League {oid}")
             self.database.add_league(self.league)
+        self.league_editor_list_model = ObjectListModel(self.league.teams, self)
+        self.league_editor_list_view.setModel(self.league_editor_list_model)
         self.update_ui()
         # Connections to signal begin here:
         self.add_team_button.clicked.connect(self.add_button_clicked)
@@ -33,7 +37,9 @@ class LeagueEditorDialog(QtBaseWindow, Ui_MainWindow):
         self.import_button.clicked.connect(self.import_button_clicked)
         self.export_button.clicked.connect(self.export_button_clicked)
         self.buttonBox.accepted.connect(self.button_box_accepted)
-        self.league_editor_list_widget.currentRowChanged.connect(self.editor_list_selection_changed)
+        self.league_editor_list_view.selectionModel().currentChanged.connect(self.editor_list_selection_changed)
+        self.team_filter_line_edit.textChanged.connect(self.team_filter_changed)
+        self.team_sort_check_box.toggled.connect(self.team_sort_toggled)
         self.rejected.connect(self.league_rejected)
 
     def league_rejected(self):
@@ -41,37 +47,44 @@ class LeagueEditorDialog(QtBaseWindow, Ui_MainWindow):
         self.database.remove_league(self.league)
 
     def editor_list_selection_changed(self):
-        """Sets the text for the line edit if the list widget selection changes."""
-        current_row = self.league_editor_list_widget.currentRow()
-        if current_row != -1:
-            team = self.league.teams[current_row]
+        """Sets the text for the line edit if the list view selection changes."""
+        team = self.league_editor_list_model.object_at(self.league_editor_list_selected_row())
+        if team is not None:
             self.team_name_line_edit.setText(team.name)
 
+    def team_filter_changed(self, text):
+        """Shows only the teams matching the filter line edit."""
+        self.league_editor_list_model.set_filter(text)
+
+    def team_sort_toggled(self, checked):
+        """Sorts the teams by name, or shows them in the league's order."""
+        if checked:
+            self.league_editor_list_model.sort()
+        else:
+            self.league_editor_list_model.unsort()
+
     def warn(self, title, message):
         """Creates a pop-up box warning about the title and message provided as arguments."""
         mb = QMessageBox(QMessageBox.Icon.NoIcon, title, message, QMessageBox.StandardButton.Ok)
         return mb.exec()
 
     def update_ui(self):
-        """Updates the list widget with the league_database."""
-        row = self.league_editor_list_selected_row()
-        self.league_editor_list_widget.clear()
-        for team in self.league.teams:
-            self.league_editor_list_widget.addItem(str(team))
-        if row != -1 and len(self.league.teams) > row:
-            self.league_editor_list_widget.setCurrentItem(self.league_editor_list_widget.item(row))
+        """Updates the list view with the league's teams, keeping the selected team selected.
+        Only the rows scrolled into view are fetched, see ObjectListModel."""
+        team = self.league_editor_list_model.object_at(self.league_editor_list_selected_row())
+        self.league_editor_list_model.refresh()
+        if team is not None:
+            index = self.league_editor_list_model.index_of(team)
+            if index.isValid():
+                self.league_editor_list_view.setCurrentIndex(index)
 
     def league_editor_list_selected_row(self):
-        """Finds and returns the item selected in the list widget. If none, returns -1."""
-        selection = self.league_editor_list_widget.selectedItems()
+        """Finds and returns the row selected in the list view. If none, returns -1."""
+        selection = self.league_editor_list_view.selectionModel().selectedIndexes()
         if len(selection) == 0:
             return -1
         assert len(selection) == 1
-        selected_item = selection[0]
-        for i, c in enumerate(self.league.teams):
-            if str(c) == selected_item.text():
-                return i
-        return -1
+        return selection[0].row()
 
     def add_button_clicked(self):
         """If the add button is clicked, pops up a Team Editor Dialog window."""
@@ -92,7 +105,10 @@ class LeagueEditorDialog(QtBaseWindow, Ui_MainWindow):
                              "Are you sure you want to remove this team?",
                              QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if dialog.exec() == QMessageBox.StandardButton.Yes:
-            del self.league.teams[row]
+            try:
+                self.league.remove_team(self.league_editor_list_model.object_at(row))
+            except ValueError:
+                return self.warn("Team in competition", "This team is in one of the league's competitions.")
             self.update_ui()
             self.team_name_line_edit.clear()
 
@@ -107,17 +123,54 @@ class LeagueEditorDialog(QtBaseWindow, Ui_MainWindow):
         if name == "":
             return self.warn("Info Missing", "You must fill in the team name to select the team.")
         else:
-            dialog = TeamEditorDialog(team_title=name, team=self.league.teams[row], db=self.database, league=self.league)
+            dialog = TeamEditorDialog(team_title=name, team=self.league_editor_list_model.object_at(row), db=self.database, league=self.league)
             dialog.exec()
             self.team_name_line_edit.clear()
         self.update_ui()
 
     def import_button_clicked(self):
-        """Imports a team from a .csv file. A pop-up FileDialog window gets the filename from the user."""
+        """Imports the teams of a .csv file. A pop-up FileDialog window gets the filename from the user.
+        When the league already has teams, asks whether to add the file's rows or to sync the
+        listed teams with it (see LeagueDatabase.sync_league_teams), which removes the members
+        missing from the file; the changes a sync made are listed in a pop-up.
+        Rows that would be rejected are listed in a warning and nothing is imported."""
         fd = QFileDialog()
-        if fd.exec() == QFileDialog.DialogCode.Accepted:
-            self.database.import_league_teams(self.league, fd.selectedFiles()[0])
-            self.update_ui()
+        if fd.exec() != QFileDialog.DialogCode.Accepted:
+            return
+        file_name = fd.selectedFiles()[0]
+        sync = False
+        if self.league.teams:
+            dialog = QMessageBox(QMessageBox.Icon.Question, "Import or sync?",
+                                 "Add the rows of the file to the league, or sync the teams listed in it "
+                                 "with the file? Syncing updates the members of those teams and removes "
+                                 "the ones missing from the file.")
+            add_button = dialog.addButton("Add", QMessageBox.ButtonRole.AcceptRole)
+            sync_button = dialog.addButton("Sync", QMessageBox.ButtonRole.DestructiveRole)
+            dialog.addButton(QMessageBox.StandardButton.Cancel)
+            dialog.exec()
+            if dialog.clickedButton() not in (add_button, sync_button):
+                return
+            sync = dialog.clickedButton() is sync_button
+        try:
+            if sync:
+                changes = self.database.sync_league_teams(self.league, file_name)
+            else:
+                mismatches = []
+                self.database.import_league_teams(self.league, file_name, mismatches)
+        except InvalidBatch as e:
+            shown = "\n".join(str(problem) for item, problem in e.problems[:20])
+            more = f"\nand {len(e.problems) - 20} more." if len(e.problems) > 20 else ""
+            return self.warn("Rows rejected", f"Nothing was imported. {len(e.problems)} row(s) were rejected:\n"
+                                              f"{shown}{more}")
+        self.update_ui()
+        if not sync and mismatches:
+            shown = "\n".join(f"{name} is {member.name}<{member.email}>" for name, member in mismatches[:20])
+            self.warn("Existing persons", "These rows have the email of a person already in the database, "
+                                          f"who was added under their own name:\n{shown}")
+        if sync and changes is not None:
+            mb = QMessageBox(QMessageBox.Icon.NoIcon, "League Synced", str(changes) or "No changes.",
+                             QMessageBox.StandardButton.Ok)
+            mb.exec()
 
     def export_button_clicked(self):
         """Exports or saves a team to a .csv file. A pop-up FileDialog window asks where to save the file."""
@@ -129,10 +182,11 @@ class LeagueEditorDialog(QtBaseWindow, Ui_MainWindow):
             mb.exec()
 
     def button_box_accepted(self):
-        """If the league is finalized, the league is saved to the database
-        with the team name listed in the line edit."""
-        self.database.remove_league(self.league)
-        name = self.league_name_line_edit.text()
-        if name:
-            self.league.name = name
-        self.database.add_league(self.league)
+        """If the league is finalized, it is renamed in place with the name listed in the
+        line edit, and added to the database if it is not in it."""
+        with self.database.command(f"Edit league {self.league.name}"):
+            name = self.league_name_line_edit.text()
+            if name and name != self.league.name:
+                self.league.name = name
+            if self.league not in self.database.leagues:
+                self.database.add_league(self.league)
@@ -1,11 +1,17 @@
 from PyQt5 import uic
 from PyQt5.QtWidgets import QMessageBox, QFileDialog
 
+from src.league.instrumentation import Instrumentation
+from src.league.league import League
 from src.league.league_database import LeagueDatabase
+from src.league.team import Team
 from src.ui.league_editor import LeagueEditorDialog
 
 Ui_MainWindow, QtBaseWindow = uic.loadUiType("ui/main_window.ui")
 
+SEARCH_RESULT_LIMIT = 50
+"""Most results shown in the search list, keeps typing responsive on big databases."""
+
 
 class MainWindow(QtBaseWindow, Ui_MainWindow):
     def __init__(self, parent=None):
@@ -13,6 +19,7 @@ class MainWindow(QtBaseWindow, Ui_MainWindow):
         super().__init__(parent)
         self.setupUi(self)
         self.db = LeagueDatabase.instance()
+        self.file_name = None
         # name of button . what signal? . connect to a (slot)
         self.update_ui()
         self.add_league_button.clicked.connect(self.add_button_clicked)
@@ -20,7 +27,45 @@ class MainWindow(QtBaseWindow, Ui_MainWindow):
         self.edit_league_button.clicked.connect(self.edit_button_clicked)
         self.action_load.triggered.connect(self.action_load_triggered)
         self.action_save.triggered.connect(self.action_save_triggered)
+        self.action_undo.triggered.connect(self.action_undo_triggered)
+        self.action_redo.triggered.connect(self.action_redo_triggered)
+        self.action_record_timings.setChecked(Instrumentation.enabled)
+        self.action_record_timings.toggled.connect(Instrumentation.enable)
+        self.action_show_timings.triggered.connect(self.action_show_timings_triggered)
         self.main_list_widget.currentRowChanged.connect(self.main_list_selection_changed)
+        self.search_results_list_widget.hide()
+        self.search_results = []
+        self.search_line_edit.textChanged.connect(self.search_text_changed)
+        self.search_results_list_widget.itemActivated.connect(self.search_result_activated)
+
+    def search_text_changed(self, text):
+        """Shows the leagues, teams and members matching the typed prefix."""
+        self.search_results_list_widget.clear()
+        if text.strip() == "":
+            self.search_results = []
+            self.search_results_list_widget.hide()
+            return
+        self.search_results = self.db.search(text.strip(), SEARCH_RESULT_LIMIT)
+        for result in self.search_results:
+            if isinstance(result, League):
+                self.search_results_list_widget.addItem(f"League {result.name}")
+            elif isinstance(result, Team):
+                self.search_results_list_widget.addItem(f"Team {result.label}")
+            else:
+                self.search_results_list_widget.addItem(f"Member {result.label}")
+        self.search_results_list_widget.show()
+
+    def search_result_activated(self):
+        """Selects the league of the activated search result in the main list."""
+        row = self.search_results_list_widget.currentRow()
+        if row == -1:
+            return
+        result = self.search_results[row]
+        for i, league in enumerate(self.db.leagues):
+            if league == result or result in league.teams or \
+                    any(result in team.members for team in league.teams):
+                self.main_list_widget.setCurrentRow(i)
+                return
 
     def main_list_selection_changed(self):
         """Called when the main list widget selection is changed.
@@ -40,7 +85,7 @@ class MainWindow(QtBaseWindow, Ui_MainWindow):
         row = self.main_list_selected_row()
         self.main_list_widget.clear()
         for league in self.db.leagues:
-            self.main_list_widget.addItem(str(league))
+            self.main_list_widget.addItem(league.label)
         if row != -1 and len(self.db.leagues) > row:
             self.main_list_widget.setCurrentItem(self.main_list_widget.item(row))
 
@@ -51,10 +96,7 @@ class MainWindow(QtBaseWindow, Ui_MainWindow):
             return -1
         assert len(selection) == 1
         selected_item = selection[0]
-        for i, c in enumerate(self.db.leagues):
-            if str(c) == selected_item.text():
-                return i
-        return -1
+        return self.main_list_widget.row(selected_item)
 
     def add_button_clicked(self):
         """If the add button is clicked, pops up a League Editor Dialog window."""
@@ -91,7 +133,7 @@ class MainWindow(QtBaseWindow, Ui_MainWindow):
                              "Are you sure you want to remove this league?",
                              QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if dialog.exec() == QMessageBox.StandardButton.Yes:
-            del self.db.leagues[row]
+            self.db.remove_league(self.db.leagues[row])
             self.update_ui()
             self.league_line_edit.clear()
 
@@ -101,16 +143,59 @@ class MainWindow(QtBaseWindow, Ui_MainWindow):
         if fd.exec() == QFileDialog.DialogCode.Accepted:
             self.db.load(fd.selectedFiles()[0])
             self.db = self.db.instance()
+            self.file_name = fd.selectedFiles()[0]
             self.update_ui()
+            self.search_text_changed(self.search_line_edit.text())
 
     def action_save_triggered(self):
         """Uses save method of LeagueDatabase class to pickle current database into .dat file."""
         (filename, filter_str) = QFileDialog.getSaveFileName(self, "Save File", filter="Data File (*.dat)")
         if filename:
             self.db.save(filename)
+            self.file_name = filename
             mb = QMessageBox(QMessageBox.Icon.NoIcon, "File Saved",
                              f"These leagues has been saved in a file at {filename}", QMessageBox.StandardButton.Ok)
             mb.exec()
 
+    def action_undo_triggered(self):
+        """Reverses the last change made to the leagues."""
+        name = self.db.undo()
+        if name is not None:
+            self.statusbar.showMessage(f"Undone: {name}", 3000)
+            self.update_ui()
 
+    def action_redo_triggered(self):
+        """Makes the last undone change again."""
+        name = self.db.redo()
+        if name is not None:
+            self.statusbar.showMessage(f"Redone: {name}", 3000)
+            self.update_ui()
 
+    def action_show_timings_triggered(self):
+        """Shows the counts, times and bytes recorded for the instrumented operations."""
+        if not Instrumentation.instance().snapshot():
+            return self.warn("No timings", "Nothing was recorded yet. Turn on Tools > Record Timings first.")
+        mb = QMessageBox(QMessageBox.Icon.NoIcon, "Timings",
+                         f"<pre>{Instrumentation.instance().report()}</pre>", QMessageBox.StandardButton.Ok)
+        mb.exec()
+
+    def closeEvent(self, event):
+        """Asks whether to save the leagues changed since the last save or load before closing."""
+        if not self.db.has_unsaved_changes():
+            return event.accept()
+        names = "\n".join(league.name for league in self.db.unsaved_leagues())
+        message = f"These leagues have unsaved changes:\n{names}" if names else "Leagues were added or removed."
+        dialog = QMessageBox(QMessageBox.Icon.Question, "Save changes?", message + "\nSave them before closing?",
+                             QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard |
+                             QMessageBox.StandardButton.Cancel)
+        answer = dialog.exec()
+        if answer == QMessageBox.StandardButton.Cancel:
+            return event.ignore()
+        if answer == QMessageBox.StandardButton.Save:
+            if self.file_name is None:
+                self.action_save_triggered()
+            else:
+                self.db.save(self.file_name)
+            if self.db.has_unsaved_changes():
+                return event.ignore()
+        event.accept()
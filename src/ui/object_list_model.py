@@ -0,0 +1,76 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from src.league.object_pager import ObjectPager
+
+
+class ObjectListModel(QAbstractListModel):
+    """A list model over team.members or league.teams for a QListView, showing each
+    object's label. Rows are fetched a page at a time as the view scrolls
+    (canFetchMore/fetchMore), and filtering and sorting are done here over the
+    objects (see ObjectPager), so the view never holds an item per member."""
+
+    def __init__(self, objects, parent=None):
+        super().__init__(parent)
+        self.pager = ObjectPager(objects)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.pager.fetched
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.pager.fetched:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.pager[index.row()].label
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.pager.can_fetch_more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        first = self.pager.fetched
+        last = min(len(self.pager), first + self.pager.page) - 1
+        if last < first:
+            return
+        self.beginInsertRows(QModelIndex(), first, last)
+        self.pager.fetch_more()
+        self.endInsertRows()
+
+    def sort(self, column=0, order=Qt.SortOrder.AscendingOrder):
+        self.beginResetModel()
+        self.pager.sort(reverse=order == Qt.SortOrder.DescendingOrder)
+        self.endResetModel()
+
+    def unsort(self):
+        """show the objects in the order of the list again"""
+        self.beginResetModel()
+        self.pager.unsort()
+        self.endResetModel()
+
+    def set_filter(self, text):
+        """show only the objects whose name or email contains text"""
+        self.beginResetModel()
+        self.pager.set_filter(text)
+        self.endResetModel()
+
+    def refresh(self):
+        """show the objects again after the list changed"""
+        self.beginResetModel()
+        self.pager.reset()
+        self.endResetModel()
+
+    def object_at(self, row):
+        """the object in row, or None for -1"""
+        return None if row < 0 else self.pager[row]
+
+    def index_of(self, obj):
+        """the index of obj, fetching the rows up to it, or an invalid index if it is not shown"""
+        row = self.pager.row(obj)
+        if row == -1:
+            return QModelIndex()
+        if row >= self.pager.fetched:
+            self.beginInsertRows(QModelIndex(), self.pager.fetched, row)
+            self.pager.fetch_more(row + 1 - self.pager.fetched)
+            self.endInsertRows()
+        return self.index(row)
@@ -2,8 +2,10 @@ from PyQt5 import uic
 from PyQt5.QtWidgets import QMessageBox
 
 from src.league.exception_duplicate_email import DuplicateEmail
+from src.league.exception_duplicate_oid import DuplicateOid
 from src.league.team import Team
 from src.league.team_member import TeamMember
+from src.ui.object_list_model import ObjectListModel
 
 Ui_MainWindow, QtBaseWindow = uic.loadUiType("ui/team_editor.ui")
 
@@ -25,19 +27,22 @@ class TeamEditorDialog(QtBaseWindow, Ui_MainWindow):
             self.team = Team(oid, team_title)
         else:
             self.team = Team(oid, f"Team {oid}")
+        self.team_list_model = ObjectListModel(self.team.members, self)
+        self.team_list_view.setModel(self.team_list_model)
         self.update_ui()
         # Add connections to signals
         self.add_member_button.clicked.connect(self.add_button_clicked)
         self.delete_member_button.clicked.connect(self.delete_button_clicked)
         self.edit_member_button.clicked.connect(self.edit_button_clicked)
         self.buttonBox.accepted.connect(self.button_box_accepted)
-        self.team_list_widget.currentRowChanged.connect(self.team_list_selection_changed)
+        self.team_list_view.selectionModel().currentChanged.connect(self.team_list_selection_changed)
+        self.member_filter_line_edit.textChanged.connect(self.member_filter_changed)
+        self.member_sort_check_box.toggled.connect(self.member_sort_toggled)
 
     def team_list_selection_changed(self):
-        """Sets the text for the line edit if the list widget selection changes."""
-        current_row = self.team_list_widget.currentRow()
-        if current_row != -1:
-            member = self.team.members[current_row]
+        """Sets the text for the line edit if the list view selection changes."""
+        member = self.team_list_model.object_at(self.team_list_selected_row())
+        if member is not None:
             self.member_name_line_edit.setText(member.name)
             self.member_email_line_edit.setText(member.email)
 
@@ -46,43 +51,53 @@ class TeamEditorDialog(QtBaseWindow, Ui_MainWindow):
         mb = QMessageBox(QMessageBox.Icon.NoIcon, title, message, QMessageBox.StandardButton.Ok)
         return mb.exec()
 
+    def member_filter_changed(self, text):
+        """Shows only the members matching the filter line edit."""
+        self.team_list_model.set_filter(text)
+
+    def member_sort_toggled(self, checked):
+        """Sorts the members by name, or shows them in the team's order."""
+        if checked:
+            self.team_list_model.sort()
+        else:
+            self.team_list_model.unsort()
+
     def update_ui(self):
-        """Updates the list widget with the league_database."""
-        row = self.team_list_selected_row()
-        self.team_list_widget.clear()
-        for member in self.team.members:
-            # print(member)
-            self.team_list_widget.addItem(str(member))
-        if row != -1 and len(self.team.members) > row:
-            self.team_list_widget.setCurrentItem(self.team_list_widget.item(row))
+        """Updates the list view with the team's members, keeping the selected member selected.
+        Only the rows scrolled into view are fetched, see ObjectListModel."""
+        member = self.team_list_model.object_at(self.team_list_selected_row())
+        self.team_list_model.refresh()
+        if member is not None:
+            index = self.team_list_model.index_of(member)
+            if index.isValid():
+                self.team_list_view.setCurrentIndex(index)
 
     def team_list_selected_row(self):
-        """Finds and returns the item selected in the list widget. If none, returns -1."""
-        selection = self.team_list_widget.selectedItems()
+        """Finds and returns the row selected in the list view. If none, returns -1."""
+        selection = self.team_list_view.selectionModel().selectedIndexes()
         if len(selection) == 0:
             return -1
         assert len(selection) == 1
-        selected_item = selection[0]
-        for i, t in enumerate(self.team.members):
-            if str(t) == selected_item.text():
-                return i
-        return -1
+        return selection[0].row()
 
     def add_button_clicked(self):
-        """Adds the team member to the team. Creates a pop-up warning if there is information missing,
-        or if the email is duplicated."""
+        """Adds the team member to the team. A person already in the database with that email
+        (see LeagueDatabase.person) is added rather than a new member. Creates a pop-up warning
+        if there is information missing, or if the email is duplicated."""
         name = self.member_name_line_edit.text()
         email = self.member_email_line_edit.text()
         if name == "":
             return self.warn("Member Name Missing", "You must type in the member's name to add.")
-        zoid = self.database.next_oid()
-        name = self.member_name_line_edit.text()
-        email = self.member_email_line_edit.text()
+        member = self.database.person(email) if email else None
+        if member is None:
+            member = TeamMember(self.database.next_oid(), name, email)
         try:
-            member = TeamMember(zoid, name, email)
             self.team.add_member(member)
-        except DuplicateEmail:
+        except (DuplicateEmail, DuplicateOid):
             return self.warn("Duplicate Email", "You must type in a unique email address.")
+        if member.name != name:
+            self.warn("Existing Person", f"{email} is already {member.name}'s email, "
+                                         f"so {member.name} was added to the team.")
         self.update_ui()
         self.member_name_line_edit.clear()
         self.member_email_line_edit.clear()
@@ -99,7 +114,7 @@ class TeamEditorDialog(QtBaseWindow, Ui_MainWindow):
                              "Are you sure you want to remove this member?",
                              QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if dialog.exec() == QMessageBox.StandardButton.Yes:
-            del self.team.members[row]
+            self.team.remove_member(self.team_list_model.object_at(row))
             self.update_ui()
             self.member_name_line_edit.clear()
             self.member_email_line_edit.clear()
@@ -115,22 +130,26 @@ class TeamEditorDialog(QtBaseWindow, Ui_MainWindow):
         if name == "":
             return self.warn("Info Missing", "You must fill in the new name and email.")
         else:
-            zoid = self.database.next_oid()
             email = self.member_email_line_edit.text()
-            self.team.members[row] = TeamMember(zoid, name, email)
+            member = self.team_list_model.object_at(row)
+            if any(m is not member and m.email is not None and m.email.upper() == email.upper()
+                   for m in self.team.members):
+                return self.warn("Duplicate Email", "You must type in a unique email address.")
+            with self.database.command(f"Edit member {member.name}"):
+                member.name = name
+                member.email = email
             self.member_name_line_edit.clear()
             self.member_email_line_edit.clear()
         self.update_ui()
 
     def button_box_accepted(self):
-        """When the team is finalized, the team is added to the database
-        with the name provided in the name edit."""
-        self.database.remove_league(self.league)
-        self.league.remove_team(self.team)
-        name = self.teams_name_line_edit.text()
-        if name:
-            self.team.name = name
-        self.league.add_team(self.team)
-        self.database.add_league(self.league)
+        """When the team is finalized, it is renamed in place with the name provided in the
+        name edit, and added to the league if it is new."""
+        with self.database.command(f"Edit team {self.team.name}"):
+            name = self.teams_name_line_edit.text()
+            if name and name != self.team.name:
+                self.team.name = name
+            if self.team not in self.league.teams:
+                self.league.add_team(self.team)
         self.member_name_line_edit.clear()
         self.member_email_line_edit.clear()